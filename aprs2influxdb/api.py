@@ -0,0 +1,171 @@
+import http.server
+import json
+import logging
+import urllib.parse
+from typing import Callable, Iterator, Optional
+
+from utils import StoppableThread
+
+_logger = logging.getLogger(__name__)
+
+
+class APIError(Exception):
+    status: int
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+
+        self.status = status
+
+
+class APIServer(StoppableThread):
+    _host: str
+    _port: int
+
+    _routes: dict
+    _streams: dict
+    _server: Optional[http.server.ThreadingHTTPServer]
+
+    def __init__(self, host: str, port: int) -> None:
+        super().__init__(thread_name="API")
+
+        self._host = host
+        self._port = port
+
+        self._routes = {}
+        self._streams = {}
+        self._server = None
+
+    def add_route(self, path: str, handler: Callable[[dict], object], method: str = "GET") -> None:
+        """Registers a JSON route
+
+        The handler receives the query string parameters (and, for POST, the
+        JSON body under the "body" key) and returns a JSON serializable object.
+        It can raise APIError to answer with a specific status.
+        """
+
+        self._routes[(method, path)] = handler
+
+    def add_stream_route(self, path: str, handler: Callable[[dict], Iterator[str]]) -> None:
+        """Registers a Server-Sent Events route
+
+        The handler receives the query string parameters and returns an
+        iterator of events, written to the client as they come until the
+        iterator ends or the client disconnects. The iterator is then closed,
+        if it has a close method. The handler can raise APIError to answer
+        with a specific status instead.
+        """
+
+        self._streams[path] = handler
+
+    @property
+    def port(self) -> int:
+        """Port listened to, the one picked by the system if configured to 0"""
+
+        return self._server.server_address[1] if self._server else self._port
+
+    def start(self) -> None:
+        _logger.info("API Server START")
+
+        self._server = http.server.ThreadingHTTPServer((self._host, self._port), self._build_handler())
+        self._server.daemon_threads = True
+        self._server.timeout = 1
+
+        super().start()
+
+    def stop(self) -> None:
+        _logger.info("API Server STOP")
+
+        super().stop()
+
+    def join(self) -> None:
+        super().join()
+
+        if self._server:
+            self._server.server_close()
+
+    def _job(self) -> None:
+        self._server.handle_request()
+
+    def _build_handler(self):
+        routes: dict = self._routes
+        streams: dict = self._streams
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                self._dispatch("GET")
+
+            def do_POST(self) -> None:
+                self._dispatch("POST")
+
+            def log_message(self, message_format: str, *args) -> None:
+                _logger.debug(message_format % args)
+
+            def _dispatch(self, method: str) -> None:
+                url = urllib.parse.urlsplit(self.path)
+                query: dict = dict(urllib.parse.parse_qsl(url.query))
+
+                if method == "GET" and url.path in streams:
+                    self._stream(streams[url.path], query)
+                    return
+
+                handler = routes.get((method, url.path))
+                if not handler:
+                    self._reply(404, {"error": "Not found"})
+                    return
+
+                try:
+                    if method == "POST":
+                        length: int = int(self.headers.get("Content-Length", 0))
+                        query["body"] = json.loads(self.rfile.read(length) or b"{}")
+
+                    self._reply(200, handler(query))
+
+                except APIError as e:
+                    self._reply(e.status, {"error": str(e)})
+
+                except ValueError as e:
+                    self._reply(400, {"error": str(e)})
+
+                except Exception as e:
+                    _logger.error(e)
+                    self._reply(500, {"error": str(e)})
+
+            def _stream(self, handler: Callable[[dict], Iterator[str]], query: dict) -> None:
+                try:
+                    events: Iterator[str] = handler(query)
+                except APIError as e:
+                    self._reply(e.status, {"error": str(e)})
+                    return
+                except ValueError as e:
+                    self._reply(400, {"error": str(e)})
+                    return
+
+                self.close_connection = True
+
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Cache-Control", "no-cache")
+                    self.end_headers()
+
+                    for event in events:
+                        self.wfile.write(event.encode())
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    _logger.debug("Stream client disconnected")
+                finally:
+                    close: Optional[Callable[[], None]] = getattr(events, "close", None)
+                    if close:
+                        close()
+
+            def _reply(self, status: int, payload: object) -> None:
+                body: bytes = json.dumps(payload).encode()
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
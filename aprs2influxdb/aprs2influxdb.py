@@ -1,34 +1,108 @@
 import datetime
+import json
 import logging
 import threading
 import time
 from typing import Optional
 
 import aprslib
-from influxdb_client import InfluxDBClient
+from influxdb_client import InfluxDBClient, WriteApi
+from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client.rest import ApiException
 
+from api import APIServer
+from aprsis import READ_SIZE_MAX, APRSISClient, APRSISError
+from archive import ParquetArchive
 from config import ConfigParams
+from control import FilterControl
+from deadletter import DeadLetter
+from encoder import BatchEncoder
+from geofence import Geofence
+from heavyhitters import HeavyHitters
+from live import LiveFeed
+from memo import DecodeMemo
+from memory import AllocationSnapshots
+from metrics import Metrics
 from parser import Parser
-from utils import StoppableThread
+from partition import Partition, build_partition
+from positions import PositionIndex
+from ring import RING_WAIT_TIMEOUT, LineRing, RingReader
+from rollup import Rollup
+from schema import INFLUXDB_FIELD_TYPES, SEED_FIELD_TYPES
+from shedding import LoadShedder
+from sinks import Sink, create_sink
+from station import StationTable
+from trajectory import TrackSimplifier
+from utils import LogSummary, StoppableThread, parse_duration
+from writer import BatchController, PointClock, WriteError, Writer
 
 _logger = logging.getLogger(__name__)
 
+APRS_RECONNECT_DELAY: int = 5
+
+TRAJECTORY_TICK_INTERVAL: datetime.timedelta = datetime.timedelta(seconds=10)
+
 
 class APRS2InfluxDB(StoppableThread):
+    """Ingestion pipeline from APRS-IS to InfluxDB
+
+    keyword arguments:
+    config_params -- configuration of the pipeline
+    name -- pipeline name, when running more than one in the process
+    metrics -- registry shared by the process, a new one if not given
+    influxdb -- InfluxDB client shared by the process, a new one if not given
+    """
+
     _config_params: ConfigParams
 
     _lock: threading.Lock
 
-    _aprs: Optional[aprslib.IS]
+    _aprs: Optional[APRSISClient]
+    _filter_control: FilterControl
+
     _influxdb: Optional[InfluxDBClient]
+    _influxdb_shared: bool
+    _influxdb_write_api: Optional[WriteApi]
+
+    _sink: Optional[Sink]
+
+    _metrics: Metrics
+    _dead_letter: Optional[DeadLetter]
+    _clock: PointClock
+    _writer: Writer
 
     _heartbeat_thread: Optional[threading.Thread]
     _heartbeat_last: datetime.datetime
 
+    _geofence: Optional[Geofence]
     _parser: Parser
-
-    def __init__(self, config_params: ConfigParams) -> None:
-        super().__init__(thread_name="APRS-IS")
+    _encoder: BatchEncoder
+    _decode_memo: Optional[DecodeMemo]
+    _parse_failures: LogSummary
+    _ring: Optional[LineRing]
+    _ring_thread: Optional[threading.Thread]
+    _shedder: LoadShedder
+    _partition: Optional[Partition]
+    _rollup: Optional[Rollup]
+    _heavy_hitters: Optional[HeavyHitters]
+
+    _station_table: Optional[StationTable]
+    _position_index: Optional[PositionIndex]
+    _station_snapshot_last: datetime.datetime
+
+    _trajectory: Optional[TrackSimplifier]
+    _archive: Optional[ParquetArchive]
+    _trajectory_tick_last: datetime.datetime
+
+    _memory_snapshots: Optional[AllocationSnapshots]
+    _memory_snapshot_last: datetime.datetime
+
+    _api: Optional[APIServer]
+    _live: Optional[LiveFeed]
+
+    def __init__(self, config_params: ConfigParams, name: str = "", metrics: Optional[Metrics] = None,
+                 influxdb: Optional[InfluxDBClient] = None) -> None:
+        super().__init__(thread_name=f"APRS-IS {name}" if name else "APRS-IS")
 
         self._lock = threading.Lock()
 
@@ -37,31 +111,216 @@ class APRS2InfluxDB(StoppableThread):
         self._config_params = config_params
         self._config_params.log()
 
-        self._config_params.aprs = None
-        self._influxdb = None
+        self._aprs = None
+        self._filter_control = FilterControl(
+            apply=self._aprs_set_filter,
+            current=lambda: self._config_params.aprs_filter
+        )
+
+        self._influxdb = influxdb
+        self._influxdb_shared = influxdb is not None
+        self._influxdb_write_api = None
+
+        self._sink = create_sink(
+            output=self._config_params.output,
+            host=self._config_params.output_host,
+            port=self._config_params.output_port,
+            mtu=self._config_params.output_mtu
+        )
+
+        self._metrics = metrics or Metrics()
+
+        self._dead_letter = None
+        if self._config_params.dead_letter_file:
+            self._dead_letter = DeadLetter(self._config_params.dead_letter_file)
+
+        self._clock = PointClock()
+        self._writer = Writer(
+            write=self._sink.write if self._sink else self._influxdb_write,
+            metrics=self._metrics,
+            controller=BatchController(
+                batch_size_min=self._config_params.writer_batch_size_min,
+                batch_size_max=self._config_params.writer_batch_size_max,
+                flush_interval_min=self._config_params.writer_flush_interval_min,
+                flush_interval_max=self._config_params.writer_flush_interval_max,
+                latency_target=self._config_params.writer_latency_target
+            ),
+            queue_size=self._config_params.writer_queue_size,
+            dead_letter=self._dead_letter,
+            spill_file=self._config_params.writer_spill_file
+        )
 
         self._heartbeat_thread = None
         self._heartbeat_last = datetime.datetime.utcnow()
 
-        self._parser = Parser()
+        self._geofence = None
+        if self._config_params.geofence_file:
+            self._geofence = Geofence.load(
+                self._config_params.geofence_file,
+                name_property=self._config_params.geofence_name_property
+            )
+
+        self._parser = Parser(
+            geohash_precision=self._config_params.enrichment_geohash_precision,
+            locator_precision=self._config_params.enrichment_locator_precision,
+            tag_promotion=self._config_params.tag_promotion,
+            tag_cardinality_limit=self._config_params.tag_cardinality_limit,
+            metrics=self._metrics,
+            dead_letter=self._dead_letter,
+            geofence=self._geofence
+        )
+        self._encoder = BatchEncoder(self._parser)
+
+        self._decode_memo = None
+        if self._config_params.decode_memo_size:
+            self._decode_memo = DecodeMemo(
+                decode=aprslib.parse,
+                decode_header=aprslib.parsing.parse_header,
+                parser=self._parser,
+                encoder=self._encoder,
+                size=self._config_params.decode_memo_size,
+                ttl=parse_duration(self._config_params.decode_memo_ttl),
+                metrics=self._metrics
+            )
+
+        self._parse_failures = LogSummary(_logger, logging.DEBUG, "decode failures")
+
+        self._ring = None
+        self._ring_thread = None
+        if self._config_params.read_ring_size:
+            # A read larger than the ring could take would always be dropped
+            if self._config_params.read_ring_size < LineRing.minimum_size(READ_SIZE_MAX):
+                raise ValueError(f"Read ring size must be at least {LineRing.minimum_size(READ_SIZE_MAX)} bytes")
+
+            self._ring = LineRing(size=self._config_params.read_ring_size)
+
+        self._archive = None
+        if self._config_params.archive_directory:
+            self._archive = ParquetArchive(
+                directory=self._config_params.archive_directory,
+                parser=self._parser,
+                metrics=self._metrics
+            )
+
+        self._shedder = LoadShedder(
+            pending=lambda: self._writer.pending,
+            capacity=self._config_params.writer_queue_size,
+            low_watermark=self._config_params.shedding_low_watermark,
+            high_watermark=self._config_params.shedding_high_watermark,
+            station_rate=self._config_params.shedding_station_rate,
+            station_burst=self._config_params.shedding_station_burst,
+            metrics=self._metrics
+        )
+
+        # The filter has already been narrowed, the partition is kept to report on it
+        self._partition = build_partition(self._config_params)
+        if self._partition:
+            self._metrics.set("partition_share", self._partition.share)
+
+        self._rollup = None
+        if self._config_params.rollup_windows:
+            self._rollup = Rollup(
+                windows=[(window, parse_duration(window)) for window in self._config_params.rollup_windows],
+                state_file=self._config_params.rollup_state_file
+            )
+
+        self._heavy_hitters = None
+        if self._config_params.heavy_hitters_window:
+            self._heavy_hitters = HeavyHitters(
+                window=parse_duration(self._config_params.heavy_hitters_window),
+                size=self._config_params.heavy_hitters_size
+            )
+
+        self._station_table = None
+        if self._config_params.station_table_size:
+            self._station_table = StationTable(
+                max_size=self._config_params.station_table_size,
+                snapshot_file=self._config_params.station_snapshot_file
+            )
+        self._station_snapshot_last = datetime.datetime.utcnow()
+
+        self._position_index = None
+        if self._config_params.position_index_window:
+            self._position_index = PositionIndex(
+                window=parse_duration(self._config_params.position_index_window),
+                path=self._config_params.position_index_file,
+                batch_size=self._config_params.position_index_batch_size,
+                metrics=self._metrics
+            )
+
+        self._trajectory = None
+        if self._config_params.trajectory_tolerance:
+            self._trajectory = TrackSimplifier(
+                tolerance=self._config_params.trajectory_tolerance,
+                anchor_interval=self._config_params.trajectory_anchor_interval,
+                metrics=self._metrics
+            )
+        self._trajectory_tick_last = datetime.datetime.utcnow()
+
+        self._memory_snapshots = None
+        if self._config_params.memory_snapshot_file:
+            self._memory_snapshots = AllocationSnapshots(self._config_params.memory_snapshot_file)
+        self._memory_snapshot_last = datetime.datetime.utcnow()
+
+        self._api = None
+        if self._config_params.api_port:
+            self._api = APIServer(host=self._config_params.api_host, port=self._config_params.api_port)
+
+        self._live = None
+        if self._api and self._config_params.live_subscribers:
+            self._live = LiveFeed(
+                max_subscribers=self._config_params.live_subscribers,
+                buffer_size=self._config_params.live_buffer_size,
+                metrics=self._metrics
+            )
 
     def start(self) -> None:
         _logger.info("START")
 
         with self._lock:
+            self._memory_snapshots_start()
             self._aprs_client_start()
             self._influxdb_client_start()
+            self._schema_seed()
+            self._writer_start()
+            self._rollup_start()
+            self._station_table_start()
+            self._api_start()
             self._heartbeat_start()
             super().start()
+            self._ring_start()
 
     def stop(self) -> None:
+        """Shuts down within the configured timeout
+
+        Reading stops first, letting the packet in progress complete. Then the
+        caches are persisted and the partial rollups are queued, and the write
+        queue is drained until the deadline: lines left are spilled to disk.
+        """
+
         _logger.info("STOP")
 
+        deadline: float = time.monotonic() + self._config_params.shutdown_timeout
+
         with self._lock:
             super().stop()
-            self._heartbeat_stop()
+            self._aprs_client_interrupt()
+            super().join(timeout=self._remaining(deadline))
+            self._ring_stop(deadline)
+
+            self._heartbeat_stop(deadline)
+            self._live_stop()
+            self._api_stop()
+            self._station_table_stop()
+            self._position_index_stop()
+            self._rollup_stop()
+            self._heavy_hitters_stop()
+            self._trajectory_stop()
+            self._archive_stop()
+            self._writer_stop(deadline)
             self._influxdb_client_stop()
             self._aprs_client_stop()
+            self._memory_snapshots_stop()
 
     def join(self) -> None:
         try:
@@ -69,6 +328,12 @@ class APRS2InfluxDB(StoppableThread):
         except KeyboardInterrupt:
             pass
 
+        if self._api:
+            self._api.join()
+
+        if self._ring_thread:
+            self._ring_thread.join()
+
         super().join()
 
     def _aprs_client_start(self) -> None:
@@ -78,39 +343,391 @@ class APRS2InfluxDB(StoppableThread):
         passcode: int = aprslib.passcode(self._config_params.aprs_callsign)
         _logger.debug(f"Passcode for {self._config_params.aprs_callsign} id {passcode}")
 
-        self._aprs = aprslib.IS(
+        self._aprs = APRSISClient(
             host=self._config_params.aprs_server,
             port=self._config_params.aprs_port,
             callsign=self._config_params.aprs_callsign,
-            passwd=passcode
+            passcode=passcode,
+            aprs_filter=self._config_params.aprs_filter,
+            on_comment=self._filter_control.on_server_comment
         )
 
-        self._aprs.logger = logging.getLogger("aprslib")
-
-        _logger.info("Setting filter")
-        self._aprs.set_filter(self._config_params.aprs_filter)
-
         _logger.info("Connecting")
         self._aprs.connect()
 
+    def _aprs_set_filter(self, aprs_filter: str) -> None:
+        # A new filter is narrowed to the prefixes of this node like the initial one
+        if self._partition:
+            aprs_filter = self._partition.aprs_filter(aprs_filter)
+
+        # The client keeps the filter for reconnections and sends it on the live connection
+        self._aprs.set_filter(aprs_filter)
+
+        self._config_params.aprs_filter = aprs_filter
+
+    def _aprs_client_interrupt(self) -> None:
+        _logger.info("APRS Client INTERRUPT")
+
+        if self._aprs:
+            self._aprs.interrupt()
+
+    def _aprs_client_reconnect(self) -> None:
+        while self._keep_running:
+            try:
+                _logger.info("Reconnecting")
+                self._aprs.connect()
+                return
+            except APRSISError as e:
+                _logger.error(f"Unable to reconnect: {e}")
+
+            for _ in range(APRS_RECONNECT_DELAY):
+                if not self._keep_running:
+                    return
+                time.sleep(1)
+
     def _aprs_client_stop(self) -> None:
         _logger.info("APRS Client STOP")
 
-        self._aprs.close()
+        if self._aprs:
+            self._aprs.close()
+
+    def _ring_start(self) -> None:
+        if not self._ring:
+            return
+
+        _logger.info("Read ring START")
+
+        self._ring_thread = threading.Thread(target=self._ring_loop, name="Parse")
+        self._ring_thread.start()
+
+    def _ring_stop(self, deadline: float) -> None:
+        if not self._ring:
+            return
+
+        _logger.info("Read ring STOP")
+
+        # Lines already read are parsed before the aggregates and the writer stop
+        if self._ring_thread:
+            self._ring_thread.join(timeout=self._remaining(deadline))
+            if self._ring_thread.is_alive():
+                _logger.warning("Read ring not drained before the deadline")
+                return
+
+        self._ring.close()
+        self._ring.unlink()
+
+    def _ring_write(self, lines: list) -> None:
+        # The reader never waits for the parser: the server would drop a client falling behind
+        if not self._ring.write(lines, time.time()):
+            self._metrics.increment("read_ring_dropped", len(lines))
+
+        self._metrics.set("read_ring_used", self._ring.used)
+
+    def _ring_loop(self) -> None:
+        _logger.info("Read ring LOOP")
+
+        reader: RingReader = self._ring.reader(0)
+
+        try:
+            while True:
+                reads: list = reader.read(timeout=RING_WAIT_TIMEOUT)
+
+                if not reads:
+                    if not self._keep_running:
+                        return
+                    continue
+
+                self._metrics.set("read_ring_latency", time.time() - reads[0][0])
+
+                # Each read of the feed is consumed at once, as without the ring, its lines written at its receive time
+                for timestamp, lines in reads:
+                    self._consume_lines(bytes(lines).split(b"\n"), timestamp)
+        except Exception as e:
+            _logger.error(e)
+            raise e
+        finally:
+            reader.close()
 
     def _influxdb_client_start(self) -> None:
+        if self._sink:
+            _logger.info("Sink START")
+            self._sink.start()
+            return
+
         _logger.info("InfluxDB Client START")
 
-        self._influxdb = InfluxDBClient(
-            url=self._config_params.influxdb_url,
-            token=self._config_params.influxdb_token,
-            org=self._config_params.influxdb_org
-        )
+        if not self._influxdb_shared:
+            self._influxdb = InfluxDBClient(
+                url=self._config_params.influxdb_url,
+                token=self._config_params.influxdb_token,
+                org=self._config_params.influxdb_org
+            )
+
+        self._influxdb_write_api = self._influxdb.write_api(write_options=SYNCHRONOUS)
 
     def _influxdb_client_stop(self) -> None:
+        if self._sink:
+            _logger.info("Sink STOP")
+            self._sink.stop()
+            return
+
         _logger.info("InfluxDB Client STOP")
 
-        self._influxdb.close()
+        self._influxdb_write_api.close()
+
+        if not self._influxdb_shared:
+            self._influxdb.close()
+
+    def _influxdb_write(self, lines: list) -> None:
+        _logger.debug(f"Writing {len(lines)} lines to InfluxDB")
+
+        try:
+            self._influxdb_write_api.write(
+                org=self._config_params.influxdb_org,
+                bucket=self._config_params.influxdb_bucket,
+                record=lines
+            )
+        except ApiException as e:
+            raise WriteError(APRS2InfluxDB._api_message(e), e.status)
+        except Exception as e:
+            raise WriteError(str(e))
+
+    @staticmethod
+    def _api_message(e: ApiException) -> str:
+        """Message of an InfluxDB error response, telling what was rejected"""
+
+        try:
+            return str(json.loads(e.body)["message"])
+        except (TypeError, ValueError, KeyError):
+            return str(e.reason)
+
+    def _schema_seed(self) -> None:
+        if not self._config_params.schema_seed or self._sink:
+            return
+
+        _logger.info("Seeding field types from InfluxDB")
+
+        query: str = f'''
+            from(bucket: "{self._config_params.influxdb_bucket}")
+                |> range(start: -{self._config_params.schema_seed_range})
+                |> filter(fn: (r) => r._measurement == "packet")
+                |> last()
+        '''
+
+        try:
+            tables = self._influxdb.query_api().query(query, org=self._config_params.influxdb_org)
+        except Exception as e:
+            _logger.error(f"Unable to seed field types: {e}")
+            return
+
+        seeded: set = set()
+
+        for table in tables:
+            value_types: list = [column.data_type for column in table.columns if column.label == "_value"]
+            field_type = INFLUXDB_FIELD_TYPES.get(value_types[0]) if value_types else None
+            if not field_type or not table.records:
+                continue
+
+            self._parser.schema.pin(table.records[0].get_field(), field_type)
+            seeded.add(table.records[0].get_field())
+
+        for key, field_type in SEED_FIELD_TYPES.items():
+            if key not in seeded:
+                self._parser.schema.pin(key, field_type)
+
+    def _writer_start(self) -> None:
+        _logger.info("Writer START")
+
+        self._writer.start()
+
+    def _writer_stop(self, deadline: float) -> None:
+        _logger.info("Writer STOP")
+
+        self._writer.drain(deadline)
+
+    def _rollup_start(self) -> None:
+        if not self._rollup:
+            return
+
+        _logger.info("Rollup START")
+
+        self._rollup.load()
+
+    def _rollup_stop(self) -> None:
+        if not self._rollup:
+            return
+
+        _logger.info("Rollup STOP")
+
+        self._write(self._rollup.flush())
+
+    def _rollup_job(self) -> None:
+        if not self._rollup:
+            return
+
+        lines: list = self._rollup.tick()
+        if lines:
+            self._write(lines)
+
+    def _heavy_hitters_stop(self) -> None:
+        if not self._heavy_hitters:
+            return
+
+        _logger.info("Heavy hitters STOP")
+
+        self._write(self._heavy_hitters.flush())
+
+    def _heavy_hitters_job(self) -> None:
+        if not self._heavy_hitters:
+            return
+
+        lines: list = self._heavy_hitters.tick()
+        if lines:
+            self._write(lines)
+
+    def _station_table_start(self) -> None:
+        if not self._station_table:
+            return
+
+        _logger.info("Station table START")
+
+        self._station_table.load()
+
+    def _station_table_stop(self) -> None:
+        if not self._station_table:
+            return
+
+        _logger.info("Station table STOP")
+
+        self._station_table.snapshot()
+
+    def _station_table_job(self) -> None:
+        if not self._station_table:
+            return
+
+        now: datetime.datetime = datetime.datetime.utcnow()
+        if now - self._station_snapshot_last < self._config_params.station_snapshot_interval:
+            return
+
+        self._station_snapshot_last = now
+        self._station_table.snapshot()
+
+    def _position_index_stop(self) -> None:
+        if not self._position_index:
+            return
+
+        _logger.info("Position index STOP")
+
+        self._position_index.close()
+
+    def _position_index_job(self) -> None:
+        if not self._position_index:
+            return
+
+        self._position_index.tick()
+
+    def _trajectory_stop(self) -> None:
+        if not self._trajectory:
+            return
+
+        _logger.info("Trajectory STOP")
+
+        for line, raw in self._trajectory.flush():
+            self._write(line, raw)
+
+    def _trajectory_job(self) -> None:
+        if not self._trajectory:
+            return
+
+        now: datetime.datetime = datetime.datetime.utcnow()
+        if now - self._trajectory_tick_last < TRAJECTORY_TICK_INTERVAL:
+            return
+
+        self._trajectory_tick_last = now
+
+        for line, raw in self._trajectory.tick():
+            self._write(line, raw)
+
+    def _archive_stop(self) -> None:
+        if not self._archive:
+            return
+
+        _logger.info("Archive STOP")
+
+        self._archive.close()
+
+    def _archive_job(self) -> None:
+        if not self._archive:
+            return
+
+        self._archive.tick()
+
+    def _memory_snapshots_start(self) -> None:
+        if not self._memory_snapshots:
+            return
+
+        _logger.info("Memory snapshots START")
+
+        self._memory_snapshots.start()
+
+    def _memory_snapshots_stop(self) -> None:
+        if not self._memory_snapshots:
+            return
+
+        _logger.info("Memory snapshots STOP")
+
+        self._memory_snapshots.dump()
+        self._memory_snapshots.stop()
+
+    def _memory_snapshots_job(self) -> None:
+        if not self._memory_snapshots:
+            return
+
+        now: datetime.datetime = datetime.datetime.utcnow()
+        if now - self._memory_snapshot_last < self._config_params.memory_snapshot_interval:
+            return
+
+        self._memory_snapshot_last = now
+        self._memory_snapshots.dump()
+
+    def _api_start(self) -> None:
+        if not self._api:
+            return
+
+        self._api.add_route("/metrics", self._metrics.api_metrics)
+        self._api.add_route("/filter", self._filter_control.api_get_filter)
+        self._api.add_route("/filter", self._filter_control.api_set_filter, method="POST")
+
+        if self._station_table:
+            self._api.add_route("/station", self._station_table.api_station)
+            self._api.add_route("/stations", self._station_table.api_stations)
+
+        if self._position_index:
+            self._api.add_route("/nearby", self._position_index.api_nearby)
+            self._api.add_route("/positions", self._position_index.api_positions)
+            self._api.add_route("/track", self._position_index.api_track)
+
+        if self._heavy_hitters:
+            self._api.add_route("/top", self._heavy_hitters.api_top)
+
+        if self._live:
+            self._api.add_stream_route("/live", self._live.api_live)
+
+        self._api.start()
+
+    def _live_stop(self) -> None:
+        if not self._live:
+            return
+
+        _logger.info("Live feed STOP")
+
+        self._live.close()
+
+    def _api_stop(self) -> None:
+        if not self._api:
+            return
+
+        self._api.stop()
 
     def _heartbeat_start(self) -> None:
         _logger.info("APRS Heartbeat START")
@@ -118,14 +735,27 @@ class APRS2InfluxDB(StoppableThread):
         self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="Heartbeat")
         self._heartbeat_thread.start()
 
-    def _heartbeat_stop(self) -> None:
+    def _heartbeat_stop(self, deadline: float) -> None:
         _logger.info("APRS Heartbeat STOP")
 
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join(timeout=self._remaining(deadline))
+
     def _heartbeat_loop(self) -> None:
         _logger.info("APRS Heartbeat LOOP")
 
         while self._keep_running:
             self._heartbeat_job()
+            self._parser.summarize()
+            self._parse_failures.summarize()
+            self._shedder.summarize()
+            self._rollup_job()
+            self._heavy_hitters_job()
+            self._station_table_job()
+            self._position_index_job()
+            self._trajectory_job()
+            self._archive_job()
+            self._memory_snapshots_job()
             time.sleep(1)
 
     def _heartbeat_job(self) -> None:
@@ -141,35 +771,126 @@ class APRS2InfluxDB(StoppableThread):
         heartbeat_message: str = f"{callsign}>APRS,TCPIP*:>aprs2influxdb heartbeat {ts}"
 
         _logger.debug(f"Sending heartbeat: {heartbeat_message}")
-        self._aprs.sendall(heartbeat_message)
+        try:
+            self._aprs.sendall(heartbeat_message)
+        except APRSISError as e:
+            _logger.warning(f"Unable to send heartbeat: {e}")
 
     def _job(self) -> None:
         try:
-            self._aprs.consumer(callback=self._consume_packet, immortal=True, raw=False)
+            self._aprs.consume(self._ring_write if self._ring else self._consume_lines)
+        except APRSISError as e:
+            if not self._keep_running:
+                return
+
+            _logger.warning(f"APRS-IS connection lost: {e}")
+            self._aprs.close()
+            self._aprs_client_reconnect()
         except Exception as e:
             _logger.error(e)
             raise e
 
-    def _consume_packet(self, packet) -> None:
-        _logger.debug(f"Original packet: {packet}")
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        return max(0.0, deadline - time.monotonic())
 
-        line = self._parser.json_to_line_protocol(packet)
-        _logger.debug(f"Parsed line: {line}")
+    def _consume_lines(self, lines: list, timestamp: Optional[float] = None) -> None:
+        """Parses the lines of a read of the feed, received at timestamp, now if not given"""
 
-        if not line:
+        if timestamp is None:
+            timestamp = time.time()
+
+        packets: list = []
+
+        for line in lines:
+            packet: Optional[dict] = self._decode(line)
+            if packet and self._admit(packet):
+                packets.append(packet)
+
+        if self._decode_memo:
+            # Lines of the packets decoded from memoized payloads are filled in their templates
+            lines = self._decode_memo.encode(packets)
+        elif packets:
+            # Points are encoded for the whole read at once, a column at a time
+            lines = self._encoder.encode(packets)
+        else:
             return
 
+        for packet, line in zip(packets, lines):
+            self._emit(packet, line, timestamp)
+
+        if self._live:
+            self._live.publish(packets, lines)
+
+    def _decode(self, line: bytes) -> Optional[dict]:
         try:
-            _logger.info("Writing data to InfluxDB")
+            if self._decode_memo:
+                return self._decode_memo.decode(line)
 
-            self._influxdb.write_api().write(
-                org=self._config_params.influxdb_org,
-                bucket=self._config_params.influxdb_bucket,
-                record=line
-            )
+            return aprslib.parse(line)
+        except (aprslib.ParseError, aprslib.UnknownFormat) as e:
+            raw: str = line.decode(errors="replace")
+            self._parse_failures.event(type(e).__name__, "Unable to decode packet (%s): %s", e, raw)
+            self._parser.reject(f"{type(e).__name__}: {e}", raw, "decode_failures")
+            return None
 
-            _logger.debug("Write completed")
+    def _admit(self, packet: dict) -> bool:
+        """Feeds the aggregates with a packet, returning whether its point is written"""
+
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug("Original packet: %s", packet)
+
+        # Packets of other nodes mean the partitions overlap
+        if self._partition and not self._partition.contains(packet.get("from", "")):
+            self._metrics.increment("partition_foreign")
+
+        # Aggregates see every packet, shedding only applies to the points
+        if self._station_table:
+            self._station_table.update(packet)
+
+        if self._position_index:
+            self._position_index.add(packet)
+
+        if self._rollup:
+            lines: list = self._rollup.add(packet)
+            if lines:
+                self._write(lines)
+
+        if self._heavy_hitters:
+            lines = self._heavy_hitters.add(packet)
+            if lines:
+                self._write(lines)
+
+        if not self._shedder.admit(packet):
+            return False
+
+        if self._geofence and self._config_params.geofence_drop_outside and self._geofence.outside(packet):
+            self._metrics.increment("geofence_dropped")
+            return False
+
+        return True
+
+    def _emit(self, packet: dict, line: Optional[str], timestamp: float) -> None:
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug("Parsed line: %s", line)
+
+        if not line:
+            return
+
+        # The archive keeps every position, the trajectory only thins the points
+        if self._archive:
+            self._archive.add(packet, int(timestamp * 1000000000))
+
+        # Each point gets its own timestamp, or points of the same format would merge
+        line = f"{line} {self._clock.timestamp(timestamp)}"
+
+        if self._trajectory:
+            for record, raw in self._trajectory.add(packet, line, timestamp):
+                self._write(record, raw)
+            return
+
+        self._write(line, packet.get("raw"))
+
+    def _write(self, record, raw: Optional[str] = None) -> None:
+        self._writer.put(record, raw)
 
-        except Exception as e:
-            _logger.error(e)
-            raise e
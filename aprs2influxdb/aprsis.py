@@ -0,0 +1,239 @@
+import logging
+import socket
+import threading
+from typing import Callable, Optional
+
+_logger = logging.getLogger(__name__)
+
+APP_NAME: str = "aprs2influxdb"
+APP_VERSION: str = "0.2.1"
+
+CONNECT_TIMEOUT: float = 10.0
+
+# Servers send a comment at least every 20 seconds, silence means a dead link
+KEEPALIVE_TIMEOUT: float = 60.0
+
+BUFFER_SIZE: int = 65536
+
+# Bytes of lines handed over by a read at most: a buffer, after the partial line left from the previous one
+READ_SIZE_MAX: int = 2 * BUFFER_SIZE
+
+
+class APRSISError(Exception):
+    pass
+
+
+class ConnectionDrop(APRSISError):
+    pass
+
+
+class APRSISClient:
+    """APRS-IS client handing received lines in batches
+
+    Every recv() fills a buffer allocated once, and all the complete lines in
+    it are split at once and handed to the callback as a list of bytes. Server
+    lines, starting with "#", are not passed downstream: they only go to the
+    comment callback, which sees the login response and filter acknowledgements.
+    Sending is thread-safe, so heartbeats and filter changes can come from
+    any thread while another one reads.
+
+    keyword arguments:
+    host -- APRS-IS server host
+    port -- APRS-IS server port
+    callsign -- login callsign
+    passcode -- login passcode, -1 for a receive-only connection
+    aprs_filter -- server-side filter
+    on_comment -- function receiving server comment lines
+    """
+
+    _host: str
+    _port: int
+    _callsign: str
+    _passcode: int
+    _filter: str
+    _on_comment: Optional[Callable[[str], None]]
+
+    _socket: Optional[socket.socket]
+    _send_lock: threading.Lock
+    _buffer: bytearray
+    _partial: bytes
+
+    def __init__(self, host: str, port: int, callsign: str, passcode: int, aprs_filter: str = "",
+                 on_comment: Optional[Callable[[str], None]] = None) -> None:
+        super().__init__()
+
+        self._host = host
+        self._port = port
+        self._callsign = callsign
+        self._passcode = passcode
+        self._filter = aprs_filter
+        self._on_comment = on_comment
+
+        self._socket = None
+        self._send_lock = threading.Lock()
+        self._buffer = bytearray(BUFFER_SIZE)
+        self._partial = b""
+
+    @property
+    def connected(self) -> bool:
+        return self._socket is not None
+
+    def connect(self) -> None:
+        """Connects and logs in, raising APRSISError on failure"""
+
+        self.close()
+        self._partial = b""
+
+        _logger.info(f"Connecting to {self._host}:{self._port}")
+
+        try:
+            sock: socket.socket = socket.create_connection((self._host, self._port), timeout=CONNECT_TIMEOUT)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except OSError as e:
+            raise APRSISError(f"Unable to connect to {self._host}:{self._port}: {e}")
+
+        with self._send_lock:
+            self._socket = sock
+
+        try:
+            self._login()
+        except (OSError, APRSISError) as e:
+            self.close()
+            raise APRSISError(f"Login failed: {e}")
+
+        sock.settimeout(KEEPALIVE_TIMEOUT)
+
+    def set_filter(self, aprs_filter: str) -> None:
+        """Changes the filter, on the live connection too if connected"""
+
+        self._filter = aprs_filter
+
+        if self.connected:
+            self.sendall(f"#filter {aprs_filter}")
+
+    def sendall(self, line: str) -> None:
+        with self._send_lock:
+            if not self._socket:
+                raise APRSISError("Not connected")
+
+            try:
+                self._socket.sendall(f"{line.rstrip()}\r\n".encode())
+            except OSError as e:
+                raise APRSISError(f"Unable to send: {e}")
+
+    def consume(self, callback: Callable[[list], None]) -> None:
+        """Reads until the connection drops, calling back with the lists of
+        packet lines read at once. Raises ConnectionDrop at the end."""
+
+        sock: Optional[socket.socket] = self._socket
+        if not sock:
+            raise ConnectionDrop("Not connected")
+
+        view: memoryview = memoryview(self._buffer)
+
+        # Lines read along with the login response come first
+        data: bytes = self._partial
+        self._partial = b""
+
+        while True:
+            lines: list = data.split(b"\n")
+            partial: bytes = lines.pop()
+
+            if len(partial) > BUFFER_SIZE:
+                _logger.warning(f"Discarding {len(partial)} bytes without line end")
+                partial = b""
+
+            packets: list = []
+
+            for line in lines:
+                if line[-1:] == b"\r":
+                    line = line[:-1]
+
+                if not line:
+                    continue
+
+                if line[0] == 35:  # "#"
+                    if self._on_comment:
+                        self._on_comment(line.decode(errors="replace"))
+                    continue
+
+                packets.append(line)
+
+            if packets:
+                callback(packets)
+
+            try:
+                size: int = sock.recv_into(view)
+            except socket.timeout:
+                raise ConnectionDrop(f"No data in {KEEPALIVE_TIMEOUT:.0f}s")
+            except OSError as e:
+                raise ConnectionDrop(f"Connection lost: {e}")
+
+            if not size:
+                raise ConnectionDrop("Connection closed by server")
+
+            data = partial + view[:size]
+
+    def interrupt(self) -> None:
+        """Wakes up the thread blocked in consume(), making it raise ConnectionDrop"""
+
+        sock: Optional[socket.socket] = self._socket
+        if not sock:
+            return
+
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        with self._send_lock:
+            sock: Optional[socket.socket] = self._socket
+            self._socket = None
+
+        if not sock:
+            return
+
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def _login(self) -> None:
+        login: str = f"user {self._callsign} pass {self._passcode} vers {APP_NAME} {APP_VERSION}"
+        if self._filter:
+            login += f" filter {self._filter}"
+
+        self.sendall(login)
+
+        view: memoryview = memoryview(self._buffer)
+        data: bytes = b""
+
+        while True:
+            size: int = self._socket.recv_into(view)
+            if not size:
+                raise APRSISError("Connection closed by server")
+
+            data += view[:size]
+
+            while b"\n" in data:
+                line, data = data.split(b"\n", 1)
+
+                text: str = line.decode(errors="replace").strip()
+                if not text.startswith("#"):
+                    continue
+
+                if self._on_comment:
+                    self._on_comment(text)
+
+                if not text.startswith("# logresp"):
+                    continue
+
+                if " unverified" in text and self._passcode != -1:
+                    _logger.warning(f"Login not verified, check the passcode: {text}")
+                else:
+                    _logger.info(f"Logged in: {text}")
+
+                # Packets may follow the response in the same read
+                self._partial = data
+                return
@@ -0,0 +1,283 @@
+import datetime
+import functools
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from metrics import Metrics
+from parser import PACKET_FIELDS, TELEMETRY_FIELDS, Parser
+from schema import FIELD_TYPE_BOOLEAN, FIELD_TYPE_FLOAT, FIELD_TYPE_INTEGER, SEED_FIELD_TYPES, FieldSchema
+
+_logger = logging.getLogger(__name__)
+
+ARCHIVE_ROW_GROUP_SIZE: int = 65536
+ARCHIVE_COMPRESSION: str = "zstd"
+
+# Columns with few distinct values, stored once in the dictionary of each row group
+ARCHIVE_DICTIONARY_COLUMNS: list = ["from", "to", "via", "addresse", "path", "symbol", "symbol_table"]
+
+
+class ArchiveFile:
+    """Columns of the packets of one format received in one hour, written as
+    row groups of a Parquet file
+
+    The file is written under a hidden name, ignored by readers, and renamed
+    when closed.
+    """
+
+    path: str
+    columns: list
+    schema: "pyarrow.Schema"
+
+    _types: dict
+    _buffers: dict
+    _rows: int
+    _writer: Optional["pyarrow.parquet.ParquetWriter"]
+
+    def __init__(self, path: str, columns: list, types: dict) -> None:
+        super().__init__()
+
+        self.path = path
+        self.columns = columns
+
+        self._types = types
+        self._buffers = {column: [] for column in ["time"] + columns}
+        self._rows = 0
+        self._writer = None
+
+        self.schema = pyarrow.schema(
+            [pyarrow.field("time", pyarrow.timestamp("ns", tz="UTC"), nullable=False)] +
+            [pyarrow.field(column, ArchiveFile._arrow_type(types.get(column))) for column in columns]
+        )
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    def append(self, timestamp: int, record: dict) -> None:
+        self._buffers["time"].append(timestamp)
+
+        for column in self.columns:
+            self._buffers[column].append(record.get(column))
+
+        self._rows += 1
+
+    def coerce(self, column: str, value):
+        """Returns the value converted to the type of the column, None if it
+        cannot be"""
+
+        try:
+            return FieldSchema.coerce(self._types.get(column), value)
+        except (ValueError, TypeError, OverflowError):
+            return None
+
+    def take(self) -> dict:
+        """Returns the buffered columns, buffering the next rows anew"""
+
+        buffers: dict = self._buffers
+
+        self._buffers = {column: [] for column in buffers}
+        self._rows = 0
+
+        return buffers
+
+    def write(self, buffers: dict) -> None:
+        """Writes columns taken from the buffers as a row group"""
+
+        table = pyarrow.Table.from_pydict(buffers, schema=self.schema)
+
+        if not self._writer:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._writer = pyarrow.parquet.ParquetWriter(
+                self._temporary_path,
+                self.schema,
+                compression=ARCHIVE_COMPRESSION,
+                use_dictionary=[column for column in ARCHIVE_DICTIONARY_COLUMNS if column in self.columns]
+            )
+
+        self._writer.write_table(table)
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+
+        self.write(self.take())
+
+    def close(self) -> None:
+        self.flush()
+
+        if not self._writer:
+            return
+
+        self._writer.close()
+        os.replace(self._temporary_path, self.path)
+
+    @property
+    def _temporary_path(self) -> str:
+        return os.path.join(os.path.dirname(self.path), "." + os.path.basename(self.path))
+
+    @staticmethod
+    def _arrow_type(field_type: Optional[str]):
+        if field_type == FIELD_TYPE_FLOAT:
+            return pyarrow.float64()
+
+        if field_type == FIELD_TYPE_INTEGER:
+            return pyarrow.int64()
+
+        if field_type == FIELD_TYPE_BOOLEAN:
+            return pyarrow.bool_()
+
+        return pyarrow.string()
+
+
+class ParquetArchive:
+    """Archive of parsed packets in hourly, time-partitioned Parquet files
+
+    Packets are buffered in columns per format, with the fields written by the
+    parser for that format typed as pinned in its schema registry, and
+    written in row groups to one file per format and hour:
+
+        <directory>/format=<format>/date=<YYYY-MM-DD>/hour=<HH>/<opened>.parquet
+
+    The Hive-style layout lets query engines prune partitions by format and
+    time, and columns are compressed with zstd, callsigns and paths being
+    dictionary-encoded. Files of an hour are closed once the hour is over.
+
+    Packets are only buffered as they are added, row groups being written by
+    the periodic tick, so the ingest thread never waits for the disk.
+
+    keyword arguments:
+    directory -- archive root directory
+    parser -- parser whose schema registry and telemetry equations are used
+    row_group_size -- packets buffered before writing a row group
+    metrics -- metrics registry
+    """
+
+    _directory: str
+    _parser: Parser
+    _row_group_size: int
+    _metrics: Optional[Metrics]
+
+    _lock: threading.Lock
+    _write_lock: threading.Lock
+    _files: dict
+
+    def __init__(self, directory: str, parser: Parser, row_group_size: int = ARCHIVE_ROW_GROUP_SIZE,
+                 metrics: Optional[Metrics] = None) -> None:
+        super().__init__()
+
+        if not pyarrow:
+            raise ImportError("The Parquet archive needs the pyarrow package")
+
+        self._directory = directory
+        self._parser = parser
+        self._row_group_size = row_group_size
+        self._metrics = metrics
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._files = {}
+
+    def add(self, packet: dict, timestamp: Optional[int] = None) -> None:
+        """Buffers a packet, timestamp in nanoseconds defaults to now"""
+
+        packet_format: Optional[str] = packet.get("format")
+        if packet_format not in PACKET_FIELDS:
+            return
+
+        if timestamp is None:
+            timestamp = time.time_ns()
+
+        hour: int = timestamp // 3600000000000
+
+        with self._lock:
+            archive_file: Optional[ArchiveFile] = self._files.get((packet_format, hour))
+            if not archive_file:
+                archive_file = self._open(packet_format, hour)
+
+            archive_file.append(timestamp, self._record(packet, archive_file))
+
+        if self._metrics:
+            self._metrics.increment("archive_packets")
+
+    def tick(self, now: Optional[int] = None) -> None:
+        """Writes the row groups of the files which are full, and closes the
+        files of the hours which are over"""
+
+        hour: int = (now if now is not None else time.time_ns()) // 3600000000000
+
+        with self._write_lock:
+            # Buffers are taken under the lock and written out of it, packets being added meanwhile
+            with self._lock:
+                closed: list = [self._files.pop(key) for key in [key for key in self._files if key[1] < hour]]
+                full: list = [(archive_file, archive_file.take()) for archive_file in self._files.values()
+                              if archive_file.rows >= self._row_group_size]
+
+            for archive_file, buffers in full:
+                self._write(functools.partial(archive_file.write, buffers))
+
+            for archive_file in closed:
+                self._write(archive_file.close)
+
+    def close(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                closed: list = list(self._files.values())
+                self._files = {}
+
+            for archive_file in closed:
+                self._write(archive_file.close)
+
+    def _open(self, packet_format: str, hour: int) -> ArchiveFile:
+        start: datetime.datetime = datetime.datetime.fromtimestamp(hour * 3600, tz=datetime.timezone.utc)
+        opened: str = datetime.datetime.now(tz=datetime.timezone.utc).strftime("%Y%m%dT%H%M%S")
+
+        path: str = os.path.join(self._directory, f"format={packet_format}", f"date={start:%Y-%m-%d}",
+                                 f"hour={start:%H}", f"{opened}-{os.getpid()}.parquet")
+
+        # Files hold no earlier values to stay compatible with, so columns take the types of new buckets
+        columns: list = PACKET_FIELDS[packet_format]
+        types: dict = {column: SEED_FIELD_TYPES.get(column) or self._parser.schema.get(column) for column in columns}
+
+        archive_file: ArchiveFile = ArchiveFile(path, columns, types)
+        self._files[(packet_format, hour)] = archive_file
+
+        return archive_file
+
+    def _record(self, packet: dict, archive_file: ArchiveFile) -> dict:
+        values: dict = dict(packet)
+        values.update(packet.get("weather") or {})
+        values.pop("telemetry", None)
+
+        if any(column in TELEMETRY_FIELDS for column in archive_file.columns):
+            values.update(self._parser.telemetry_values(packet))
+
+        if "path" in packet:
+            values["path"] = ",".join(packet.get("path"))
+
+        record: dict = {}
+
+        for column in archive_file.columns:
+            value = values.get(column)
+            if value is None:
+                continue
+
+            record[column] = archive_file.coerce(column, value)
+
+        return record
+
+    def _write(self, write) -> None:
+        try:
+            write()
+        except (OSError, pyarrow.ArrowException) as e:
+            _logger.error(f"Unable to write archive file: {e}")
+            if self._metrics:
+                self._metrics.increment("archive_failures")
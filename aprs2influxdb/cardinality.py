@@ -0,0 +1,72 @@
+import hashlib
+import logging
+import math
+
+_logger = logging.getLogger(__name__)
+
+
+class HyperLogLog:
+    """Streaming distinct count estimator
+
+    Uses 2^precision registers of one byte each, so the default precision of 12
+    keeps 4 KiB per estimator with a standard error of about 1.6%.
+    """
+
+    _precision: int
+    _registers: bytearray
+    _alpha: float
+
+    _total: float
+    _zeros: int
+
+    def __init__(self, precision: int = 12) -> None:
+        super().__init__()
+
+        if not 4 <= precision <= 16:
+            raise ValueError("Invalid HyperLogLog precision")
+
+        self._precision = precision
+        self._registers = bytearray(1 << precision)
+
+        size: int = len(self._registers)
+        if size == 16:
+            self._alpha = 0.673
+        elif size == 32:
+            self._alpha = 0.697
+        elif size == 64:
+            self._alpha = 0.709
+        else:
+            self._alpha = 0.7213 / (1 + 1.079 / size)
+
+        # Harmonic sum and empty registers are kept up to date on every change,
+        # so estimating is cheap enough to be done on each added value
+        self._total = float(size)
+        self._zeros = size
+
+    def add(self, value: str) -> None:
+        digest: bytes = hashlib.blake2b(value.encode(), digest_size=8).digest()
+        hashed: int = int.from_bytes(digest, "big")
+
+        index: int = hashed >> (64 - self._precision)
+        remaining: int = hashed & ((1 << (64 - self._precision)) - 1)
+        rank: int = (64 - self._precision) - remaining.bit_length() + 1
+
+        previous: int = self._registers[index]
+        if rank <= previous:
+            return
+
+        self._registers[index] = rank
+        self._total += 2.0 ** -rank - 2.0 ** -previous
+        if previous == 0:
+            self._zeros -= 1
+
+    def estimate(self) -> float:
+        size: int = len(self._registers)
+
+        estimate: float = self._alpha * size * size / self._total
+
+        # Small range correction
+        if estimate <= 2.5 * size and self._zeros:
+            return size * math.log(size / self._zeros)
+
+        return estimate
@@ -17,6 +17,78 @@ class ConfigParams:
     _influxdb_org: str
     _influxdb_bucket: str
 
+    _enrichment_geohash_precision: int
+    _enrichment_locator_precision: int
+
+    _rollup_windows: list
+    _rollup_state_file: str
+
+    _station_table_size: int
+    _station_snapshot_file: str
+    _station_snapshot_interval: datetime.timedelta
+
+    _api_host: str
+    _api_port: int
+
+    _tag_promotion: dict
+    _tag_cardinality_limit: int
+
+    _writer_batch_size_min: int
+    _writer_batch_size_max: int
+    _writer_flush_interval_min: float
+    _writer_flush_interval_max: float
+    _writer_latency_target: float
+    _writer_queue_size: int
+
+    _dead_letter_file: str
+
+    _schema_seed: bool
+    _schema_seed_range: str
+
+    _writer_spill_file: str
+    _shutdown_timeout: float
+
+    _shedding_low_watermark: float
+    _shedding_high_watermark: float
+    _shedding_station_rate: float
+    _shedding_station_burst: int
+
+    _trajectory_tolerance: float
+    _trajectory_anchor_interval: float
+
+    _memory_snapshot_file: str
+    _memory_snapshot_interval: datetime.timedelta
+
+    _output: str
+    _output_host: str
+    _output_port: int
+    _output_mtu: int
+
+    _geofence_file: str
+    _geofence_name_property: str
+    _geofence_drop_outside: bool
+
+    _heavy_hitters_window: str
+    _heavy_hitters_size: int
+
+    _partition_nodes: int
+    _partition_index: int
+    _partition_table_file: str
+
+    _archive_directory: str
+
+    _position_index_window: str
+    _position_index_file: str
+    _position_index_batch_size: int
+
+    _live_subscribers: int
+    _live_buffer_size: int
+
+    _decode_memo_size: int
+    _decode_memo_ttl: str
+
+    _read_ring_size: int
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -31,6 +103,78 @@ class ConfigParams:
         self._influxdb_org = DEFAULT_INFLUXDB_ORG
         self._influxdb_bucket = DEFAULT_INFLUXDB_BUCKET
 
+        self._enrichment_geohash_precision = DEFAULT_ENRICHMENT_GEOHASH_PRECISION
+        self._enrichment_locator_precision = DEFAULT_ENRICHMENT_LOCATOR_PRECISION
+
+        self._rollup_windows = list(DEFAULT_ROLLUP_WINDOWS)
+        self._rollup_state_file = DEFAULT_ROLLUP_STATE_FILE
+
+        self._station_table_size = DEFAULT_STATION_TABLE_SIZE
+        self._station_snapshot_file = DEFAULT_STATION_SNAPSHOT_FILE
+        self._station_snapshot_interval = DEFAULT_STATION_SNAPSHOT_INTERVAL
+
+        self._api_host = DEFAULT_API_HOST
+        self._api_port = DEFAULT_API_PORT
+
+        self._tag_promotion = dict(DEFAULT_TAG_PROMOTION)
+        self._tag_cardinality_limit = DEFAULT_TAG_CARDINALITY_LIMIT
+
+        self._writer_batch_size_min = DEFAULT_WRITER_BATCH_SIZE_MIN
+        self._writer_batch_size_max = DEFAULT_WRITER_BATCH_SIZE_MAX
+        self._writer_flush_interval_min = DEFAULT_WRITER_FLUSH_INTERVAL_MIN
+        self._writer_flush_interval_max = DEFAULT_WRITER_FLUSH_INTERVAL_MAX
+        self._writer_latency_target = DEFAULT_WRITER_LATENCY_TARGET
+        self._writer_queue_size = DEFAULT_WRITER_QUEUE_SIZE
+
+        self._dead_letter_file = DEFAULT_DEAD_LETTER_FILE
+
+        self._schema_seed = DEFAULT_SCHEMA_SEED
+        self._schema_seed_range = DEFAULT_SCHEMA_SEED_RANGE
+
+        self._writer_spill_file = DEFAULT_WRITER_SPILL_FILE
+        self._shutdown_timeout = DEFAULT_SHUTDOWN_TIMEOUT
+
+        self._shedding_low_watermark = DEFAULT_SHEDDING_LOW_WATERMARK
+        self._shedding_high_watermark = DEFAULT_SHEDDING_HIGH_WATERMARK
+        self._shedding_station_rate = DEFAULT_SHEDDING_STATION_RATE
+        self._shedding_station_burst = DEFAULT_SHEDDING_STATION_BURST
+
+        self._trajectory_tolerance = DEFAULT_TRAJECTORY_TOLERANCE
+        self._trajectory_anchor_interval = DEFAULT_TRAJECTORY_ANCHOR_INTERVAL
+
+        self._memory_snapshot_file = DEFAULT_MEMORY_SNAPSHOT_FILE
+        self._memory_snapshot_interval = DEFAULT_MEMORY_SNAPSHOT_INTERVAL
+
+        self._output = DEFAULT_OUTPUT
+        self._output_host = DEFAULT_OUTPUT_HOST
+        self._output_port = DEFAULT_OUTPUT_PORT
+        self._output_mtu = DEFAULT_OUTPUT_MTU
+
+        self._geofence_file = DEFAULT_GEOFENCE_FILE
+        self._geofence_name_property = DEFAULT_GEOFENCE_NAME_PROPERTY
+        self._geofence_drop_outside = DEFAULT_GEOFENCE_DROP_OUTSIDE
+
+        self._heavy_hitters_window = DEFAULT_HEAVY_HITTERS_WINDOW
+        self._heavy_hitters_size = DEFAULT_HEAVY_HITTERS_SIZE
+
+        self._partition_nodes = DEFAULT_PARTITION_NODES
+        self._partition_index = DEFAULT_PARTITION_INDEX
+        self._partition_table_file = DEFAULT_PARTITION_TABLE_FILE
+
+        self._archive_directory = DEFAULT_ARCHIVE_DIRECTORY
+
+        self._position_index_window = DEFAULT_POSITION_INDEX_WINDOW
+        self._position_index_file = DEFAULT_POSITION_INDEX_FILE
+        self._position_index_batch_size = DEFAULT_POSITION_INDEX_BATCH_SIZE
+
+        self._live_subscribers = DEFAULT_LIVE_SUBSCRIBERS
+        self._live_buffer_size = DEFAULT_LIVE_BUFFER_SIZE
+
+        self._decode_memo_size = DEFAULT_DECODE_MEMO_SIZE
+        self._decode_memo_ttl = DEFAULT_DECODE_MEMO_TTL
+
+        self._read_ring_size = DEFAULT_READ_RING_SIZE
+
     @property
     def aprs_server(self) -> str:
         return self._aprs_server
@@ -104,6 +248,419 @@ class ConfigParams:
     def influxdb_bucket(self, influxdb_bucket: str = DEFAULT_INFLUXDB_BUCKET) -> None:
         self._influxdb_bucket = influxdb_bucket
 
+    @property
+    def enrichment_geohash_precision(self) -> int:
+        return self._enrichment_geohash_precision
+
+    @enrichment_geohash_precision.setter
+    def enrichment_geohash_precision(self,
+                                     enrichment_geohash_precision: int = DEFAULT_ENRICHMENT_GEOHASH_PRECISION) -> None:
+        self._enrichment_geohash_precision = enrichment_geohash_precision
+
+    @property
+    def enrichment_locator_precision(self) -> int:
+        return self._enrichment_locator_precision
+
+    @enrichment_locator_precision.setter
+    def enrichment_locator_precision(self,
+                                     enrichment_locator_precision: int = DEFAULT_ENRICHMENT_LOCATOR_PRECISION) -> None:
+        self._enrichment_locator_precision = enrichment_locator_precision
+
+    @property
+    def rollup_windows(self) -> list:
+        return self._rollup_windows
+
+    @rollup_windows.setter
+    def rollup_windows(self, rollup_windows: list = DEFAULT_ROLLUP_WINDOWS) -> None:
+        self._rollup_windows = rollup_windows
+
+    @property
+    def rollup_state_file(self) -> str:
+        return self._rollup_state_file
+
+    @rollup_state_file.setter
+    def rollup_state_file(self, rollup_state_file: str = DEFAULT_ROLLUP_STATE_FILE) -> None:
+        self._rollup_state_file = rollup_state_file
+
+    @property
+    def station_table_size(self) -> int:
+        return self._station_table_size
+
+    @station_table_size.setter
+    def station_table_size(self, station_table_size: int = DEFAULT_STATION_TABLE_SIZE) -> None:
+        self._station_table_size = station_table_size
+
+    @property
+    def station_snapshot_file(self) -> str:
+        return self._station_snapshot_file
+
+    @station_snapshot_file.setter
+    def station_snapshot_file(self, station_snapshot_file: str = DEFAULT_STATION_SNAPSHOT_FILE) -> None:
+        self._station_snapshot_file = station_snapshot_file
+
+    @property
+    def station_snapshot_interval(self) -> datetime.timedelta:
+        return self._station_snapshot_interval
+
+    @station_snapshot_interval.setter
+    def station_snapshot_interval(self,
+                                  station_snapshot_interval: datetime.timedelta = DEFAULT_STATION_SNAPSHOT_INTERVAL) -> None:
+        self._station_snapshot_interval = station_snapshot_interval
+
+    @property
+    def api_host(self) -> str:
+        return self._api_host
+
+    @api_host.setter
+    def api_host(self, api_host: str = DEFAULT_API_HOST) -> None:
+        self._api_host = api_host
+
+    @property
+    def api_port(self) -> int:
+        return self._api_port
+
+    @api_port.setter
+    def api_port(self, api_port: int = DEFAULT_API_PORT) -> None:
+        self._api_port = api_port
+
+    @property
+    def tag_promotion(self) -> dict:
+        return self._tag_promotion
+
+    @tag_promotion.setter
+    def tag_promotion(self, tag_promotion: dict = DEFAULT_TAG_PROMOTION) -> None:
+        self._tag_promotion = tag_promotion
+
+    @property
+    def tag_cardinality_limit(self) -> int:
+        return self._tag_cardinality_limit
+
+    @tag_cardinality_limit.setter
+    def tag_cardinality_limit(self, tag_cardinality_limit: int = DEFAULT_TAG_CARDINALITY_LIMIT) -> None:
+        self._tag_cardinality_limit = tag_cardinality_limit
+
+    @property
+    def writer_batch_size_min(self) -> int:
+        return self._writer_batch_size_min
+
+    @writer_batch_size_min.setter
+    def writer_batch_size_min(self, writer_batch_size_min: int = DEFAULT_WRITER_BATCH_SIZE_MIN) -> None:
+        self._writer_batch_size_min = writer_batch_size_min
+
+    @property
+    def writer_batch_size_max(self) -> int:
+        return self._writer_batch_size_max
+
+    @writer_batch_size_max.setter
+    def writer_batch_size_max(self, writer_batch_size_max: int = DEFAULT_WRITER_BATCH_SIZE_MAX) -> None:
+        self._writer_batch_size_max = writer_batch_size_max
+
+    @property
+    def writer_flush_interval_min(self) -> float:
+        return self._writer_flush_interval_min
+
+    @writer_flush_interval_min.setter
+    def writer_flush_interval_min(self, writer_flush_interval_min: float = DEFAULT_WRITER_FLUSH_INTERVAL_MIN) -> None:
+        self._writer_flush_interval_min = writer_flush_interval_min
+
+    @property
+    def writer_flush_interval_max(self) -> float:
+        return self._writer_flush_interval_max
+
+    @writer_flush_interval_max.setter
+    def writer_flush_interval_max(self, writer_flush_interval_max: float = DEFAULT_WRITER_FLUSH_INTERVAL_MAX) -> None:
+        self._writer_flush_interval_max = writer_flush_interval_max
+
+    @property
+    def writer_latency_target(self) -> float:
+        return self._writer_latency_target
+
+    @writer_latency_target.setter
+    def writer_latency_target(self, writer_latency_target: float = DEFAULT_WRITER_LATENCY_TARGET) -> None:
+        self._writer_latency_target = writer_latency_target
+
+    @property
+    def writer_queue_size(self) -> int:
+        return self._writer_queue_size
+
+    @writer_queue_size.setter
+    def writer_queue_size(self, writer_queue_size: int = DEFAULT_WRITER_QUEUE_SIZE) -> None:
+        self._writer_queue_size = writer_queue_size
+
+    @property
+    def dead_letter_file(self) -> str:
+        return self._dead_letter_file
+
+    @dead_letter_file.setter
+    def dead_letter_file(self, dead_letter_file: str = DEFAULT_DEAD_LETTER_FILE) -> None:
+        self._dead_letter_file = dead_letter_file
+
+    @property
+    def schema_seed(self) -> bool:
+        return self._schema_seed
+
+    @schema_seed.setter
+    def schema_seed(self, schema_seed: bool = DEFAULT_SCHEMA_SEED) -> None:
+        self._schema_seed = schema_seed
+
+    @property
+    def schema_seed_range(self) -> str:
+        return self._schema_seed_range
+
+    @schema_seed_range.setter
+    def schema_seed_range(self, schema_seed_range: str = DEFAULT_SCHEMA_SEED_RANGE) -> None:
+        self._schema_seed_range = schema_seed_range
+
+    @property
+    def writer_spill_file(self) -> str:
+        return self._writer_spill_file
+
+    @writer_spill_file.setter
+    def writer_spill_file(self, writer_spill_file: str = DEFAULT_WRITER_SPILL_FILE) -> None:
+        self._writer_spill_file = writer_spill_file
+
+    @property
+    def shutdown_timeout(self) -> float:
+        return self._shutdown_timeout
+
+    @shutdown_timeout.setter
+    def shutdown_timeout(self, shutdown_timeout: float = DEFAULT_SHUTDOWN_TIMEOUT) -> None:
+        self._shutdown_timeout = shutdown_timeout
+
+    @property
+    def shedding_low_watermark(self) -> float:
+        return self._shedding_low_watermark
+
+    @shedding_low_watermark.setter
+    def shedding_low_watermark(self, shedding_low_watermark: float = DEFAULT_SHEDDING_LOW_WATERMARK) -> None:
+        self._shedding_low_watermark = shedding_low_watermark
+
+    @property
+    def shedding_high_watermark(self) -> float:
+        return self._shedding_high_watermark
+
+    @shedding_high_watermark.setter
+    def shedding_high_watermark(self, shedding_high_watermark: float = DEFAULT_SHEDDING_HIGH_WATERMARK) -> None:
+        self._shedding_high_watermark = shedding_high_watermark
+
+    @property
+    def shedding_station_rate(self) -> float:
+        return self._shedding_station_rate
+
+    @shedding_station_rate.setter
+    def shedding_station_rate(self, shedding_station_rate: float = DEFAULT_SHEDDING_STATION_RATE) -> None:
+        self._shedding_station_rate = shedding_station_rate
+
+    @property
+    def shedding_station_burst(self) -> int:
+        return self._shedding_station_burst
+
+    @shedding_station_burst.setter
+    def shedding_station_burst(self, shedding_station_burst: int = DEFAULT_SHEDDING_STATION_BURST) -> None:
+        self._shedding_station_burst = shedding_station_burst
+
+    @property
+    def trajectory_tolerance(self) -> float:
+        return self._trajectory_tolerance
+
+    @trajectory_tolerance.setter
+    def trajectory_tolerance(self, trajectory_tolerance: float = DEFAULT_TRAJECTORY_TOLERANCE) -> None:
+        self._trajectory_tolerance = trajectory_tolerance
+
+    @property
+    def trajectory_anchor_interval(self) -> float:
+        return self._trajectory_anchor_interval
+
+    @trajectory_anchor_interval.setter
+    def trajectory_anchor_interval(self,
+                                   trajectory_anchor_interval: float = DEFAULT_TRAJECTORY_ANCHOR_INTERVAL) -> None:
+        self._trajectory_anchor_interval = trajectory_anchor_interval
+
+    @property
+    def memory_snapshot_file(self) -> str:
+        return self._memory_snapshot_file
+
+    @memory_snapshot_file.setter
+    def memory_snapshot_file(self, memory_snapshot_file: str = DEFAULT_MEMORY_SNAPSHOT_FILE) -> None:
+        self._memory_snapshot_file = memory_snapshot_file
+
+    @property
+    def memory_snapshot_interval(self) -> datetime.timedelta:
+        return self._memory_snapshot_interval
+
+    @memory_snapshot_interval.setter
+    def memory_snapshot_interval(self,
+                                 memory_snapshot_interval: datetime.timedelta = DEFAULT_MEMORY_SNAPSHOT_INTERVAL) -> None:
+        self._memory_snapshot_interval = memory_snapshot_interval
+
+    @property
+    def output(self) -> str:
+        return self._output
+
+    @output.setter
+    def output(self, output: str = DEFAULT_OUTPUT) -> None:
+        self._output = output
+
+    @property
+    def output_host(self) -> str:
+        return self._output_host
+
+    @output_host.setter
+    def output_host(self, output_host: str = DEFAULT_OUTPUT_HOST) -> None:
+        self._output_host = output_host
+
+    @property
+    def output_port(self) -> int:
+        return self._output_port
+
+    @output_port.setter
+    def output_port(self, output_port: int = DEFAULT_OUTPUT_PORT) -> None:
+        self._output_port = output_port
+
+    @property
+    def output_mtu(self) -> int:
+        return self._output_mtu
+
+    @output_mtu.setter
+    def output_mtu(self, output_mtu: int = DEFAULT_OUTPUT_MTU) -> None:
+        self._output_mtu = output_mtu
+
+    @property
+    def geofence_file(self) -> str:
+        return self._geofence_file
+
+    @geofence_file.setter
+    def geofence_file(self, geofence_file: str = DEFAULT_GEOFENCE_FILE) -> None:
+        self._geofence_file = geofence_file
+
+    @property
+    def geofence_name_property(self) -> str:
+        return self._geofence_name_property
+
+    @geofence_name_property.setter
+    def geofence_name_property(self, geofence_name_property: str = DEFAULT_GEOFENCE_NAME_PROPERTY) -> None:
+        self._geofence_name_property = geofence_name_property
+
+    @property
+    def geofence_drop_outside(self) -> bool:
+        return self._geofence_drop_outside
+
+    @geofence_drop_outside.setter
+    def geofence_drop_outside(self, geofence_drop_outside: bool = DEFAULT_GEOFENCE_DROP_OUTSIDE) -> None:
+        self._geofence_drop_outside = geofence_drop_outside
+
+    @property
+    def heavy_hitters_window(self) -> str:
+        return self._heavy_hitters_window
+
+    @heavy_hitters_window.setter
+    def heavy_hitters_window(self, heavy_hitters_window: str = DEFAULT_HEAVY_HITTERS_WINDOW) -> None:
+        self._heavy_hitters_window = heavy_hitters_window
+
+    @property
+    def heavy_hitters_size(self) -> int:
+        return self._heavy_hitters_size
+
+    @heavy_hitters_size.setter
+    def heavy_hitters_size(self, heavy_hitters_size: int = DEFAULT_HEAVY_HITTERS_SIZE) -> None:
+        self._heavy_hitters_size = heavy_hitters_size
+
+    @property
+    def partition_nodes(self) -> int:
+        return self._partition_nodes
+
+    @partition_nodes.setter
+    def partition_nodes(self, partition_nodes: int = DEFAULT_PARTITION_NODES) -> None:
+        self._partition_nodes = partition_nodes
+
+    @property
+    def partition_index(self) -> int:
+        return self._partition_index
+
+    @partition_index.setter
+    def partition_index(self, partition_index: int = DEFAULT_PARTITION_INDEX) -> None:
+        self._partition_index = partition_index
+
+    @property
+    def partition_table_file(self) -> str:
+        return self._partition_table_file
+
+    @partition_table_file.setter
+    def partition_table_file(self, partition_table_file: str = DEFAULT_PARTITION_TABLE_FILE) -> None:
+        self._partition_table_file = partition_table_file
+
+    @property
+    def archive_directory(self) -> str:
+        return self._archive_directory
+
+    @archive_directory.setter
+    def archive_directory(self, archive_directory: str = DEFAULT_ARCHIVE_DIRECTORY) -> None:
+        self._archive_directory = archive_directory
+
+    @property
+    def position_index_window(self) -> str:
+        return self._position_index_window
+
+    @position_index_window.setter
+    def position_index_window(self, position_index_window: str = DEFAULT_POSITION_INDEX_WINDOW) -> None:
+        self._position_index_window = position_index_window
+
+    @property
+    def position_index_file(self) -> str:
+        return self._position_index_file
+
+    @position_index_file.setter
+    def position_index_file(self, position_index_file: str = DEFAULT_POSITION_INDEX_FILE) -> None:
+        self._position_index_file = position_index_file
+
+    @property
+    def position_index_batch_size(self) -> int:
+        return self._position_index_batch_size
+
+    @position_index_batch_size.setter
+    def position_index_batch_size(self, position_index_batch_size: int = DEFAULT_POSITION_INDEX_BATCH_SIZE) -> None:
+        self._position_index_batch_size = position_index_batch_size
+
+    @property
+    def live_subscribers(self) -> int:
+        return self._live_subscribers
+
+    @live_subscribers.setter
+    def live_subscribers(self, live_subscribers: int = DEFAULT_LIVE_SUBSCRIBERS) -> None:
+        self._live_subscribers = live_subscribers
+
+    @property
+    def live_buffer_size(self) -> int:
+        return self._live_buffer_size
+
+    @live_buffer_size.setter
+    def live_buffer_size(self, live_buffer_size: int = DEFAULT_LIVE_BUFFER_SIZE) -> None:
+        self._live_buffer_size = live_buffer_size
+
+    @property
+    def decode_memo_size(self) -> int:
+        return self._decode_memo_size
+
+    @decode_memo_size.setter
+    def decode_memo_size(self, decode_memo_size: int = DEFAULT_DECODE_MEMO_SIZE) -> None:
+        self._decode_memo_size = decode_memo_size
+
+    @property
+    def decode_memo_ttl(self) -> str:
+        return self._decode_memo_ttl
+
+    @decode_memo_ttl.setter
+    def decode_memo_ttl(self, decode_memo_ttl: str = DEFAULT_DECODE_MEMO_TTL) -> None:
+        self._decode_memo_ttl = decode_memo_ttl
+
+    @property
+    def read_ring_size(self) -> int:
+        return self._read_ring_size
+
+    @read_ring_size.setter
+    def read_ring_size(self, read_ring_size: int = DEFAULT_READ_RING_SIZE) -> None:
+        self._read_ring_size = read_ring_size
+
     def log(self) -> None:
         _logger.debug(f"APRS")
         _logger.debug(f"  - Server: {self._aprs_server}")
@@ -117,3 +674,96 @@ class ConfigParams:
         _logger.debug(f"  - Token: {self._influxdb_token}")
         _logger.debug(f"  - Organization: {self._influxdb_org}")
         _logger.debug(f"  - Bucket: {self._influxdb_bucket}")
+
+        _logger.debug(f"Enrichment")
+        _logger.debug(f"  - Geohash precision: {self._enrichment_geohash_precision}")
+        _logger.debug(f"  - Locator precision: {self._enrichment_locator_precision}")
+
+        _logger.debug(f"Rollup")
+        _logger.debug(f"  - Windows: {self._rollup_windows}")
+        _logger.debug(f"  - State file: {self._rollup_state_file}")
+
+        _logger.debug(f"Station table")
+        _logger.debug(f"  - Size: {self._station_table_size}")
+        _logger.debug(f"  - Snapshot file: {self._station_snapshot_file}")
+        _logger.debug(f"  - Snapshot interval: {self._station_snapshot_interval}")
+
+        _logger.debug(f"API")
+        _logger.debug(f"  - Host: {self._api_host}")
+        _logger.debug(f"  - Port: {self._api_port}")
+
+        _logger.debug(f"Tag promotion")
+        _logger.debug(f"  - Keys: {self._tag_promotion}")
+        _logger.debug(f"  - Cardinality limit: {self._tag_cardinality_limit}")
+
+        _logger.debug(f"Writer")
+        _logger.debug(f"  - Batch size min: {self._writer_batch_size_min}")
+        _logger.debug(f"  - Batch size max: {self._writer_batch_size_max}")
+        _logger.debug(f"  - Flush interval min: {self._writer_flush_interval_min}")
+        _logger.debug(f"  - Flush interval max: {self._writer_flush_interval_max}")
+        _logger.debug(f"  - Latency target: {self._writer_latency_target}")
+        _logger.debug(f"  - Queue size: {self._writer_queue_size}")
+
+        _logger.debug(f"Dead letter")
+        _logger.debug(f"  - File: {self._dead_letter_file}")
+
+        _logger.debug(f"Schema")
+        _logger.debug(f"  - Seed: {self._schema_seed}")
+        _logger.debug(f"  - Seed range: {self._schema_seed_range}")
+
+        _logger.debug(f"Shutdown")
+        _logger.debug(f"  - Writer spill file: {self._writer_spill_file}")
+        _logger.debug(f"  - Timeout: {self._shutdown_timeout}")
+
+        _logger.debug(f"Load shedding")
+        _logger.debug(f"  - Low watermark: {self._shedding_low_watermark}")
+        _logger.debug(f"  - High watermark: {self._shedding_high_watermark}")
+        _logger.debug(f"  - Station rate: {self._shedding_station_rate}")
+        _logger.debug(f"  - Station burst: {self._shedding_station_burst}")
+
+        _logger.debug(f"Trajectory")
+        _logger.debug(f"  - Tolerance: {self._trajectory_tolerance}")
+        _logger.debug(f"  - Anchor interval: {self._trajectory_anchor_interval}")
+
+        _logger.debug(f"Memory snapshots")
+        _logger.debug(f"  - File: {self._memory_snapshot_file}")
+        _logger.debug(f"  - Interval: {self._memory_snapshot_interval}")
+
+        _logger.debug(f"Output")
+        _logger.debug(f"  - Output: {self._output}")
+        _logger.debug(f"  - Host: {self._output_host}")
+        _logger.debug(f"  - Port: {self._output_port}")
+        _logger.debug(f"  - MTU: {self._output_mtu}")
+
+        _logger.debug(f"Geofence")
+        _logger.debug(f"  - File: {self._geofence_file}")
+        _logger.debug(f"  - Name property: {self._geofence_name_property}")
+        _logger.debug(f"  - Drop outside: {self._geofence_drop_outside}")
+
+        _logger.debug(f"Heavy hitters")
+        _logger.debug(f"  - Window: {self._heavy_hitters_window}")
+        _logger.debug(f"  - Size: {self._heavy_hitters_size}")
+
+        _logger.debug(f"Partition")
+        _logger.debug(f"  - Nodes: {self._partition_nodes}")
+        _logger.debug(f"  - Index: {self._partition_index}")
+        _logger.debug(f"  - Table file: {self._partition_table_file}")
+
+        _logger.debug(f"Archive")
+        _logger.debug(f"  - Directory: {self._archive_directory}")
+
+        _logger.debug(f"Position index")
+        _logger.debug(f"  - Window: {self._position_index_window}")
+        _logger.debug(f"  - File: {self._position_index_file}")
+        _logger.debug(f"  - Batch size: {self._position_index_batch_size}")
+
+        _logger.debug(f"Live feed")
+        _logger.debug(f"  - Subscribers: {self._live_subscribers}")
+        _logger.debug(f"  - Buffer size: {self._live_buffer_size}")
+
+        _logger.debug(f"Decode memo")
+        _logger.debug(f"  - Size: {self._decode_memo_size}")
+        _logger.debug(f"  - TTL: {self._decode_memo_ttl}")
+
+        _logger.debug(f"Read ring")
+        _logger.debug(f"  - Size: {self._read_ring_size}")
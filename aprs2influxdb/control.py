@@ -0,0 +1,78 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+_logger = logging.getLogger(__name__)
+
+FILTER_ACK_TIMEOUT: float = 5.0
+
+
+class FilterControl:
+    """Changes the APRS-IS filter on the live connection"""
+
+    _apply: Callable[[str], None]
+    _current: Callable[[], str]
+
+    _condition: threading.Condition
+    _comments: list
+
+    def __init__(self, apply: Callable[[str], None], current: Callable[[], str]) -> None:
+        super().__init__()
+
+        self._apply = apply
+        self._current = current
+
+        self._condition = threading.Condition()
+        self._comments = []
+
+    def on_server_comment(self, text: str) -> None:
+        _logger.debug(f"Server comment: {text}")
+
+        with self._condition:
+            self._comments.append(text)
+            del self._comments[:-16]
+            self._condition.notify_all()
+
+    def set_filter(self, aprs_filter: str, timeout: float = FILTER_ACK_TIMEOUT) -> Optional[str]:
+        """Sends the filter command, returning the server acknowledgement if any
+        arrives within the timeout"""
+
+        with self._condition:
+            self._comments.clear()
+
+        _logger.info(f"Changing filter to: {aprs_filter}")
+        self._apply(aprs_filter)
+
+        deadline: float = time.monotonic() + timeout
+
+        with self._condition:
+            while True:
+                for comment in self._comments:
+                    if "filter" in comment.lower():
+                        return comment
+
+                remaining: float = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+
+                self._condition.wait(remaining)
+
+    def api_get_filter(self, _: dict) -> dict:
+        return {"filter": self._current()}
+
+    def api_set_filter(self, query: dict) -> dict:
+        body = query.get("body")
+        if not isinstance(body, dict) or not isinstance(body.get("filter"), str):
+            raise ValueError("Expected a JSON body like {\"filter\": \"r/39.2/9.1/50\"}")
+
+        aprs_filter: str = body.get("filter").strip()
+        if "\r" in aprs_filter or "\n" in aprs_filter:
+            raise ValueError("Filter must be a single line")
+
+        acknowledgement: Optional[str] = self.set_filter(aprs_filter)
+
+        return {
+            "filter": self._current(),
+            "acknowledgement": acknowledgement
+        }
@@ -0,0 +1,38 @@
+import json
+import logging
+import threading
+import time
+from typing import Optional
+
+_logger = logging.getLogger(__name__)
+
+
+class DeadLetter:
+    """Append-only file of rejected data, one JSON object per line"""
+
+    _lock: threading.Lock
+    _path: str
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+
+        self._lock = threading.Lock()
+        self._path = path
+
+    def write(self, reason: str, line: Optional[str] = None, raw: Optional[str] = None) -> None:
+        entry: dict = {
+            "time": time.time(),
+            "reason": reason
+        }
+
+        if line is not None:
+            entry["line"] = line
+        if raw is not None:
+            entry["raw"] = raw
+
+        try:
+            with self._lock:
+                with open(self._path, "a") as f:
+                    f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            _logger.error(f"Unable to write dead letter: {e}")
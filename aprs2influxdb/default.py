@@ -11,4 +11,78 @@ DEFAULT_INFLUXDB_TOKEN: str = ""
 DEFAULT_INFLUXDB_ORG: str = "aprs2influxdb"
 DEFAULT_INFLUXDB_BUCKET: str = "aprs2influxdb"
 
+DEFAULT_OUTPUT: str = "influxdb"
+DEFAULT_OUTPUT_HOST: str = "127.0.0.1"
+DEFAULT_OUTPUT_PORT: int = 8094
+DEFAULT_OUTPUT_MTU: int = 1400
+
+DEFAULT_ENRICHMENT_GEOHASH_PRECISION: int = 0
+DEFAULT_ENRICHMENT_LOCATOR_PRECISION: int = 0
+
+DEFAULT_ROLLUP_WINDOWS: list = []
+DEFAULT_ROLLUP_STATE_FILE: str = ""
+
+DEFAULT_STATION_TABLE_SIZE: int = 0
+DEFAULT_STATION_SNAPSHOT_FILE: str = ""
+DEFAULT_STATION_SNAPSHOT_INTERVAL: datetime.timedelta = datetime.timedelta(minutes=5)
+
+DEFAULT_API_HOST: str = "127.0.0.1"
+DEFAULT_API_PORT: int = 0
+
+DEFAULT_TAG_PROMOTION: dict = {}
+DEFAULT_TAG_CARDINALITY_LIMIT: int = 10000
+
+DEFAULT_WRITER_BATCH_SIZE_MIN: int = 1
+DEFAULT_WRITER_BATCH_SIZE_MAX: int = 5000
+DEFAULT_WRITER_FLUSH_INTERVAL_MIN: float = 0.1
+DEFAULT_WRITER_FLUSH_INTERVAL_MAX: float = 10.0
+DEFAULT_WRITER_LATENCY_TARGET: float = 0.5
+DEFAULT_WRITER_QUEUE_SIZE: int = 100000
+DEFAULT_WRITER_SPILL_FILE: str = ""
+
+DEFAULT_DEAD_LETTER_FILE: str = ""
+
+DEFAULT_SCHEMA_SEED: bool = False
+DEFAULT_SCHEMA_SEED_RANGE: str = "30d"
+
+DEFAULT_SHEDDING_LOW_WATERMARK: float = 0.5
+DEFAULT_SHEDDING_HIGH_WATERMARK: float = 0.9
+DEFAULT_SHEDDING_STATION_RATE: float = 0.0
+DEFAULT_SHEDDING_STATION_BURST: int = 30
+
+DEFAULT_TRAJECTORY_TOLERANCE: float = 0.0
+DEFAULT_TRAJECTORY_ANCHOR_INTERVAL: float = 300.0
+
+DEFAULT_MEMORY_SNAPSHOT_FILE: str = ""
+DEFAULT_MEMORY_SNAPSHOT_INTERVAL: datetime.timedelta = datetime.timedelta(minutes=60)
+
+DEFAULT_SHUTDOWN_TIMEOUT: float = 8.0
+
+DEFAULT_GEOFENCE_FILE: str = ""
+DEFAULT_GEOFENCE_NAME_PROPERTY: str = "name"
+DEFAULT_GEOFENCE_DROP_OUTSIDE: bool = False
+
+DEFAULT_HEAVY_HITTERS_WINDOW: str = ""
+DEFAULT_HEAVY_HITTERS_SIZE: int = 10
+
+DEFAULT_PARTITION_NODES: int = 1
+DEFAULT_PARTITION_INDEX: int = 0
+DEFAULT_PARTITION_TABLE_FILE: str = ""
+
+DEFAULT_ARCHIVE_DIRECTORY: str = ""
+
+DEFAULT_POSITION_INDEX_WINDOW: str = ""
+DEFAULT_POSITION_INDEX_FILE: str = ""
+DEFAULT_POSITION_INDEX_BATCH_SIZE: int = 1000
+
+DEFAULT_LIVE_SUBSCRIBERS: int = 0
+DEFAULT_LIVE_BUFFER_SIZE: int = 1000
+
+DEFAULT_DECODE_MEMO_SIZE: int = 0
+DEFAULT_DECODE_MEMO_TTL: str = "5m"
+
+DEFAULT_READ_RING_SIZE: int = 0
+
+DEFAULT_CONFIG_FILE: str = ""
+
 DEFAULT_DEBUG: bool = False
@@ -0,0 +1,274 @@
+import logging
+from typing import Optional
+
+from parser import TELEMETRY_FIELDS, WEATHER_FIELDS, Parser
+
+_logger = logging.getLogger(__name__)
+
+STEP_FIELD: str = "field"
+STEP_PATH: str = "path"
+STEP_TEXT: str = "text"
+STEP_TELEMETRY: str = "telemetry"
+STEP_WEATHER: str = "weather"
+
+# Steps of the parse method of each format, in the order they write fields
+ENCODER_STEPS: dict = {
+    "uncompressed": [(STEP_FIELD, key) for key in ["latitude", "longitude", "posambiguity", "altitude", "speed",
+                                                    "course", "from", "to", "messagecapable", "phg", "rng", "via"]] +
+                    [(STEP_PATH, "path")] +
+                    [(STEP_TEXT, key) for key in ["comment", "raw", "symbol", "symbol_table", "raw_timestamp"]] +
+                    [(STEP_TELEMETRY, None), (STEP_WEATHER, None)],
+    "mic-e": [(STEP_FIELD, key) for key in ["latitude", "longitude", "posambiguity", "altitude", "speed", "course",
+                                             "mbits", "from", "via", "to", "mtype", "daodatumbyte"]] +
+             [(STEP_PATH, "path")] +
+             [(STEP_TEXT, key) for key in ["comment", "raw", "symbol", "symbol_table"]],
+    "object": [(STEP_FIELD, key) for key in ["latitude", "longitude", "posambiguity", "speed", "course", "timestamp",
+                                              "altitude", "from", "alive", "via", "to", "object_format", "object_name",
+                                              "rng", "daodatumbyte"]] +
+              [(STEP_PATH, "path"), (STEP_TEXT, "comment"), (STEP_TELEMETRY, None)] +
+              [(STEP_TEXT, key) for key in ["raw", "symbol", "symbol_table", "raw_timestamp"]],
+    "status": [(STEP_FIELD, key) for key in ["timestamp", "from", "via", "to"]] +
+              [(STEP_PATH, "path"), (STEP_TELEMETRY, None)] +
+              [(STEP_TEXT, key) for key in ["status", "raw", "raw_timestamp"]],
+    "compressed": [(STEP_FIELD, key) for key in ["latitude", "longitude", "gpsfixstatus", "altitude", "speed",
+                                                  "course", "timestamp", "from", "to", "messagecapable", "phg", "via"]] +
+                  [(STEP_PATH, "path"), (STEP_TEXT, "comment"), (STEP_TELEMETRY, None), (STEP_WEATHER, None)] +
+                  [(STEP_TEXT, key) for key in ["raw", "symbol", "symbol_table"]],
+    "wx": [(STEP_FIELD, key) for key in ["from", "to", "via"]] +
+          [(STEP_PATH, "path")] +
+          [(STEP_TEXT, key) for key in ["comment", "raw", "wx_raw_timestamp"]] +
+          [(STEP_WEATHER, None)],
+    "beacon": [(STEP_FIELD, key) for key in ["from", "to", "via"]] +
+              [(STEP_PATH, "path")] +
+              [(STEP_TEXT, key) for key in ["text", "raw"]],
+    "bulletin": [(STEP_FIELD, key) for key in ["bid", "from", "to", "via"]] +
+                [(STEP_PATH, "path")] +
+                [(STEP_TEXT, key) for key in ["message_text", "identifier", "raw"]],
+    "message": [(STEP_FIELD, key) for key in ["msgNo", "from", "to", "via", "addresse"]] +
+               [(STEP_PATH, "path")] +
+               [(STEP_TEXT, key) for key in ["message_text", "response", "raw"]]
+}
+
+# Groups of fewer packets are faster to encode one packet at a time
+ENCODER_GROUP_MIN: int = 8
+
+# Formats whose parse method adds the position tags
+ENCODER_POSITION_FORMATS: set = {"uncompressed", "mic-e", "object", "compressed"}
+
+# Marks the keys missing from a packet, None being a value
+_ABSENT = object()
+
+# Marks the values of unexpected types, left to the parser
+_IRREGULAR = object()
+
+
+class BatchEncoder:
+    """Converts batches of packets to line protocol a column at a time
+
+    Packets are grouped by format and every field of a group is formatted in
+    one pass over the group: numbers and strings are checked against their
+    pinned type once per column, and strings without characters to escape
+    are written as they are. Fields are then joined in the order of the parse
+    method of the format, so lines are identical to those of the parser.
+
+    Packets of other formats, e.g. telemetry equations which change how the
+    following packets are scaled, are handed to the parser in order between
+    groups. So are the formats with promoted tags, whose cardinality guard
+    depends on the order of the packets, and the packets with values of
+    unexpected types, so that their rejection is accounted as before.
+
+    keyword arguments:
+    parser -- parser whose schema registry, enrichment and telemetry equations are used
+    """
+
+    _parser: Parser
+
+    def __init__(self, parser: Parser) -> None:
+        super().__init__()
+
+        self._parser = parser
+
+    def encode(self, packets: list) -> list:
+        """Returns the line of each packet, None where the parser returns none"""
+
+        lines: list = [None] * len(packets)
+        groups: dict = {}
+
+        for index, packet in enumerate(packets):
+            packet_format = packet.get("format")
+
+            if packet_format in ENCODER_STEPS and not self._parser.promoted_keys(packet_format):
+                groups.setdefault(packet_format, []).append(index)
+                continue
+
+            self._encode_groups(packets, groups, lines)
+            groups = {}
+
+            lines[index] = self._parser.json_to_line_protocol(packet)
+
+        self._encode_groups(packets, groups, lines)
+
+        return lines
+
+    def _encode_groups(self, packets: list, groups: dict, lines: list) -> None:
+        for packet_format, indexes in groups.items():
+            if len(indexes) < ENCODER_GROUP_MIN:
+                for index in indexes:
+                    lines[index] = self._parser.json_to_line_protocol(packets[index])
+                continue
+
+            group_lines: list = self.encode_group(packet_format, [packets[index] for index in indexes])
+
+            for index, line in zip(indexes, group_lines):
+                lines[index] = line
+
+    def encode_group(self, packet_format: str, packets: list) -> list:
+        """Returns the lines of packets of one format"""
+
+        steps: list = ENCODER_STEPS[packet_format]
+
+        # Rows left to the parser, found before any field goes through the schema registry
+        fallback: set = set()
+
+        tags: list = self._tags(packet_format, packets, fallback)
+
+        columns: dict = {}
+        telemetry: list = []
+        weather: list = []
+
+        for kind, key in steps:
+            if kind == STEP_PATH:
+                columns[key] = BatchEncoder._path_column(packets, fallback)
+            elif kind == STEP_TEXT:
+                columns[key] = BatchEncoder._text_column(key, packets, fallback)
+            elif kind == STEP_TELEMETRY:
+                telemetry = self._telemetry_rows(packets, fallback)
+            elif kind == STEP_WEATHER:
+                weather = BatchEncoder._weather_rows(packets, fallback)
+
+        # Columns of fields no packet of the group has are left out
+        cells: list = []
+
+        for kind, key in steps:
+            if kind == STEP_FIELD:
+                values: list = [packet.get(key, _ABSENT) for packet in packets]
+                for index in fallback:
+                    values[index] = _ABSENT
+
+                if values.count(_ABSENT) < len(values):
+                    cells.append(self._parser.schema.format_column(key, values, _ABSENT))
+            elif kind == STEP_TELEMETRY:
+                cells.extend(self._row_columns(TELEMETRY_FIELDS, telemetry))
+            elif kind == STEP_WEATHER:
+                cells.extend(self._row_columns(WEATHER_FIELDS, weather))
+            else:
+                cells.append(columns[key])
+
+        lines: list = []
+
+        for index, row in enumerate(zip(*cells)):
+            if index in fallback:
+                lines.append(self._parser.json_to_line_protocol(packets[index]))
+                continue
+
+            lines.append("packet," + tags[index] + " " + ",".join([cell for cell in row if cell is not None]))
+
+        return lines
+
+    def _row_columns(self, fields: list, rows: list) -> list:
+        keys: set = set().union(*rows)
+
+        return [self._parser.schema.format_column(field, [row.get(field, _ABSENT) for row in rows], _ABSENT)
+                for field in fields if field in keys]
+
+    def _tags(self, packet_format: str, packets: list, fallback: set) -> list:
+        tag: str = "format=" + packet_format
+
+        if packet_format not in ENCODER_POSITION_FORMATS:
+            return [tag] * len(packets)
+
+        tags: list = []
+
+        for index, packet in enumerate(packets):
+            try:
+                tags.append(",".join(self._parser.parse_position_tags(packet, [tag])))
+            except Exception:
+                fallback.add(index)
+                tags.append(tag)
+
+        return tags
+
+    def _telemetry_rows(self, packets: list, fallback: set) -> list:
+        rows: list = []
+
+        for index, packet in enumerate(packets):
+            if index in fallback or "telemetry" not in packet:
+                rows.append({})
+                continue
+
+            try:
+                rows.append(self._parser.telemetry_values(packet))
+            except Exception:
+                fallback.add(index)
+                rows.append({})
+
+        return rows
+
+    @staticmethod
+    def _weather_rows(packets: list, fallback: set) -> list:
+        rows: list = []
+
+        for index, packet in enumerate(packets):
+            items = packet.get("weather", {}) if index not in fallback else {}
+
+            if type(items) is not dict:
+                fallback.add(index)
+                items = {}
+
+            rows.append(items)
+
+        return rows
+
+    @staticmethod
+    def _path_column(packets: list, fallback: set) -> list:
+        column: list = []
+
+        for index, packet in enumerate(packets):
+            if "path" not in packet:
+                column.append(None)
+                continue
+
+            try:
+                column.append(Parser.parse_path(packet["path"]))
+            except Exception:
+                fallback.add(index)
+                column.append(None)
+
+        return column
+
+    @staticmethod
+    def _text_column(key: str, packets: list, fallback: set) -> list:
+        prefix: str = key + "=\""
+
+        column: list = [prefix + value + "\"" if type(value) is str and value and "\\" not in value and
+                        "'" not in value and "\"" not in value and "\n" not in value and "\r" not in value
+                        else BatchEncoder._text(key, value)
+                        for value in [packet.get(key, _ABSENT) for packet in packets]]
+
+        if _IRREGULAR in column:
+            for index, cell in enumerate(column):
+                if cell is _IRREGULAR:
+                    fallback.add(index)
+                    column[index] = None
+
+        return column
+
+    @staticmethod
+    def _text(key: str, value) -> Optional[str]:
+        if value is _ABSENT or value == "":
+            return None
+
+        if type(value) is not str:
+            return _IRREGULAR
+
+        return Parser.parse_text_string(value, key)
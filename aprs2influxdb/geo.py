@@ -0,0 +1,137 @@
+import logging
+import math
+
+_logger = logging.getLogger(__name__)
+
+GEOHASH_ALPHABET: str = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+EARTH_RADIUS: float = 6371008.8
+
+
+def geohash(latitude: float, longitude: float, precision: int) -> str:
+    """Encodes a position into a geohash string
+
+    Interleaves longitude and latitude bisection bits, five bits per base32
+    character, starting from longitude. Returns an empty string if precision
+    is not positive.
+
+    keyword arguments:
+    latitude -- latitude in decimal degrees
+    longitude -- longitude in decimal degrees
+    precision -- number of geohash characters
+    """
+
+    lat_min, lat_max = -90.0, 90.0
+    lon_min, lon_max = -180.0, 180.0
+
+    chars: list = []
+    bit: int = 0
+    value: int = 0
+    even: bool = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_min + lon_max) / 2
+            if longitude >= mid:
+                value = (value << 1) | 1
+                lon_min = mid
+            else:
+                value = value << 1
+                lon_max = mid
+        else:
+            mid = (lat_min + lat_max) / 2
+            if latitude >= mid:
+                value = (value << 1) | 1
+                lat_min = mid
+            else:
+                value = value << 1
+                lat_max = mid
+
+        even = not even
+        bit += 1
+
+        if bit == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bit = 0
+            value = 0
+
+    return "".join(chars)
+
+
+def maidenhead(latitude: float, longitude: float, precision: int) -> str:
+    """Encodes a position into a Maidenhead locator
+
+    Precision is the number of character pairs: 1 gives the field (JM), 2 the
+    square (JM49), 3 the subsquare (JM49rj) and 4 the extended square
+    (JM49rj45). Returns an empty string if precision is not positive.
+
+    keyword arguments:
+    latitude -- latitude in decimal degrees
+    longitude -- longitude in decimal degrees
+    precision -- number of locator character pairs (up to 4)
+    """
+
+    # Shift to positive ranges and clamp the upper edges inside the grid
+    lon: float = min(max(longitude + 180.0, 0.0), 359.999999)
+    lat: float = min(max(latitude + 90.0, 0.0), 179.999999)
+
+    locator: str = ""
+
+    for pair in range(min(precision, 4)):
+        if pair == 0:
+            lon_size, lat_size = 20.0, 10.0
+            base = "A"
+        elif pair == 1:
+            lon_size, lat_size = 2.0, 1.0
+            base = "0"
+        elif pair == 2:
+            lon_size, lat_size = 2.0 / 24, 1.0 / 24
+            base = "a"
+        else:
+            lon_size, lat_size = 2.0 / 240, 1.0 / 240
+            base = "0"
+
+        lon_index = int(lon // lon_size)
+        lat_index = int(lat // lat_size)
+
+        locator += chr(ord(base) + lon_index) + chr(ord(base) + lat_index)
+
+        lon -= lon_index * lon_size
+        lat -= lat_index * lat_size
+
+    return locator
+
+
+def distance(latitude_a: float, longitude_a: float, latitude_b: float, longitude_b: float) -> float:
+    """Great circle distance in meters between two positions, by the haversine formula"""
+
+    phi_a: float = math.radians(latitude_a)
+    phi_b: float = math.radians(latitude_b)
+    delta_phi: float = phi_b - phi_a
+    delta_lambda: float = math.radians(longitude_b - longitude_a)
+
+    h: float = math.sin(delta_phi / 2) ** 2 + math.cos(phi_a) * math.cos(phi_b) * math.sin(delta_lambda / 2) ** 2
+
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(h)))
+
+
+def destination(latitude: float, longitude: float, bearing: float, length: float) -> tuple:
+    """Position reached moving from a position along a great circle
+
+    keyword arguments:
+    latitude -- starting latitude in decimal degrees
+    longitude -- starting longitude in decimal degrees
+    bearing -- initial bearing in degrees, clockwise from north
+    length -- distance in meters
+    """
+
+    phi: float = math.radians(latitude)
+    lam: float = math.radians(longitude)
+    theta: float = math.radians(bearing)
+    delta: float = length / EARTH_RADIUS
+
+    phi_end: float = math.asin(math.sin(phi) * math.cos(delta) + math.cos(phi) * math.sin(delta) * math.cos(theta))
+    lam_end: float = lam + math.atan2(math.sin(theta) * math.sin(delta) * math.cos(phi),
+                                      math.cos(delta) - math.sin(phi) * math.sin(phi_end))
+
+    return math.degrees(phi_end), (math.degrees(lam_end) + 540) % 360 - 180
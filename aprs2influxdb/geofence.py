@@ -0,0 +1,193 @@
+import json
+import logging
+import math
+from typing import Optional
+
+from utils import LRUCache
+
+_logger = logging.getLogger(__name__)
+
+GEOFENCE_CELL_SIZE: float = 0.5
+GEOFENCE_CACHE_SIZE: int = 65536
+
+# Average number of edges starting in a latitude band of a polygon
+EDGES_PER_BAND: int = 4
+
+
+class Polygon:
+    """Polygon with holes, indexed for point-in-polygon tests
+
+    Edges are bucketed by latitude band, so the ray casting test of a point
+    only crosses the few edges of its band instead of every vertex. Bands are
+    sized by the number of edges, keeping a handful of edges in each.
+    """
+
+    name: str
+    bbox: tuple
+    edges: list
+
+    _band_size: float
+    _bands: dict
+
+    def __init__(self, name: str, rings: list) -> None:
+        super().__init__()
+
+        self.name = name
+        self.edges = []
+        self._bands = {}
+
+        for ring in rings:
+            for start, end in zip(ring, ring[1:] + ring[:1]):
+                if start != end:
+                    self.edges.append((float(start[0]), float(start[1]), float(end[0]), float(end[1])))
+
+        longitudes: list = [edge[0] for edge in self.edges]
+        latitudes: list = [edge[1] for edge in self.edges]
+        self.bbox = (min(longitudes), min(latitudes), max(longitudes), max(latitudes))
+
+        bands: int = max(1, len(self.edges) // EDGES_PER_BAND)
+        self._band_size = max(self.bbox[3] - self.bbox[1], 1e-9) / bands
+
+        for x1, y1, x2, y2 in self.edges:
+            if y1 == y2:
+                continue
+
+            for band in range(self._band(min(y1, y2)), self._band(max(y1, y2)) + 1):
+                self._bands.setdefault(band, []).append((x1, y1, x2, y2))
+
+    def contains(self, longitude: float, latitude: float) -> bool:
+        if not (self.bbox[0] <= longitude <= self.bbox[2] and self.bbox[1] <= latitude <= self.bbox[3]):
+            return False
+
+        inside: bool = False
+
+        # Even-odd rule: holes are crossed like the outer ring
+        for x1, y1, x2, y2 in self._bands.get(self._band(latitude), ()):
+            if (y1 > latitude) != (y2 > latitude):
+                if longitude < x1 + (latitude - y1) * (x2 - x1) / (y2 - y1):
+                    inside = not inside
+
+        return inside
+
+    def _band(self, latitude: float) -> int:
+        return math.floor((latitude - self.bbox[1]) / self._band_size)
+
+
+class Geofence:
+    """Regions defined by polygons, looked up through a grid index
+
+    Each grid cell lists the polygons overlapping it, so a lookup only tests
+    the polygons near the point. Cells crossed by no edge of a polygon lie
+    entirely inside or outside it: the former are marked as such and answered
+    without any test, the latter are left out. Where regions overlap, the
+    first one in the file wins. Lookups of packets are cached per station and
+    only repeated when the station moves.
+
+    keyword arguments:
+    polygons -- list of Polygon
+    cell_size -- grid cell size in degrees
+    """
+
+    _cell_size: float
+    _grid: dict
+    _cache: LRUCache
+
+    def __init__(self, polygons: list, cell_size: float = GEOFENCE_CELL_SIZE) -> None:
+        super().__init__()
+
+        self._cell_size = cell_size
+        self._grid = {}
+        self._cache = LRUCache(GEOFENCE_CACHE_SIZE)
+
+        for polygon in polygons:
+            self._index(polygon)
+
+    @staticmethod
+    def load(path: str, name_property: str = "name", cell_size: float = GEOFENCE_CELL_SIZE) -> "Geofence":
+        """Loads Polygon and MultiPolygon features from a GeoJSON file, naming
+        regions after the given feature property"""
+
+        with open(path, "r") as f:
+            document: dict = json.load(f)
+
+        if document.get("type") == "FeatureCollection":
+            features: list = document.get("features", [])
+        elif document.get("type") == "Feature":
+            features = [document]
+        else:
+            features = [{"type": "Feature", "geometry": document, "properties": {}}]
+
+        polygons: list = []
+
+        for index, feature in enumerate(features):
+            properties: dict = feature.get("properties") or {}
+            name: str = str(properties.get(name_property, feature.get("id", f"region{index}")))
+
+            geometry: dict = feature.get("geometry") or {}
+            if geometry.get("type") == "Polygon":
+                polygons.append(Polygon(name, geometry.get("coordinates")))
+            elif geometry.get("type") == "MultiPolygon":
+                for rings in geometry.get("coordinates"):
+                    polygons.append(Polygon(name, rings))
+            else:
+                _logger.warning(f"Skipping region {name}: unsupported geometry {geometry.get('type')}")
+
+        _logger.info(f"Loaded {len(polygons)} polygons from {path}")
+
+        return Geofence(polygons, cell_size)
+
+    def region(self, latitude: float, longitude: float) -> Optional[str]:
+        for polygon, inside in self._grid.get((self._cell(longitude), self._cell(latitude)), ()):
+            if inside or polygon.contains(longitude, latitude):
+                return polygon.name
+
+        return None
+
+    def region_of(self, packet: dict) -> Optional[str]:
+        """Region of a packet position, None if outside every region or
+        without position"""
+
+        latitude = packet.get("latitude")
+        longitude = packet.get("longitude")
+        if latitude is None or longitude is None:
+            return None
+
+        # Objects are positioned on their own, so cache them by name
+        station: tuple = (packet.get("from"), packet.get("object_name"))
+
+        cached: Optional[tuple] = self._cache.get(station)
+        if cached and cached[0] == latitude and cached[1] == longitude:
+            return cached[2]
+
+        region: Optional[str] = self.region(latitude, longitude)
+        self._cache.put(station, (latitude, longitude, region))
+
+        return region
+
+    def outside(self, packet: dict) -> bool:
+        """Whether a packet has a position outside every region"""
+
+        if packet.get("latitude") is None or packet.get("longitude") is None:
+            return False
+
+        return self.region_of(packet) is None
+
+    def _index(self, polygon: Polygon) -> None:
+        boundary: set = set()
+
+        for x1, y1, x2, y2 in polygon.edges:
+            for x in range(self._cell(min(x1, x2)), self._cell(max(x1, x2)) + 1):
+                for y in range(self._cell(min(y1, y2)), self._cell(max(y1, y2)) + 1):
+                    boundary.add((x, y))
+
+        min_x, min_y, max_x, max_y = (self._cell(value) for value in polygon.bbox)
+
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                if (x, y) in boundary:
+                    self._grid.setdefault((x, y), []).append((polygon, False))
+                elif polygon.contains((x + 0.5) * self._cell_size, (y + 0.5) * self._cell_size):
+                    self._grid.setdefault((x, y), []).append((polygon, True))
+
+    def _cell(self, degrees: float) -> int:
+        return math.floor(degrees / self._cell_size)
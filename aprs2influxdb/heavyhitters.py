@@ -0,0 +1,242 @@
+import datetime
+import heapq
+import logging
+import threading
+import time
+from typing import Optional
+
+from parser import Parser
+from rollup import Rollup
+
+_logger = logging.getLogger(__name__)
+
+HEAVY_HITTERS_PANES: int = 4
+
+# Items counted per top entry, the more the smaller the error
+HEAVY_HITTERS_CAPACITY_FACTOR: int = 10
+
+DIMENSION_STATION: str = "station"
+DIMENSION_IGATE: str = "igate"
+DIMENSION_DESTINATION: str = "to"
+
+
+class SpaceSaving:
+    """Space-Saving sketch of the most frequent items
+
+    At most capacity items are counted. A new item takes the place of the
+    least counted one, inheriting its count as error, so counts are over
+    estimated by at most the error and every item more frequent than
+    total / capacity is guaranteed to be kept. The least counted item is
+    found through a heap whose stale entries are skipped and periodically
+    pruned.
+    """
+
+    capacity: int
+
+    _counts: dict
+    _heap: list
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__()
+
+        self.capacity = capacity
+
+        self._counts = {}
+        self._heap = []
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, item: str) -> None:
+        entry: Optional[list] = self._counts.get(item)
+
+        if entry:
+            entry[0] += 1
+        elif len(self._counts) < self.capacity:
+            entry = [1, 0]
+            self._counts[item] = entry
+        else:
+            count, evicted = self._pop_min()
+            del self._counts[evicted]
+
+            entry = [count + 1, count]
+            self._counts[item] = entry
+
+        heapq.heappush(self._heap, (entry[0], item))
+
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, (count, _) in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def items(self) -> list:
+        """Returns (item, count, error) tuples"""
+
+        return [(item, count, error) for item, (count, error) in self._counts.items()]
+
+    def _pop_min(self) -> tuple:
+        while True:
+            count, item = heapq.heappop(self._heap)
+
+            entry: Optional[list] = self._counts.get(item)
+            if entry and entry[0] == count:
+                return count, item
+
+
+class HeavyHitters:
+    """Approximate top stations, igates and destinations over a sliding window
+
+    The window is split in panes, each one with a Space-Saving sketch per
+    dimension. Tops merge the panes of the window, and when a pane closes the
+    tops are returned as heavy_hitters lines, one per rank so that series
+    stay few.
+
+    keyword arguments:
+    window -- sliding window length
+    size -- number of top items reported per dimension
+    """
+
+    _window: int
+    _pane_size: int
+    _size: int
+    _capacity: int
+
+    _lock: threading.Lock
+    _panes: list
+    _pane_start: Optional[int]
+
+    def __init__(self, window: datetime.timedelta, size: int) -> None:
+        super().__init__()
+
+        self._window = int(window.total_seconds())
+        self._pane_size = max(1, self._window // HEAVY_HITTERS_PANES)
+        self._size = size
+        self._capacity = size * HEAVY_HITTERS_CAPACITY_FACTOR
+
+        self._lock = threading.Lock()
+        self._panes = []
+        self._pane_start = None
+
+    @property
+    def label(self) -> str:
+        for unit, seconds in [("d", 86400), ("h", 3600), ("m", 60)]:
+            if self._window % seconds == 0:
+                return f"{self._window // seconds}{unit}"
+
+        return f"{self._window}s"
+
+    def add(self, packet: dict, now: Optional[datetime.datetime] = None) -> list:
+        """Counts a packet, returning the lines of the tops if a pane closed"""
+
+        timestamp: int = HeavyHitters._timestamp(now)
+
+        with self._lock:
+            lines: list = self._rotate(timestamp)
+            pane: dict = self._panes[-1][1]
+
+            for dimension, item in HeavyHitters._dimensions(packet):
+                pane[dimension].add(item)
+
+        return lines
+
+    def tick(self, now: Optional[datetime.datetime] = None) -> list:
+        """Returns the lines of the tops if a pane has been closed by the clock"""
+
+        timestamp: int = HeavyHitters._timestamp(now)
+
+        with self._lock:
+            return self._rotate(timestamp)
+
+    def flush(self) -> list:
+        """Returns the lines of the current tops, used on shutdown"""
+
+        timestamp: int = HeavyHitters._timestamp(None)
+
+        with self._lock:
+            return self._lines(timestamp)
+
+    def top(self) -> dict:
+        """Returns the tops per dimension, as lists of (item, count, error)"""
+
+        with self._lock:
+            return self._top()
+
+    def api_top(self, _: dict) -> dict:
+        return {
+            "window": self.label,
+            "top": {
+                dimension: [{"key": item, "count": count, "error": error} for item, count, error in items]
+                for dimension, items in self.top().items()
+            }
+        }
+
+    def _top(self) -> dict:
+        tops: dict = {}
+
+        for dimension in [DIMENSION_STATION, DIMENSION_IGATE, DIMENSION_DESTINATION]:
+            merged: dict = {}
+
+            for _, pane in self._panes:
+                for item, count, error in pane[dimension].items():
+                    total: list = merged.setdefault(item, [0, 0])
+                    total[0] += count
+                    total[1] += error
+
+            ranked: list = sorted(merged.items(), key=lambda entry: entry[1][0], reverse=True)
+            tops[dimension] = [(item, count, error) for item, (count, error) in ranked[:self._size]]
+
+        return tops
+
+    def _rotate(self, timestamp: int) -> list:
+        pane_start: int = timestamp - timestamp % self._pane_size
+
+        if self._pane_start == pane_start:
+            return []
+
+        lines: list = []
+        if self._pane_start is not None:
+            lines = self._lines(pane_start)
+
+        self._pane_start = pane_start
+        self._panes = [(start, pane) for start, pane in self._panes if start > pane_start - self._window]
+        self._panes.append((pane_start, {
+            DIMENSION_STATION: SpaceSaving(self._capacity),
+            DIMENSION_IGATE: SpaceSaving(self._capacity),
+            DIMENSION_DESTINATION: SpaceSaving(self._capacity)
+        }))
+
+        return lines
+
+    def _lines(self, timestamp: int) -> list:
+        lines: list = []
+        label: str = self.label
+
+        for dimension, items in self._top().items():
+            for rank, (item, count, error) in enumerate(items, start=1):
+                key: str = Parser.parse_text_string(item, "key")
+                lines.append(f"heavy_hitters,dimension={dimension},window={label},rank={rank} "
+                             f"{key},count={count}i,error={error}i {timestamp * 1000000000}")
+
+        return lines
+
+    @staticmethod
+    def _timestamp(now: Optional[datetime.datetime]) -> int:
+        if now:
+            return int(now.timestamp())
+
+        return int(time.time())
+
+    @staticmethod
+    def _dimensions(packet: dict) -> list:
+        dimensions: list = []
+
+        if packet.get("from"):
+            dimensions.append((DIMENSION_STATION, packet.get("from")))
+
+        igate: Optional[str] = Rollup.get_igate(packet)
+        if igate:
+            dimensions.append((DIMENSION_IGATE, igate))
+
+        if packet.get("to"):
+            dimensions.append((DIMENSION_DESTINATION, packet.get("to")))
+
+        return dimensions
@@ -0,0 +1,285 @@
+import collections
+import fnmatch
+import json
+import logging
+import re
+import threading
+from typing import Optional
+
+from api import APIError
+from metrics import Metrics
+from station import StationTable
+
+_logger = logging.getLogger(__name__)
+
+# Seconds without events after which a comment is sent, detecting closed connections
+LIVE_KEEPALIVE_INTERVAL: float = 15.0
+
+
+class Subscriber:
+    """Live feed client, with its filter and its buffer of pending events
+
+    The buffer is a bounded deque: when the client falls behind, the oldest
+    events are dropped for the new ones, so the publisher never waits.
+
+    keyword arguments:
+    formats -- packet formats passed, all if empty
+    callsigns -- callsign patterns passed, like N0CALL-*, all if empty
+    bbox -- (min_lat, min_lon, max_lat, max_lon) passing the positions in the box, or None
+    size -- events buffered
+    """
+
+    formats: set
+    bbox: Optional[tuple]
+    dropped: int
+
+    _callsigns: Optional[re.Pattern]
+    _events: collections.deque
+    _ready: threading.Event
+
+    def __init__(self, formats: set, callsigns: list, bbox: Optional[tuple], size: int) -> None:
+        super().__init__()
+
+        self.formats = formats
+        self.bbox = bbox
+        self.dropped = 0
+
+        self._callsigns = None
+        if callsigns:
+            self._callsigns = re.compile("|".join(fnmatch.translate(pattern.upper()) for pattern in callsigns))
+
+        self._events = collections.deque(maxlen=size)
+        self._ready = threading.Event()
+
+    def matches(self, packet: dict) -> bool:
+        if self.formats and packet.get("format") not in self.formats:
+            return False
+
+        if self._callsigns and not self._callsigns.match((StationTable.get_callsign(packet) or "").upper()):
+            return False
+
+        if self.bbox:
+            latitude = packet.get("latitude")
+            longitude = packet.get("longitude")
+            if latitude is None or longitude is None:
+                return False
+
+            min_latitude, min_longitude, max_latitude, max_longitude = self.bbox
+            if not min_latitude <= latitude <= max_latitude:
+                return False
+
+            # A box whose minimum longitude is above its maximum crosses the antimeridian
+            if min_longitude <= max_longitude:
+                return min_longitude <= longitude <= max_longitude
+
+            return longitude >= min_longitude or longitude <= max_longitude
+
+        return True
+
+    def push(self, events: list) -> int:
+        """Buffers events, returning how many older ones were dropped"""
+
+        dropped: int = max(0, len(self._events) + len(events) - self._events.maxlen)
+
+        self._events.extend(events)
+        self._ready.set()
+
+        self.dropped += dropped
+
+        return dropped
+
+    def wait(self, timeout: float) -> list:
+        """Returns the buffered events, waiting up to timeout for some"""
+
+        if not self._events:
+            self._ready.wait(timeout)
+
+        self._ready.clear()
+
+        events: list = []
+        while self._events:
+            events.append(self._events.popleft())
+
+        return events
+
+    def wake(self) -> None:
+        self._ready.set()
+
+
+class LiveFeed:
+    """Fan-out of parsed packets to Server-Sent Events subscribers
+
+    Each read of the feed is published at once: a packet is serialized only
+    if some subscriber passes it, and each subscriber is woken once per read.
+    Subscribers are kept in a tuple replaced on change, so publishing takes
+    no lock, and their buffers drop the oldest events of slow clients.
+
+    keyword arguments:
+    max_subscribers -- subscribers served at once
+    buffer_size -- events buffered per subscriber
+    metrics -- metrics registry
+    """
+
+    _max_subscribers: int
+    _buffer_size: int
+    _metrics: Optional[Metrics]
+
+    _lock: threading.Lock
+    _subscribers: tuple
+    _closed: bool
+
+    def __init__(self, max_subscribers: int, buffer_size: int, metrics: Optional[Metrics] = None) -> None:
+        super().__init__()
+
+        self._max_subscribers = max_subscribers
+        self._buffer_size = buffer_size
+        self._metrics = metrics
+
+        self._lock = threading.Lock()
+        self._subscribers = ()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, packets: list, lines: list) -> None:
+        """Hands parsed packets, with their line protocol, to the subscribers
+        passing them. Packets without a line were not parsed and are skipped."""
+
+        subscribers: tuple = self._subscribers
+        if not subscribers:
+            return
+
+        events: dict = {}
+        batches: dict = {}
+
+        for index, (packet, line) in enumerate(zip(packets, lines)):
+            if not line:
+                continue
+
+            for subscriber in subscribers:
+                if not subscriber.matches(packet):
+                    continue
+
+                event: Optional[str] = events.get(index)
+                if event is None:
+                    event = LiveFeed._event(packet, line)
+                    events[index] = event
+
+                batches.setdefault(subscriber, []).append(event)
+
+        dropped: int = 0
+        for subscriber, batch in batches.items():
+            dropped += subscriber.push(batch)
+
+        if self._metrics:
+            self._metrics.increment("live_events", sum(len(batch) for batch in batches.values()))
+            if dropped:
+                self._metrics.increment("live_dropped", dropped)
+
+    def subscribe(self, query: dict) -> Subscriber:
+        formats: set = {value for value in query.get("format", "").split(",") if value}
+        callsigns: list = [value for value in query.get("callsign", "").split(",") if value]
+
+        bbox: Optional[tuple] = None
+        if query.get("bbox"):
+            values: list = [float(value) for value in query.get("bbox").split(",")]
+            if len(values) != 4:
+                raise ValueError("Invalid bbox, expected min_lat,min_lon,max_lat,max_lon")
+            bbox = tuple(values)
+
+        subscriber: Subscriber = Subscriber(formats, callsigns, bbox, self._buffer_size)
+
+        with self._lock:
+            if self._closed:
+                raise APIError(503, "Live feed closed")
+
+            if len(self._subscribers) >= self._max_subscribers:
+                raise APIError(503, "Too many live subscribers")
+
+            self._subscribers = self._subscribers + (subscriber,)
+            self._update_metrics()
+
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers = tuple(item for item in self._subscribers if item is not subscriber)
+            self._update_metrics()
+
+    def close(self) -> None:
+        """Ends the streams of every subscriber"""
+
+        with self._lock:
+            self._closed = True
+            subscribers: tuple = self._subscribers
+
+        for subscriber in subscribers:
+            subscriber.wake()
+
+    def api_live(self, query: dict) -> "LiveStream":
+        """Server-Sent Events stream of the packets passing the filter of the query"""
+
+        return LiveStream(self, self.subscribe(query))
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _update_metrics(self) -> None:
+        if self._metrics:
+            self._metrics.set("live_subscribers", len(self._subscribers))
+
+    @staticmethod
+    def _event(packet: dict, line: str) -> str:
+        data: str = json.dumps({"packet": packet, "line": line}, default=str)
+
+        return f"event: packet\ndata: {data}\n\n"
+
+
+class LiveStream:
+    """Server-Sent Events of a subscriber, as written to its connection
+
+    Comments are sent when no event comes for a while, so that closed
+    connections are detected. Closing the stream unsubscribes.
+
+    keyword arguments:
+    feed -- live feed subscribed to
+    subscriber -- subscriber of the stream
+    """
+
+    _feed: LiveFeed
+    _subscriber: Subscriber
+    _started: bool
+
+    def __init__(self, feed: LiveFeed, subscriber: Subscriber) -> None:
+        super().__init__()
+
+        self._feed = feed
+        self._subscriber = subscriber
+        self._started = False
+
+    def __iter__(self) -> "LiveStream":
+        return self
+
+    def __next__(self) -> str:
+        if not self._started:
+            self._started = True
+            return "retry: 5000\n\n"
+
+        if self._feed.closed:
+            raise StopIteration
+
+        events: list = self._subscriber.wait(LIVE_KEEPALIVE_INTERVAL)
+
+        if self._subscriber.dropped:
+            events.insert(0, f"event: dropped\ndata: {self._subscriber.dropped}\n\n")
+            self._subscriber.dropped = 0
+
+        if not events:
+            return ": keepalive\n\n"
+
+        return "".join(events)
+
+    def close(self) -> None:
+        self._feed.unsubscribe(self._subscriber)
@@ -6,6 +6,10 @@ import signal
 from aprs2influxdb import APRS2InfluxDB
 from config import ConfigParams
 from default import *
+from partition import apply_partition
+from pipelines import Pipelines, load_pipelines
+from sinks import OUTPUTS
+from utils import parse_tag_promotion
 
 
 def parse_command_line():
@@ -50,6 +54,224 @@ def parse_command_line():
                              default=os.environ.get("APRS_HEARTBEAT_INTERVAL",
                                                     str(DEFAULT_APRS_HEARTBEAT_INTERVAL.seconds / 60)))
 
+    args_parser.add_argument("--enrichment-geohash-precision",
+                             help="Set geohash tag precision for positions (0 to disable)",
+                             default=os.environ.get("ENRICHMENT_GEOHASH_PRECISION",
+                                                    str(DEFAULT_ENRICHMENT_GEOHASH_PRECISION)))
+
+    args_parser.add_argument("--enrichment-locator-precision",
+                             help="Set Maidenhead locator tag precision in pairs for positions (0 to disable)",
+                             default=os.environ.get("ENRICHMENT_LOCATOR_PRECISION",
+                                                    str(DEFAULT_ENRICHMENT_LOCATOR_PRECISION)))
+
+    args_parser.add_argument("--rollup-windows",
+                             help="Set comma separated rollup windows, like 1m,1h (empty to disable)",
+                             default=os.environ.get("ROLLUP_WINDOWS", ",".join(DEFAULT_ROLLUP_WINDOWS)))
+
+    args_parser.add_argument("--rollup-state-file",
+                             help="Set file used to persist partial rollup windows across restarts",
+                             default=os.environ.get("ROLLUP_STATE_FILE", DEFAULT_ROLLUP_STATE_FILE))
+
+    args_parser.add_argument("--station-table-size",
+                             help="Set maximum number of stations kept in the last-known-state table (0 to disable)",
+                             default=os.environ.get("STATION_TABLE_SIZE", str(DEFAULT_STATION_TABLE_SIZE)))
+
+    args_parser.add_argument("--station-snapshot-file",
+                             help="Set file used to snapshot the station table for warm restarts",
+                             default=os.environ.get("STATION_SNAPSHOT_FILE", DEFAULT_STATION_SNAPSHOT_FILE))
+
+    args_parser.add_argument("--station-snapshot-interval",
+                             help="Set station table snapshot interval in minutes",
+                             default=os.environ.get("STATION_SNAPSHOT_INTERVAL",
+                                                    str(DEFAULT_STATION_SNAPSHOT_INTERVAL.seconds / 60)))
+
+    args_parser.add_argument("--api-host",
+                             help="Set local HTTP API listening address",
+                             default=os.environ.get("API_HOST", DEFAULT_API_HOST))
+
+    args_parser.add_argument("--api-port",
+                             help="Set local HTTP API listening port (0 to disable)",
+                             default=os.environ.get("API_PORT", str(DEFAULT_API_PORT)))
+
+    args_parser.add_argument("--tag-promotion",
+                             help="Set fields promoted to tags per format, like uncompressed:from,symbol;*:to",
+                             default=os.environ.get("TAG_PROMOTION", ""))
+
+    args_parser.add_argument("--tag-cardinality-limit",
+                             help="Set estimated distinct values above which a promoted tag is demoted (0 to disable)",
+                             default=os.environ.get("TAG_CARDINALITY_LIMIT", str(DEFAULT_TAG_CARDINALITY_LIMIT)))
+
+    args_parser.add_argument("--writer-batch-size-min",
+                             help="Set minimum number of lines per InfluxDB write",
+                             default=os.environ.get("WRITER_BATCH_SIZE_MIN", str(DEFAULT_WRITER_BATCH_SIZE_MIN)))
+
+    args_parser.add_argument("--writer-batch-size-max",
+                             help="Set maximum number of lines per InfluxDB write",
+                             default=os.environ.get("WRITER_BATCH_SIZE_MAX", str(DEFAULT_WRITER_BATCH_SIZE_MAX)))
+
+    args_parser.add_argument("--writer-flush-interval-min",
+                             help="Set minimum InfluxDB flush interval in seconds",
+                             default=os.environ.get("WRITER_FLUSH_INTERVAL_MIN",
+                                                    str(DEFAULT_WRITER_FLUSH_INTERVAL_MIN)))
+
+    args_parser.add_argument("--writer-flush-interval-max",
+                             help="Set maximum InfluxDB flush interval in seconds",
+                             default=os.environ.get("WRITER_FLUSH_INTERVAL_MAX",
+                                                    str(DEFAULT_WRITER_FLUSH_INTERVAL_MAX)))
+
+    args_parser.add_argument("--writer-latency-target",
+                             help="Set InfluxDB write latency in seconds above which batches shrink",
+                             default=os.environ.get("WRITER_LATENCY_TARGET", str(DEFAULT_WRITER_LATENCY_TARGET)))
+
+    args_parser.add_argument("--writer-queue-size",
+                             help="Set maximum number of lines waiting to be written",
+                             default=os.environ.get("WRITER_QUEUE_SIZE", str(DEFAULT_WRITER_QUEUE_SIZE)))
+
+    args_parser.add_argument("--dead-letter-file",
+                             help="Set file collecting unparseable packets and lines rejected by InfluxDB",
+                             default=os.environ.get("DEAD_LETTER_FILE", DEFAULT_DEAD_LETTER_FILE))
+
+    args_parser.add_argument("--schema-seed",
+                             help="Seed field types from the existing bucket schema at startup",
+                             action="store_true",
+                             default=os.environ.get("SCHEMA_SEED", DEFAULT_SCHEMA_SEED))
+
+    args_parser.add_argument("--schema-seed-range",
+                             help="Set how far back field types are seeded from, like 30d",
+                             default=os.environ.get("SCHEMA_SEED_RANGE", DEFAULT_SCHEMA_SEED_RANGE))
+
+    args_parser.add_argument("--writer-spill-file",
+                             help="Set file keeping lines not written at shutdown, written again at startup",
+                             default=os.environ.get("WRITER_SPILL_FILE", DEFAULT_WRITER_SPILL_FILE))
+
+    args_parser.add_argument("--shutdown-timeout",
+                             help="Set maximum shutdown duration in seconds",
+                             default=os.environ.get("SHUTDOWN_TIMEOUT", str(DEFAULT_SHUTDOWN_TIMEOUT)))
+
+    args_parser.add_argument("--shedding-low-watermark",
+                             help="Set write queue fill ratio at which positions start being shed",
+                             default=os.environ.get("SHEDDING_LOW_WATERMARK", str(DEFAULT_SHEDDING_LOW_WATERMARK)))
+
+    args_parser.add_argument("--shedding-high-watermark",
+                             help="Set write queue fill ratio at which all positions are shed",
+                             default=os.environ.get("SHEDDING_HIGH_WATERMARK", str(DEFAULT_SHEDDING_HIGH_WATERMARK)))
+
+    args_parser.add_argument("--shedding-station-rate",
+                             help="Set packets per second allowed to each station, 0 to disable",
+                             default=os.environ.get("SHEDDING_STATION_RATE", str(DEFAULT_SHEDDING_STATION_RATE)))
+
+    args_parser.add_argument("--shedding-station-burst",
+                             help="Set packets allowed to each station in a burst",
+                             default=os.environ.get("SHEDDING_STATION_BURST", str(DEFAULT_SHEDDING_STATION_BURST)))
+
+    args_parser.add_argument("--trajectory-tolerance",
+                             help="Set distance in meters within which predicted positions of mobile stations are not written, 0 to disable",
+                             default=os.environ.get("TRAJECTORY_TOLERANCE", str(DEFAULT_TRAJECTORY_TOLERANCE)))
+
+    args_parser.add_argument("--trajectory-anchor-interval",
+                             help="Set maximum seconds between two written positions of a mobile station",
+                             default=os.environ.get("TRAJECTORY_ANCHOR_INTERVAL",
+                                                    str(DEFAULT_TRAJECTORY_ANCHOR_INTERVAL)))
+
+    args_parser.add_argument("--memory-snapshot-file",
+                             help="Set file receiving periodic reports of the top memory allocators",
+                             default=os.environ.get("MEMORY_SNAPSHOT_FILE", DEFAULT_MEMORY_SNAPSHOT_FILE))
+
+    args_parser.add_argument("--memory-snapshot-interval",
+                             help="Set memory allocation report interval in minutes",
+                             default=os.environ.get("MEMORY_SNAPSHOT_INTERVAL",
+                                                    str(DEFAULT_MEMORY_SNAPSHOT_INTERVAL.seconds / 60)))
+
+    args_parser.add_argument("--output",
+                             help="Set output: influxdb (HTTP API), udp, tcp or stdout",
+                             choices=OUTPUTS,
+                             default=os.environ.get("OUTPUT", DEFAULT_OUTPUT))
+
+    args_parser.add_argument("--output-host",
+                             help="Set UDP or TCP output host",
+                             default=os.environ.get("OUTPUT_HOST", DEFAULT_OUTPUT_HOST))
+
+    args_parser.add_argument("--output-port",
+                             help="Set UDP or TCP output port",
+                             default=os.environ.get("OUTPUT_PORT", str(DEFAULT_OUTPUT_PORT)))
+
+    args_parser.add_argument("--output-mtu",
+                             help="Set maximum UDP datagram size in bytes",
+                             default=os.environ.get("OUTPUT_MTU", str(DEFAULT_OUTPUT_MTU)))
+
+    args_parser.add_argument("--geofence-file",
+                             help="Set GeoJSON file of regions whose name is added as region tag",
+                             default=os.environ.get("GEOFENCE_FILE", DEFAULT_GEOFENCE_FILE))
+
+    args_parser.add_argument("--geofence-name-property",
+                             help="Set GeoJSON feature property naming regions",
+                             default=os.environ.get("GEOFENCE_NAME_PROPERTY", DEFAULT_GEOFENCE_NAME_PROPERTY))
+
+    args_parser.add_argument("--geofence-drop-outside",
+                             help="Drop positions outside every region",
+                             action="store_true",
+                             default=os.environ.get("GEOFENCE_DROP_OUTSIDE", DEFAULT_GEOFENCE_DROP_OUTSIDE))
+
+    args_parser.add_argument("--heavy-hitters-window",
+                             help="Set sliding window of top stations and igates, like 15m (empty to disable)",
+                             default=os.environ.get("HEAVY_HITTERS_WINDOW", DEFAULT_HEAVY_HITTERS_WINDOW))
+
+    args_parser.add_argument("--heavy-hitters-size",
+                             help="Set number of top stations, igates and destinations reported",
+                             default=os.environ.get("HEAVY_HITTERS_SIZE", DEFAULT_HEAVY_HITTERS_SIZE))
+
+    args_parser.add_argument("--partition-nodes",
+                             help="Set number of nodes sharing the feed by callsign prefix (1 to disable)",
+                             default=os.environ.get("PARTITION_NODES", DEFAULT_PARTITION_NODES))
+
+    args_parser.add_argument("--partition-index",
+                             help="Set index of this node among the partition nodes, from 0",
+                             default=os.environ.get("PARTITION_INDEX", DEFAULT_PARTITION_INDEX))
+
+    args_parser.add_argument("--partition-table-file",
+                             help="Set callsign prefix frequency table (empty for the one shipped)",
+                             default=os.environ.get("PARTITION_TABLE_FILE", DEFAULT_PARTITION_TABLE_FILE))
+
+    args_parser.add_argument("--archive-directory",
+                             help="Set directory of the hourly Parquet archive of parsed packets (empty to disable)",
+                             default=os.environ.get("ARCHIVE_DIRECTORY", DEFAULT_ARCHIVE_DIRECTORY))
+
+    args_parser.add_argument("--position-index-window",
+                             help="Window of recent positions indexed for the local API, e.g. 24h (empty disables)",
+                             default=os.environ.get("POSITION_INDEX_WINDOW", DEFAULT_POSITION_INDEX_WINDOW))
+
+    args_parser.add_argument("--position-index-file",
+                             help="SQLite file of the position index (empty keeps it in memory)",
+                             default=os.environ.get("POSITION_INDEX_FILE", DEFAULT_POSITION_INDEX_FILE))
+
+    args_parser.add_argument("--position-index-batch-size",
+                             help="Positions buffered before being inserted in the index",
+                             default=os.environ.get("POSITION_INDEX_BATCH_SIZE", DEFAULT_POSITION_INDEX_BATCH_SIZE))
+
+    args_parser.add_argument("--live-subscribers",
+                             help="Maximum number of clients of the live Server-Sent Events feed of the API (0 to disable)",
+                             default=os.environ.get("LIVE_SUBSCRIBERS", DEFAULT_LIVE_SUBSCRIBERS))
+
+    args_parser.add_argument("--live-buffer-size",
+                             help="Events buffered per live feed client, the oldest dropped for slow clients",
+                             default=os.environ.get("LIVE_BUFFER_SIZE", DEFAULT_LIVE_BUFFER_SIZE))
+
+    args_parser.add_argument("--decode-memo-size",
+                             help="Stations whose last decoded payloads are reused for identical copies (0 to disable)",
+                             default=os.environ.get("DECODE_MEMO_SIZE", DEFAULT_DECODE_MEMO_SIZE))
+
+    args_parser.add_argument("--decode-memo-ttl",
+                             help="How long a decoded payload is reused, like 5m",
+                             default=os.environ.get("DECODE_MEMO_TTL", DEFAULT_DECODE_MEMO_TTL))
+
+    args_parser.add_argument("--read-ring-size",
+                             help="Bytes of the shared-memory ring between the reader and the parser (0 to disable)",
+                             default=os.environ.get("READ_RING_SIZE", DEFAULT_READ_RING_SIZE))
+
+    args_parser.add_argument("--config",
+                             help="Set TOML file defining several pipelines, overriding the options above",
+                             default=os.environ.get("CONFIG_FILE", DEFAULT_CONFIG_FILE))
+
     args_parser.add_argument("--debug",
                              help="Set logging level to DEBUG",
                              action="store_true",
@@ -83,7 +305,88 @@ def main() -> None:
     config_params.influxdb_org = args.influxdb_org
     config_params.influxdb_bucket = args.influxdb_bucket
 
-    aprs_to_influx_db: APRS2InfluxDB = APRS2InfluxDB(config_params)
+    config_params.enrichment_geohash_precision = int(args.enrichment_geohash_precision)
+    config_params.enrichment_locator_precision = int(args.enrichment_locator_precision)
+
+    config_params.rollup_windows = [w.strip() for w in args.rollup_windows.split(",") if w.strip()]
+    config_params.rollup_state_file = args.rollup_state_file
+
+    config_params.station_table_size = int(args.station_table_size)
+    config_params.station_snapshot_file = args.station_snapshot_file
+    config_params.station_snapshot_interval = datetime.timedelta(minutes=float(args.station_snapshot_interval))
+
+    config_params.api_host = args.api_host
+    config_params.api_port = int(args.api_port)
+
+    config_params.tag_promotion = parse_tag_promotion(args.tag_promotion)
+    config_params.tag_cardinality_limit = int(args.tag_cardinality_limit)
+
+    config_params.writer_batch_size_min = int(args.writer_batch_size_min)
+    config_params.writer_batch_size_max = int(args.writer_batch_size_max)
+    config_params.writer_flush_interval_min = float(args.writer_flush_interval_min)
+    config_params.writer_flush_interval_max = float(args.writer_flush_interval_max)
+    config_params.writer_latency_target = float(args.writer_latency_target)
+    config_params.writer_queue_size = int(args.writer_queue_size)
+
+    config_params.dead_letter_file = args.dead_letter_file
+
+    config_params.schema_seed = bool(args.schema_seed)
+    config_params.schema_seed_range = args.schema_seed_range
+
+    config_params.writer_spill_file = args.writer_spill_file
+    config_params.shutdown_timeout = float(args.shutdown_timeout)
+
+    config_params.shedding_low_watermark = float(args.shedding_low_watermark)
+    config_params.shedding_high_watermark = float(args.shedding_high_watermark)
+    config_params.shedding_station_rate = float(args.shedding_station_rate)
+    config_params.shedding_station_burst = int(args.shedding_station_burst)
+
+    config_params.trajectory_tolerance = float(args.trajectory_tolerance)
+    config_params.trajectory_anchor_interval = float(args.trajectory_anchor_interval)
+
+    config_params.memory_snapshot_file = args.memory_snapshot_file
+    config_params.memory_snapshot_interval = datetime.timedelta(minutes=float(args.memory_snapshot_interval))
+
+    config_params.output = args.output
+    config_params.output_host = args.output_host
+    config_params.output_port = int(args.output_port)
+    config_params.output_mtu = int(args.output_mtu)
+
+    config_params.geofence_file = args.geofence_file
+    config_params.geofence_name_property = args.geofence_name_property
+    config_params.geofence_drop_outside = bool(args.geofence_drop_outside)
+
+    config_params.heavy_hitters_window = args.heavy_hitters_window
+    config_params.heavy_hitters_size = int(args.heavy_hitters_size)
+
+    config_params.partition_nodes = int(args.partition_nodes)
+    config_params.partition_index = int(args.partition_index)
+    config_params.partition_table_file = args.partition_table_file
+
+    config_params.archive_directory = args.archive_directory
+
+    config_params.position_index_window = args.position_index_window
+    config_params.position_index_file = args.position_index_file
+    config_params.position_index_batch_size = int(args.position_index_batch_size)
+
+    config_params.live_subscribers = int(args.live_subscribers)
+    config_params.live_buffer_size = int(args.live_buffer_size)
+
+    config_params.decode_memo_size = int(args.decode_memo_size)
+    config_params.decode_memo_ttl = args.decode_memo_ttl
+
+    config_params.read_ring_size = int(args.read_ring_size)
+
+    if args.config:
+        pipelines: dict = load_pipelines(args.config, config_params)
+        for pipeline_params in pipelines.values():
+            apply_partition(pipeline_params)
+
+        aprs_to_influx_db: Pipelines = Pipelines(pipelines)
+    else:
+        apply_partition(config_params)
+
+        aprs_to_influx_db: APRS2InfluxDB = APRS2InfluxDB(config_params)
 
     def signal_handler(signum: int, _) -> None:
         if signum in [signal.SIGINT, signal.SIGTERM, signal.SIGABRT]:
@@ -0,0 +1,380 @@
+import datetime
+import logging
+import time
+from typing import Callable, Optional
+
+from encoder import BatchEncoder
+from metrics import Metrics
+from parser import Parser
+from utils import LogSummary, LRUCache
+
+_logger = logging.getLogger(__name__)
+
+# Distinct payloads memoized per station, the oldest forgotten first
+MEMO_STATION_PAYLOADS: int = 4
+
+# Keys decoded from the header, which differs between copies of a payload
+MEMO_HEADER_KEYS: tuple = ("via", "path", "raw")
+
+# One hit in so many is decoded and encoded anyway, checking the memo and timing the decoder
+MEMO_CHECK_INTERVAL: int = 100
+
+
+class MemoEntry:
+    """Packet decoded from a payload, with the template of its line"""
+
+    __slots__ = ("packet", "body", "raw_tail", "expires", "template")
+
+    packet: dict
+    body: str
+    raw_tail: str
+    expires: float
+    template: Optional[tuple]
+
+    def __init__(self, packet: dict, body: str, expires: float) -> None:
+        self.packet = packet
+        self.body = body
+        self.expires = expires
+        self.template = None
+
+        # The raw field after the header, escaping being done a character at a time
+        self.raw_tail = Parser.parse_text_string(body, "raw")[len("raw=\""):]
+
+
+class DecodeMemo:
+    """Memo of the packets decoded per station, reused for identical payloads
+
+    Most stations beacon byte-identical information fields every cycle. The
+    memo keeps the last payloads of each station, by destination and
+    information field since mic-e and beacons are decoded from the
+    destination too, in an LRU of stations. A payload seen again before the
+    TTL is over is not decoded by aprslib: only its header is, refreshing
+    the path, via and raw of a copy of the memoized packet. Headers repeat
+    too, stations being mostly heard through the same path, so they are
+    memoized in an LRU of the same size.
+
+    The line of a memoized packet is kept as a template around its path, via
+    and raw fields, so that the line of the next copy is rebuilt without
+    encoding it. Lines depending on the state of the parser, i.e. telemetry
+    scaled by the equations of the station and promoted tags, are encoded
+    every time. Packets with a timestamp are not memoized, as aprslib dates
+    it from the current day.
+
+    One hit in MEMO_CHECK_INTERVAL is decoded and encoded anyway: a packet or
+    line differing from the memoized one is counted and its entry dropped,
+    and the time taken estimates the CPU saved by the other hits.
+
+    keyword arguments:
+    decode -- function decoding a raw line, aprslib.parse
+    decode_header -- function decoding the header of a raw line, aprslib.parsing.parse_header
+    parser -- parser of the lines, formatting the refreshed fields
+    encoder -- encoder of the lines not templated
+    size -- stations and headers memoized
+    ttl -- how long a decoded packet is reused
+    metrics -- metrics registry
+    """
+
+    _decode: Callable[[bytes], dict]
+    _decode_header: Callable[[str], dict]
+    _parser: Parser
+    _encoder: BatchEncoder
+    _ttl: float
+    _metrics: Optional[Metrics]
+    _mismatches: LogSummary
+
+    _stations: LRUCache
+    _headers: LRUCache
+    _decoded: dict
+
+    _hits: int
+    _misses: int
+    _line_hits: int
+    _checks: int
+    _check_time: float
+    _memo_time: float
+    _published: dict
+
+    def __init__(self, decode: Callable[[bytes], dict], decode_header: Callable[[str], dict], parser: Parser,
+                 encoder: BatchEncoder, size: int, ttl: datetime.timedelta, metrics: Optional[Metrics] = None) -> None:
+        super().__init__()
+
+        self._decode = decode
+        self._decode_header = decode_header
+        self._parser = parser
+        self._encoder = encoder
+        self._ttl = ttl.total_seconds()
+        self._metrics = metrics
+        self._mismatches = LogSummary(_logger, logging.WARNING, "decode memo mismatches")
+
+        self._stations = LRUCache(size)
+        self._headers = LRUCache(size)
+
+        # Packets decoded since the last encode, by id, with their entry, rendered header and whether to check them
+        self._decoded = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._line_hits = 0
+        self._checks = 0
+        self._check_time = 0.0
+        self._memo_time = 0.0
+        self._published = {}
+
+    def __len__(self) -> int:
+        return sum(len(payloads) for _, payloads in self._stations.items())
+
+    def decode(self, line: bytes, now: Optional[float] = None) -> dict:
+        """Decodes a raw line, reusing the packet memoized for its payload,
+        raising the errors of the decode functions"""
+
+        start: float = time.perf_counter()
+        now = now or time.time()
+
+        line = line.rstrip(b"\r\n")
+        header, separator, info = line.partition(b":")
+        source, _, destination = header.partition(b">")
+        key: tuple = (destination.split(b",", 1)[0], info)
+
+        payloads: Optional[dict] = self._stations.get(source)
+        entry: Optional[MemoEntry] = payloads.get(key) if payloads else None
+
+        if entry and entry.expires > now and header.isascii():
+            head: str = header.decode()
+
+            item: Optional[tuple] = self._headers.get(header)
+            if item is None:
+                item = self._header(head)
+                self._headers.put(header, item)
+
+            fields, rendered = item
+
+            packet: dict = dict(entry.packet)
+            packet.update(fields)
+            packet["path"] = list(fields["path"])
+            packet["raw"] = head + ":" + entry.body
+
+            self._hits += 1
+            check: bool = self._hits % MEMO_CHECK_INTERVAL == 0
+
+            self._decoded[id(packet)] = (packet, entry, rendered, check)
+            self._memo_time += time.perf_counter() - start
+
+            if check:
+                return self._check(line, packet, payloads, key)
+
+            return packet
+
+        packet = self._decode(line)
+        self._misses += 1
+
+        raw: str = packet.get("raw", "")
+        if not separator or not header.isascii() or "timestamp" in packet or \
+                not raw.startswith(header.decode() + ":"):
+            return packet
+
+        entry = MemoEntry(packet, raw[len(header) + 1:], now + self._ttl)
+
+        if payloads is None:
+            payloads = {}
+            self._stations.put(source, payloads)
+
+        payloads.pop(key, None)
+        payloads[key] = entry
+        if len(payloads) > MEMO_STATION_PAYLOADS:
+            del payloads[next(iter(payloads))]
+
+        self._decoded[id(packet)] = (packet, entry, None, False)
+
+        return packet
+
+    def encode(self, packets: list) -> list:
+        """Returns the line of each packet like BatchEncoder.encode, filling
+        the templates of the packets decoded from memoized payloads
+
+        To be called after each read, even without packets to encode, as the
+        packets decoded since the previous call are forgotten.
+        """
+
+        decoded: dict = self._decoded
+        self._decoded = {}
+
+        lines: list = [None] * len(packets)
+        pending: list = []
+        checked: list = []
+
+        start: float = time.perf_counter()
+
+        for index, packet in enumerate(packets):
+            item: Optional[tuple] = decoded.get(id(packet))
+            line: Optional[str] = None
+
+            if item and item[1].template and item[2]:
+                line = DecodeMemo._fill(item[1].template, item[2], item[1])
+
+            if line and item[3]:
+                checked.append((index, line))
+                pending.append(index)
+            elif line:
+                lines[index] = line
+                self._line_hits += 1
+            else:
+                pending.append(index)
+
+        encoding: float = time.perf_counter()
+        encoded: float = encoding
+
+        if pending:
+            for index, line in zip(pending, self._encoder.encode([packets[index] for index in pending])):
+                lines[index] = line
+
+            encoded = time.perf_counter()
+
+            for index in pending:
+                item = decoded.get(id(packets[index]))
+                if item and lines[index] and item[1].template is None:
+                    item[1].template = self._template(packets[index], lines[index])
+
+        for index, line in checked:
+            self._line_hits += 1
+
+            if line != lines[index]:
+                self._mismatches.event("line", "Memoized line differs:\n  %s\n  %s", line, lines[index])
+                self._count("decode_memo_mismatches")
+                decoded[id(packets[index])][1].template = ()
+
+        # Building templates is an overhead of the memo, like filling them
+        self._memo_time += encoding - start + time.perf_counter() - encoded
+
+        self._update_metrics()
+
+        return lines
+
+    @property
+    def cpu_saved(self) -> float:
+        """Seconds saved by the hits, estimated at the average time the
+        checked ones took to decode, less the time spent in the memo.
+        Encoding saved by the templates is not counted."""
+
+        if not self._checks:
+            return 0.0
+
+        return self._hits * self._check_time / self._checks - self._memo_time
+
+    def _check(self, line: bytes, packet: dict, payloads: dict, key: tuple) -> dict:
+        """Decodes a line whose packet was memoized, returning the decoded
+        packet and forgetting the payload if they differ"""
+
+        start: float = time.perf_counter()
+
+        try:
+            expected: Optional[dict] = self._decode(line)
+        except Exception:
+            expected = None
+            raise
+        finally:
+            self._check_time += time.perf_counter() - start
+            self._checks += 1
+
+            if packet != expected:
+                self._mismatches.event("packet", "Memoized packet differs:\n  %s\n  %s", packet, expected)
+                self._count("decode_memo_mismatches")
+                payloads.pop(key, None)
+                self._decoded.pop(id(packet), None)
+
+        return expected
+
+    def _count(self, name: str) -> None:
+        if self._metrics:
+            self._metrics.increment(name)
+
+    def _update_metrics(self) -> None:
+        if not self._metrics:
+            return
+
+        counts: dict = {"decode_memo_hits": self._hits, "decode_memo_misses": self._misses,
+                        "decode_memo_line_hits": self._line_hits}
+
+        for name, count in counts.items():
+            if count > self._published.get(name, 0):
+                self._metrics.increment(name, count - self._published.get(name, 0))
+
+        self._published = counts
+
+        self._metrics.set("decode_memo_hit_ratio", self._hits / max(1, self._hits + self._misses))
+        self._metrics.set("decode_memo_cpu_saved", self.cpu_saved)
+
+    def _render(self, key: str, value) -> Optional[str]:
+        if key == "path":
+            return Parser.parse_path(value) if isinstance(value, list) else None
+
+        if key == "raw":
+            return Parser.parse_text_string(value, "raw") if value else None
+
+        return self._parser.schema.format_field(key, value)
+
+    def _header(self, head: str) -> tuple:
+        """Decodes a header, rendering its fields: via and path as they are
+        written, and raw up to the information field"""
+
+        fields: dict = self._decode_header(head)
+
+        rendered: dict = {key: self._render(key, fields.get(key)) for key in MEMO_HEADER_KEYS if key in fields}
+        rendered["raw"] = Parser.parse_text_string(head + ":", "raw")[:-1]
+
+        return fields, rendered
+
+    def _template(self, packet: dict, line: str) -> tuple:
+        """Splits a line around its header fields, returning an empty template
+        if they cannot be found once each, e.g. when promoted to tags"""
+
+        if "telemetry" in packet or self._parser.promoted_keys(packet.get("format")):
+            return ()
+
+        spans: list = []
+
+        for key in MEMO_HEADER_KEYS:
+            if key not in packet:
+                continue
+
+            field: Optional[str] = self._render(key, packet.get(key))
+            if not field:
+                return ()
+
+            start: int = line.find(field)
+            end: int = start + len(field)
+            if start <= 0 or line.find(field, start + 1) >= 0 or line[start - 1] not in ", " or \
+                    line[end:end + 1] not in ("", ","):
+                return ()
+
+            spans.append((start, end, key))
+
+        pieces: list = []
+        keys: list = []
+        position: int = 0
+
+        for start, end, key in sorted(spans):
+            pieces.append(line[position:start])
+            keys.append(key)
+            position = end
+
+        pieces.append(line[position:])
+
+        return tuple(pieces), tuple(keys)
+
+    @staticmethod
+    def _fill(template: tuple, rendered: dict, entry: MemoEntry) -> Optional[str]:
+        pieces, keys = template
+        parts: list = [pieces[0]]
+
+        for key, piece in zip(keys, pieces[1:]):
+            field: Optional[str] = rendered.get(key)
+            if not field:
+                return None
+
+            if key == "raw":
+                field += entry.raw_tail
+
+            parts.append(field)
+            parts.append(piece)
+
+        return "".join(parts)
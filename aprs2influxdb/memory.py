@@ -0,0 +1,97 @@
+import datetime
+import logging
+import os
+import tracemalloc
+from typing import Optional
+
+_logger = logging.getLogger(__name__)
+
+SNAPSHOT_TOP: int = 25
+
+SNAPSHOT_FILTERS: list = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+]
+
+
+def rss() -> int:
+    """Resident set size of the process in bytes, 0 if unknown"""
+
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+
+        # Peak rather than current size, the best available outside Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+class AllocationSnapshots:
+    """Periodic report of the top allocators, traced by tracemalloc
+
+    Every dump appends to the file the process size and the source lines
+    holding the most memory, along with the growth since the previous dump,
+    so that an unbounded structure can be found after the fact.
+    """
+
+    _path: str
+    _top: int
+    _previous: Optional[tracemalloc.Snapshot]
+    _tracing: bool
+
+    def __init__(self, path: str, top: int = SNAPSHOT_TOP) -> None:
+        super().__init__()
+
+        self._path = path
+        self._top = top
+        self._previous = None
+        self._tracing = False
+
+    def start(self) -> None:
+        # Tracing started by someone else is left to them
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def stop(self) -> None:
+        self._previous = None
+
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def report(self) -> list:
+        snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        current, peak = tracemalloc.get_traced_memory()
+
+        lines: list = [
+            f"{datetime.datetime.utcnow().isoformat()} rss={rss()} traced={current} peak={peak}"
+        ]
+
+        if self._previous:
+            stats: list = snapshot.compare_to(self._previous, "lineno")
+        else:
+            stats: list = snapshot.statistics("lineno")
+
+        lines.extend(f"  {stat}" for stat in stats[:self._top])
+
+        self._previous = snapshot
+
+        return lines
+
+    def dump(self) -> None:
+        lines: list = self.report()
+
+        try:
+            with open(self._path, "a") as f:
+                f.write("\n".join(lines) + "\n\n")
+        except OSError as e:
+            _logger.error(f"Unable to write allocation snapshot: {e}")
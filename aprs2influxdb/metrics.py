@@ -0,0 +1,77 @@
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
+
+
+class Metrics:
+    _lock: threading.Lock
+    _counters: dict
+    _gauges: dict
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def get(self, name: str, default: float = 0) -> float:
+        with self._lock:
+            if name in self._gauges:
+                return self._gauges[name]
+
+            return self._counters.get(name, default)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges)
+            }
+
+    def api_metrics(self, _: dict) -> dict:
+        return self.snapshot()
+
+    def scope(self, name: str) -> "Metrics":
+        """Returns a view of this registry whose metric names are prefixed by name"""
+
+        return ScopedMetrics(self, name)
+
+
+class ScopedMetrics(Metrics):
+    """Metrics of one pipeline, kept in the registry shared by the process"""
+
+    _parent: Metrics
+    _prefix: str
+
+    def __init__(self, parent: Metrics, name: str) -> None:
+        super().__init__()
+
+        self._parent = parent
+        self._prefix = f"{name}."
+
+    def increment(self, name: str, value: int = 1) -> None:
+        self._parent.increment(self._prefix + name, value)
+
+    def set(self, name: str, value: float) -> None:
+        self._parent.set(self._prefix + name, value)
+
+    def get(self, name: str, default: float = 0) -> float:
+        return self._parent.get(self._prefix + name, default)
+
+    def snapshot(self) -> dict:
+        snapshot: dict = self._parent.snapshot()
+
+        return {
+            kind: {name[len(self._prefix):]: value for name, value in values.items() if name.startswith(self._prefix)}
+            for kind, values in snapshot.items()
+        }
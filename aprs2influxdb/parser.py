@@ -2,16 +2,93 @@ import logging
 import math
 from typing import Optional
 
+from cardinality import HyperLogLog
+from deadletter import DeadLetter
+from geo import geohash, maidenhead
+from geofence import Geofence
+from metrics import Metrics
+from schema import FieldSchema
+from utils import LogSummary, LRUCache
+
 _logger = logging.getLogger(__name__)
 
+POSITION_CACHE_SIZE: int = 65536
+TELEMETRY_CACHE_SIZE: int = 65536
+
+WEATHER_FIELDS: list = ["humidity", "pressure", "rain_1h", "rain_24h", "rain_since_midnight", "temperature",
+                        "wind_direction", "wind_gust", "wind_speed"]
+
+TELEMETRY_FIELDS: list = ["seq", "bits", "analog1", "analog2", "analog3", "analog4", "analog5"]
+
+# Fields written for each packet format, following the schema of its parse method
+PACKET_FIELDS: dict = {
+    "uncompressed": ["from", "to", "via", "path", "latitude", "longitude", "posambiguity", "altitude", "speed",
+                     "course", "messagecapable", "phg", "rng", "symbol", "symbol_table", "comment", "raw_timestamp",
+                     "raw"] + TELEMETRY_FIELDS + WEATHER_FIELDS,
+    "mic-e": ["from", "to", "via", "path", "latitude", "longitude", "posambiguity", "altitude", "speed", "course",
+              "mbits", "mtype", "daodatumbyte", "symbol", "symbol_table", "comment", "raw"],
+    "object": ["from", "to", "via", "path", "alive", "object_format", "object_name", "latitude", "longitude",
+               "posambiguity", "altitude", "speed", "course", "timestamp", "rng", "daodatumbyte", "symbol",
+               "symbol_table", "comment", "raw_timestamp", "raw"] + TELEMETRY_FIELDS,
+    "status": ["from", "to", "via", "path", "timestamp", "status", "raw_timestamp", "raw"] + TELEMETRY_FIELDS,
+    "compressed": ["from", "to", "via", "path", "latitude", "longitude", "gpsfixstatus", "altitude", "speed", "course",
+                   "timestamp", "messagecapable", "phg", "symbol", "symbol_table", "comment",
+                   "raw"] + TELEMETRY_FIELDS + WEATHER_FIELDS,
+    "wx": ["from", "to", "via", "path", "wx_raw_timestamp", "comment", "raw"] + WEATHER_FIELDS,
+    "beacon": ["from", "to", "via", "path", "text", "raw"],
+    "bulletin": ["from", "to", "via", "path", "bid", "identifier", "message_text", "raw"],
+    "message": ["from", "to", "via", "path", "addresse", "msgNo", "message_text", "response", "raw"]
+}
+
 
 class Parser:
-    telemetry_dictionary: dict
+    telemetry_dictionary: LRUCache
+
+    _geohash_precision: int
+    _locator_precision: int
+    _position_cache: LRUCache
+    _geofence: Optional[Geofence]
+
+    _tag_promotion: dict
+    _tag_cardinality_limit: int
+    _tag_cardinality: dict
+    _tag_demoted: set
 
-    def __init__(self) -> None:
+    schema: FieldSchema
+
+    _metrics: Optional[Metrics]
+    _dead_letter: Optional[DeadLetter]
+    _failures: LogSummary
+    _unsupported: LogSummary
+
+    def __init__(self, geohash_precision: int = 0, locator_precision: int = 0,
+                 tag_promotion: Optional[dict] = None, tag_cardinality_limit: int = 0,
+                 metrics: Optional[Metrics] = None, dead_letter: Optional[DeadLetter] = None,
+                 geofence: Optional[Geofence] = None) -> None:
         super().__init__()
 
-        self.telemetry_dictionary = {}
+        self.telemetry_dictionary = LRUCache(TELEMETRY_CACHE_SIZE)
+
+        self.schema = FieldSchema(metrics)
+
+        self._metrics = metrics
+        self._dead_letter = dead_letter
+        self._failures = LogSummary(_logger, logging.ERROR, "failures")
+        self._unsupported = LogSummary(_logger, logging.DEBUG, "unsupported packets")
+
+        self._geohash_precision = geohash_precision
+        self._locator_precision = locator_precision
+        self._position_cache = LRUCache(POSITION_CACHE_SIZE)
+        self._geofence = geofence
+
+        self._tag_promotion = tag_promotion or {}
+        self._tag_cardinality_limit = tag_cardinality_limit
+        self._tag_cardinality = {}
+        self._tag_demoted = set()
+
+    @property
+    def tag_demoted(self) -> set:
+        return set(self._tag_demoted)
 
     def json_to_line_protocol(self, json_data):
         """Converts JSON APRS-IS packet to influxdb line protocol
@@ -67,59 +144,97 @@ class Parser:
                 return self.parse_telemetry_scaling(json_data)
 
             # All other formats not yes parsed
-            _logger.debug("Not parsing {0} packets".format(json_data))
+            packet_format: str = str(json_data["format"])
+            self._unsupported.event(packet_format, "Not parsing %s packets: %s", packet_format, json_data.get("raw"))
+            self.reject(f"Unsupported format {packet_format}", json_data.get("raw"), "parser_unsupported")
 
         except Exception as e:
-            _logger.error(e)
-            _logger.error("Packet: {0}".format(json_data))
+            self._failures.event(type(e).__name__, "Parsing failed (%s): %s", e, json_data.get("raw"))
+            self.reject(f"{type(e).__name__}: {e}", json_data.get("raw"), "parser_failures")
+
+    def reject(self, reason: str, raw: Optional[str], counter: str) -> None:
+        """Accounts a packet which cannot be parsed, saving it to the dead letter file
+
+        keyword arguments:
+        reason -- why the packet was rejected
+        raw -- raw packet, if available
+        counter -- name of the metric counting rejections
+        """
+
+        if self._metrics:
+            self._metrics.increment(counter)
+
+        if self._dead_letter:
+            self._dead_letter.write(reason, raw=raw)
+
+    def summarize(self) -> None:
+        """Logs summaries of failures and unsupported packets of the last interval"""
+
+        self._failures.summarize()
+        self._unsupported.summarize()
 
     def parse_telemetry(self, json_data: dict, field_list: list):
         """parse telemetry from packets
 
-        Iterates through a packet to extra telemetry data: sequence, bits, and
-        values. These are placed into the field_list which is returned at the end of
-        the function.
+        Appends the telemetry sequence, bits and values of the packet to the
+        field_list which is returned at the end of the function.
 
         keyword arguments:
         json_data -- JSON packet from aprslib
         field_list -- list of field items currently parsed
         """
 
-        # Check for telemetry in packet
-        if "telemetry" in json_data:
-            items = json_data.get("telemetry")
-            # Extract telemetry sequency
-            if "seq" in items:
-                field_list.append("seq={0}".format(items.get("seq")))
-            # Extract IO bits
-            if "bits" in items:
-                field_list.append("bits={0}".format(items.get("bits")))
-            # Attempt to retrieve scaling values from telemetry_dictionary
-            try:
-                channels = self.telemetry_dictionary[json_data["from"]]
-            except KeyError:
-                # No scaling values found, assign generic scaling to channels
-                channels = []
-                for eqn in range(5):
-                    # Create a scaling dictionary for all five measurements
-                    equations = {"a": 0, "b": 0, "c": 0, }
-                    equations["a"] = 0
-                    equations["b"] = 1
-                    equations["c"] = 0
-                    channels.append(equations)
-
-            # Extract analog values from telemtry packet
-            if "vals" in items:
-                values = items.get("vals")
-                for analog in range(5):
-                    # Apply scaling equation A*V**2 + B*V + C
-                    telemVal = channels[analog]["a"] * math.pow(values[analog], 2) + channels[analog]["b"] * values[
-                        analog] + channels[analog]["c"]
-                    field_list.append("analog{0}={1}".format(analog + 1, telemVal))
+        for key, value in self.telemetry_values(json_data).items():
+            field_list = self.parse_field(key, value, field_list)
 
         # Return field_list with found items appended
         return field_list
 
+    def telemetry_values(self, json_data: dict) -> dict:
+        """Extracts telemetry from packets: sequence, bits, and analog values
+        scaled by the equations last received from the station
+
+        keyword arguments:
+        json_data -- JSON packet from aprslib
+        """
+
+        values: dict = {}
+
+        # Check for telemetry in packet
+        if "telemetry" not in json_data:
+            return values
+
+        items = json_data.get("telemetry")
+        # Extract telemetry sequency
+        if "seq" in items:
+            values["seq"] = items.get("seq")
+        # Extract IO bits
+        if "bits" in items:
+            values["bits"] = items.get("bits")
+        # Attempt to retrieve scaling values from telemetry_dictionary
+        channels = self.telemetry_dictionary.get(json_data["from"])
+        if channels is None:
+            # No scaling values found, assign generic scaling to channels
+            channels = []
+            for eqn in range(5):
+                # Create a scaling dictionary for all five measurements
+                equations = {"a": 0, "b": 0, "c": 0, }
+                equations["a"] = 0
+                equations["b"] = 1
+                equations["c"] = 0
+                channels.append(equations)
+
+        # Extract analog values from telemtry packet
+        if "vals" in items:
+            vals = items.get("vals")
+            for analog in range(5):
+                # Apply scaling equation A*V**2 + B*V + C
+                telemVal = channels[analog]["a"] * math.pow(vals[analog], 2) + channels[analog]["b"] * vals[
+                    analog] + channels[analog]["c"]
+                values["analog{0}".format(analog + 1)] = telemVal
+
+        return values
+
     @staticmethod
     def parse_equations(json_data: dict) -> Optional[list]:
         """
@@ -149,8 +264,27 @@ class Parser:
 
         return channels
 
-    @staticmethod
-    def parse_weather(json_data: dict, field_list: list) -> list:
+    def parse_field(self, key: str, value, field_list: list) -> list:
+        """parse a field value according to its pinned type
+
+        Coerces the value to the type pinned in the schema registry and appends
+        it to the field_list which is returned. Values which cannot be coerced
+        are left out, as InfluxDB would reject the whole point.
+
+        keyword arguments:
+        key -- Name of field
+        value -- Value of field
+        field_list -- list of field items currently parsed
+        """
+
+        field: Optional[str] = self.schema.format_field(key, value)
+        if field:
+            field_list.append(field)
+
+        # Return field_list with found item appended
+        return field_list
+
+    def parse_weather(self, json_data: dict, field_list: list) -> list:
         """parse weather data from packets
 
         Iterates through a packet to extra weather data. Items which are found are
@@ -165,16 +299,139 @@ class Parser:
         if "weather" in json_data:
             items = json_data.get("weather")
 
-            # Define weather items to check for
-            wx_fields = ["humidity", "pressure", "rain_1h", "rain_24h", "rain_since_midnight", "temperature",
-                         "wind_direction", "wind_gust", "wind_speed"]
-            for key in wx_fields:
+            for key in WEATHER_FIELDS:
                 if key in items:
-                    field_list.append("{0}={1}".format(key, items.get(key)))
+                    field_list = self.parse_field(key, items.get(key), field_list)
 
         # Return field_list with found items appended
         return field_list
 
+    def parse_position_tags(self, json_data: dict, tag_list: list) -> list:
+        """parse position tags from packets
+
+        Computes geohash and Maidenhead locator tags from the packet latitude and
+        longitude, when enabled, and the region tag when a geofence is loaded.
+        Results are cached per station, so a station beaconing an unchanged
+        position does not recompute them. Found tags are appended to the
+        tag_list which is returned.
+
+        keyword arguments:
+        json_data -- JSON packet from aprslib
+        tag_list -- list of tag items currently parsed
+        """
+
+        if "latitude" not in json_data or "longitude" not in json_data:
+            return tag_list
+
+        if self._geofence:
+            region = self._geofence.region_of(json_data)
+            if region:
+                tag_list.append("region={0}".format(self.parse_tag_string(region)))
+
+        if not self._geohash_precision and not self._locator_precision:
+            return tag_list
+
+        latitude = json_data.get("latitude")
+        longitude = json_data.get("longitude")
+
+        # Objects are positioned on their own, so cache them by name
+        station = (json_data.get("from"), json_data.get("object_name"))
+
+        cached = self._position_cache.get(station)
+        if cached and cached[0] == latitude and cached[1] == longitude:
+            position_tags = cached[2]
+        else:
+            position_tags = []
+            if self._geohash_precision:
+                position_tags.append("geohash={0}".format(geohash(latitude, longitude, self._geohash_precision)))
+            if self._locator_precision:
+                position_tags.append("locator={0}".format(maidenhead(latitude, longitude, self._locator_precision)))
+            self._position_cache.put(station, (latitude, longitude, position_tags))
+
+        tag_list.extend(position_tags)
+
+        # Return tag_list with found items appended
+        return tag_list
+
+    def promoted_keys(self, packet_format: Optional[str]) -> list:
+        """Keys promoted to tags for a packet format"""
+
+        return self._tag_promotion.get(packet_format, []) + self._tag_promotion.get("*", [])
+
+    def parse_promoted_tags(self, json_data: dict, tag_list: list, field_list: list) -> list:
+        """parse promoted tags from packets
+
+        Moves the keys configured for the packet format (or for every format with
+        "*") from the field_list to the tag_list. Each promoted key has a
+        HyperLogLog estimate of its distinct values: once it passes the
+        cardinality limit the key is demoted back to a field for good, preventing
+        series blow-up. Returns the field_list without promoted items.
+
+        keyword arguments:
+        json_data -- JSON packet from aprslib
+        tag_list -- list of tag items currently parsed
+        field_list -- list of field items currently parsed
+        """
+
+        keys: list = self.promoted_keys(json_data.get("format"))
+        if not keys:
+            return field_list
+
+        for key in keys:
+            if key in self._tag_demoted or key not in json_data:
+                continue
+
+            # Lists and dictionaries, e.g. path, are not tag values
+            if isinstance(json_data.get(key), (list, dict)):
+                self._tag_demoted.add(key)
+                _logger.warning(f"Tag {key} not promoted: not a single value")
+                continue
+
+            value: str = Parser.parse_tag_string(json_data.get(key))
+            if not value:
+                continue
+
+            if self._tag_cardinality_limit:
+                estimator: HyperLogLog = self._tag_cardinality.get(key)
+                if not estimator:
+                    estimator = HyperLogLog()
+                    self._tag_cardinality[key] = estimator
+
+                estimator.add(value)
+
+                if estimator.estimate() > self._tag_cardinality_limit:
+                    self._tag_demoted.add(key)
+                    _logger.warning(f"Tag {key} demoted to field: estimated cardinality above "
+                                    f"{self._tag_cardinality_limit}")
+                    continue
+
+            tag_list.append("{0}={1}".format(key, value))
+
+            prefix: str = f"{key}="
+            field_list = [field for field in field_list if not field.startswith(prefix)]
+
+        # Return field_list without promoted items
+        return field_list
+
+    def build_line(self, json_data: dict, measurement: str, tag_list: list, field_list: list) -> str:
+        """Combine measurement, tags and fields into a line protocol string
+
+        keyword arguments:
+        json_data -- JSON packet from aprslib
+        measurement -- measurement name
+        tag_list -- list of tag items parsed
+        field_list -- list of field items parsed
+        """
+
+        # Promote configured fields to tags
+        field_list = self.parse_promoted_tags(json_data, tag_list, field_list)
+
+        # Join tags and fields into comma separated strings
+        tag_str = ",".join(tag_list)
+        fields_str = ",".join(field_list)
+
+        return measurement + "," + tag_str + " " + fields_str
+
     def parse_uncompressed(self, json_data: dict) -> str:
         """Parse uncompressed APRS packets into influxedb line protocol. Returns a
         valid line protocol string.
@@ -189,6 +446,8 @@ class Parser:
         # field = symbol_table
         # field = symbol
         # tag = format
+        # tag = geohash
+        # tag = locator
         # field = via
         # field = messagecapable
         # field = latitude
@@ -230,8 +489,8 @@ class Parser:
         #
         tags.append("format={0}".format(json_data.get("format")))
 
-        # Join tags into comma separated string
-        tag_str = ",".join(tags)
+        # Obtain position tags
+        tags = self.parse_position_tags(json_data, tags)
 
         # Create field key lists to iterate through
         field_num_keys = ["latitude", "longitude", "posambiguity", "altitude", "speed", "course"]
@@ -240,12 +499,12 @@ class Parser:
         # Extract number fields from packet
         for key in field_num_keys:
             if key in json_data:
-                fields.append("{0}={1}".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract text fields from packet
         for key in field_text_keys:
             if key in json_data:
-                fields.append("{0}=\"{1}\"".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract path
         if "path" in json_data:
@@ -285,16 +544,12 @@ class Parser:
         fields = self.parse_telemetry(json_data, fields)
 
         # Parse weather data
-        fields = Parser.parse_weather(json_data, fields)
-
-        # Combine all fields into a valid line protocol string
-        fields_str = ",".join(fields)
+        fields = self.parse_weather(json_data, fields)
 
         # Combine final valid line protocol string
-        return measurement + "," + tag_str + " " + fields_str
+        return self.build_line(json_data, measurement, tags, fields)
 
-    @staticmethod
-    def parse_mic_e(json_data: dict) -> str:
+    def parse_mic_e(self, json_data: dict) -> str:
         """Parse mic-e APRS packets into influxedb line protocol. Returns a
         valid line protocol string.
 
@@ -308,6 +563,8 @@ class Parser:
         # field = symbol_table
         # field = symbol
         # tag = format
+        # tag = geohash
+        # tag = locator
         # field = via
         # field = latitude
         # field = longitude
@@ -334,8 +591,8 @@ class Parser:
         # Obtain tags
         tags.append("format={0}".format(json_data.get("format")))
 
-        # Join tags into comma separated string
-        tag_str = ",".join(tags)
+        # Obtain position tags
+        tags = self.parse_position_tags(json_data, tags)
 
         # Create field key lists to iterate through
         field_num_keys = ["latitude", "longitude", "posambiguity", "altitude", "speed", "course", "mbits"]
@@ -344,12 +601,12 @@ class Parser:
         # Extract number fields from packet
         for key in field_num_keys:
             if key in json_data:
-                fields.append("{0}={1}".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract text fields from packet
         for key in field_text_keys:
             if key in json_data:
-                fields.append("{0}=\"{1}\"".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract path
         if "path" in json_data:
@@ -382,9 +639,7 @@ class Parser:
                 fields.append(comment)
 
         # Combine final valid line protocol string
-        fields_str = ",".join(fields)
-
-        return measurement + "," + tag_str + " " + fields_str
+        return self.build_line(json_data, measurement, tags, fields)
 
     def parse_object(self, json_data: dict) -> str:
         """Parse Object APRS packets into influxedb line protocol
@@ -400,6 +655,8 @@ class Parser:
         # field = symbol_table
         # field = symbol
         # tag = format
+        # tag = geohash
+        # tag = locator
         # field = via
         # field = alive
         # field = object_format
@@ -436,8 +693,8 @@ class Parser:
         # tags.append("from={0}".format(json_data.get("from")))
         tags.append("format={0}".format(json_data.get("format")))
 
-        # Join tags into comma separated string
-        tag_str = ",".join(tags)
+        # Obtain position tags
+        tags = self.parse_position_tags(json_data, tags)
 
         # Create field key lists to iterate through
         field_num_keys = ["latitude", "longitude", "posambiguity", "speed", "course", "timestamp", "altitude"]
@@ -446,12 +703,12 @@ class Parser:
         # Extract number fields from packet
         for key in field_num_keys:
             if key in json_data:
-                fields.append("{0}={1}".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract text fields from packet
         for key in field_text_keys:
             if key in json_data:
-                fields.append("{0}=\"{1}\"".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract path
         if "path" in json_data:
@@ -491,9 +748,7 @@ class Parser:
                 fields.append(rawtimestamp)
 
         # Combine final valid line protocol string
-        fields_str = ",".join(fields)
-
-        return measurement + "," + tag_str + " " + fields_str
+        return self.build_line(json_data, measurement, tags, fields)
 
     def parse_status(self, json_data: dict) -> str:
         """Parse Status APRS packets into influxedb line protocol
@@ -524,9 +779,6 @@ class Parser:
         # Obtain tags
         tags.append("format={0}".format(json_data.get("format")))
 
-        # Join tags into comma separated string
-        tag_str = ",".join(tags)
-
         # Create field key lists to iterate through
         field_num_keys = ["timestamp"]
         field_text_keys = ["from", "via", "to"]
@@ -534,12 +786,12 @@ class Parser:
         # Extract number fields from packet
         for key in field_num_keys:
             if key in json_data:
-                fields.append("{0}={1}".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract text fields from packet
         for key in field_text_keys:
             if key in json_data:
-                fields.append("{0}=\"{1}\"".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract path
         if "path" in json_data:
@@ -567,9 +819,7 @@ class Parser:
                 fields.append(rawtimestamp)
 
         # Combine final valid line protocol string
-        fields_str = ",".join(fields)
-
-        return measurement + "," + tag_str + " " + fields_str
+        return self.build_line(json_data, measurement, tags, fields)
 
     def parse_compressed(self, json_data: dict) -> str:
         """Parse Compressed APRS packets into influxedb line protocol
@@ -585,6 +835,8 @@ class Parser:
         # field = symbol_table
         # field = symbol
         # tag = format
+        # tag = geohash
+        # tag = locator
         # field = via
         # field = messagecapable
         # field = latitude
@@ -624,8 +876,8 @@ class Parser:
         # Obtain tags
         tags.append("format={0}".format(json_data.get("format")))
 
-        # Join tags into comma separated string
-        tag_str = ",".join(tags)
+        # Obtain position tags
+        tags = self.parse_position_tags(json_data, tags)
 
         # Create field key lists to iterate through
         field_num_keys = ["latitude", "longitude", "gpsfixstatus", "altitude", "speed", "course", "timestamp"]
@@ -634,12 +886,12 @@ class Parser:
         # Extract number fields from packet
         for key in field_num_keys:
             if key in json_data:
-                fields.append("{0}={1}".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract text fields from packet
         for key in field_text_keys:
             if key in json_data:
-                fields.append("{0}=\"{1}\"".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract path
         if "path" in json_data:
@@ -655,7 +907,7 @@ class Parser:
         fields = self.parse_telemetry(json_data, fields)
 
         # Extract weather data
-        fields = Parser.parse_weather(json_data, fields)
+        fields = self.parse_weather(json_data, fields)
 
         # Extract raw packet
         if "raw" in json_data:
@@ -676,9 +928,7 @@ class Parser:
                 fields.append(comment)
 
         # Combine final valid line protocol string
-        fields_str = ",".join(fields)
-
-        return measurement + "," + tag_str + " " + fields_str
+        return self.build_line(json_data, measurement, tags, fields)
 
     def parse_wx(self, json_data: dict) -> str:
         """Parse WX APRS packets into influxedb line protocol
@@ -717,16 +967,13 @@ class Parser:
         # Obtain tags
         tags.append("format={0}".format(json_data.get("format")))
 
-        # Join tags into comma separated string
-        tag_str = ",".join(tags)
-
         # Create field key lists to iterate through
         field_text_keys = ["from", "to", "via"]
 
         # Extract text fields from packet
         for key in field_text_keys:
             if key in json_data:
-                fields.append("{0}=\"{1}\"".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract path
         if "path" in json_data:
@@ -751,15 +998,12 @@ class Parser:
                 fields.append(rawtimestamp)
 
         # Obtain weather data
-        fields = Parser.parse_weather(json_data, fields)
+        fields = self.parse_weather(json_data, fields)
 
         # Combine final valid line protocol string
-        fields_str = ",".join(fields)
-
-        return measurement + "," + tag_str + " " + fields_str
+        return self.build_line(json_data, measurement, tags, fields)
 
-    @staticmethod
-    def parse_beacon(json_data: dict) -> str:
+    def parse_beacon(self, json_data: dict) -> str:
         """Parse Beacon APRS packets into influxedb line protocol
 
         keyword arguments:
@@ -786,16 +1030,13 @@ class Parser:
         # Obtain tags
         tags.append("format={0}".format(json_data.get("format")))
 
-        # Join tags into comma separated string
-        tag_str = ",".join(tags)
-
         # Create field key lists to iterate through
         field_text_keys = ["from", "to", "via"]
 
         # Extract text fields from packet
         for key in field_text_keys:
             if key in json_data:
-                fields.append("{0}=\"{1}\"".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract path
         if "path" in json_data:
@@ -814,9 +1055,7 @@ class Parser:
                 fields.append(comment)
 
         # Combine final valid line protocol string
-        fields_str = ",".join(fields)
-
-        return measurement + "," + tag_str + " " + fields_str
+        return self.build_line(json_data, measurement, tags, fields)
 
     def parse_bulletin(self, json_data: dict) -> str:
         """Parse Bulletin APRS packets into influxedb line protocol
@@ -847,9 +1086,6 @@ class Parser:
         # Obtain tags
         tags.append("format={0}".format(json_data.get("format")))
 
-        # Join tags into comma separated string
-        tag_str = ",".join(tags)
-
         # Create field key lists to iterate through
         field_num_keys = ["bid"]
         field_text_keys = ["from", "to", "via"]
@@ -857,12 +1093,12 @@ class Parser:
         # Extract number fields from packet
         for key in field_num_keys:
             if key in json_data:
-                fields.append("{0}={1}".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract text fields from packet
         for key in field_text_keys:
             if key in json_data:
-                fields.append("{0}=\"{1}\"".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract path
         if "path" in json_data:
@@ -887,12 +1123,9 @@ class Parser:
                 fields.append(comment)
 
         # Combine final valid line protocol string
-        fields_str = ",".join(fields)
-
-        return measurement + "," + tag_str + " " + fields_str
+        return self.build_line(json_data, measurement, tags, fields)
 
-    @staticmethod
-    def parse_message(json_data: dict):
+    def parse_message(self, json_data: dict):
         """Parse Message APRS packets into influxedb line protocol
 
         keyword arguments:
@@ -922,9 +1155,6 @@ class Parser:
         # Obtain tags
         tags.append("format={0}".format(json_data.get("format")))
 
-        # Join tags into comma separated string
-        tag_str = ",".join(tags)
-
         # Create field key lists to iterate through
         field_num_keys = ["msgNo"]
         field_text_keys = ["from", "to", "via", "addresse"]
@@ -932,12 +1162,12 @@ class Parser:
         # Extract number fields from packet
         for key in field_num_keys:
             if key in json_data:
-                fields.append("{0}={1}".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract text fields from packet
         for key in field_text_keys:
             if key in json_data:
-                fields.append("{0}=\"{1}\"".format(key, json_data.get(key)))
+                fields = self.parse_field(key, json_data.get(key), fields)
 
         # Extract path
         if "path" in json_data:
@@ -962,9 +1192,7 @@ class Parser:
                 fields.append(comment)
 
         # Combine final valid line protocol string
-        fields_str = ",".join(fields)
-
-        return measurement + "," + tag_str + " " + fields_str
+        return self.build_line(json_data, measurement, tags, fields)
 
     def parse_telemetry_scaling(self, json_data):
         """Parse Telemetry-Message APRS scaling value packets into influxedb line protocol
@@ -980,12 +1208,13 @@ class Parser:
             # If equations present, then add to dictionary of station
             # This is not ideal but required until Grafana supports SELECT queries
             # in templates.
-            self.telemetry_dictionary[json_data.get("from")] = equations
+            self.telemetry_dictionary.put(json_data.get("from"), equations)
 
     @staticmethod
     def parse_text_string(raw_text: str, name) -> str:
         """Parse text strings for invalid characters. Properly escape for
-        line protocol strings if found.
+        line protocol strings if found, and remove the line ends which would
+        split the point.
 
         keyword arguments:
         rawText -- String to be checked
@@ -999,6 +1228,7 @@ class Parser:
         try:
             # Convert to ASCII and replace invalid characters
             text: str = raw_text
+            text = text.replace("\n", "").replace("\r", "")
             text = text.replace("\\", "\\\\")
             text = text.replace("\'", "\\\'")
             text = text.replace("\"", "\\\"")
@@ -1011,6 +1241,24 @@ class Parser:
         except TypeError as e:
             _logger.error(e)
 
+    @staticmethod
+    def parse_tag_string(raw_text: str) -> str:
+        """Escape a string to be used as a line protocol tag key or value,
+        without the line ends it cannot hold
+
+        keyword arguments:
+        raw_text -- String to be escaped
+        """
+
+        text: str = str(raw_text)
+        text = text.replace("\n", "").replace("\r", "")
+        text = text.replace("\\", "\\\\")
+        text = text.replace(",", "\\,")
+        text = text.replace("=", "\\=")
+        text = text.replace(" ", "\\ ")
+
+        return text
+
     @staticmethod
     def parse_path(path: list) -> str:
         """Take path and turn into a string
@@ -1020,7 +1268,7 @@ class Parser:
         """
 
         # Join path items into a string separated by commas, valid line protocol
-        temp: str = ",".join(path)
+        temp: str = ",".join(path).replace("\n", "").replace("\r", "")
         path_str: str = f"path=\"{temp}\""
 
         # Return line protocol string
@@ -0,0 +1,245 @@
+import functools
+import json
+import logging
+import os
+from typing import Iterable, Optional
+
+from config import ConfigParams
+
+_logger = logging.getLogger(__name__)
+
+PARTITION_ALPHABET: str = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+# Table shipped with the project, an estimate of the worldwide APRS-IS feed
+PARTITION_TABLE_FILE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prefixes.json")
+
+# Prefixes heavier than a node share divided by this are split in longer ones
+PARTITION_SPLIT_FACTOR: int = 4
+
+
+class Partition:
+    """Callsign prefixes assigned to one node
+
+    Prefixes are one or two characters long. A callsign belongs to the owner
+    of the longest prefix it starts with: a one character prefix which has
+    been split stands for the callsigns not starting with any of its two
+    character ones.
+
+    keyword arguments:
+    index -- node index, from 0
+    nodes -- number of nodes
+    owners -- prefix to node index dictionary, of every node
+    share -- expected fraction of the feed
+    """
+
+    index: int
+    nodes: int
+    prefixes: list
+    share: float
+
+    _owners: dict
+
+    def __init__(self, index: int, nodes: int, owners: dict, share: float) -> None:
+        super().__init__()
+
+        self.index = index
+        self.nodes = nodes
+        self.prefixes = sorted(prefix for prefix, owner in owners.items() if owner == index)
+        self.share = share
+
+        self._owners = owners
+
+    def aprs_filter(self, base_filter: str = "") -> str:
+        """Server-side filter of this node
+
+        Alone, the filter passes the prefixes of this node, excluding the two
+        character prefixes split from them which belong to other nodes. Terms
+        of a filter are or-ed, so a base filter is narrowed instead by
+        excluding the callsigns of the other nodes.
+        """
+
+        excluded: list = []
+
+        if not base_filter:
+            excluded = sorted(prefix for prefix, owner in self._owners.items()
+                              if owner != self.index and len(prefix) > 1 and self._owners.get(prefix[0]) == self.index)
+
+            return "p/" + "/".join(self.prefixes) + PrefixTable.exclusion(excluded)
+
+        for prefix, owner in self._owners.items():
+            if owner == self.index:
+                continue
+
+            children: list = [prefix + character for character in PARTITION_ALPHABET]
+
+            if len(prefix) > 1 or not any(self._owners.get(child) == self.index for child in children):
+                excluded.append(prefix)
+            else:
+                # Only the callsigns left to the other node, not the prefixes split to this one
+                excluded.extend(child for child in children if child not in self._owners)
+
+        return base_filter + PrefixTable.exclusion(sorted(excluded))
+
+    def contains(self, callsign: str) -> bool:
+        callsign = callsign.upper()
+
+        owner: Optional[int] = self._owners.get(callsign[:2])
+        if owner is None:
+            owner = self._owners.get(callsign[:1])
+
+        return owner == self.index
+
+
+class PrefixTable:
+    """Frequencies of callsign prefixes, split among nodes
+
+    Prefixes are partitioned greedily, the heaviest first to the least loaded
+    node, after splitting the one character prefixes too heavy to balance
+    into the two character ones listed in the table. The result only depends
+    on the table, so every node computes the same partitions on its own, and
+    every callsign starting with a letter or a digit belongs to exactly one.
+
+    keyword arguments:
+    counts -- prefix to packet count dictionary
+    """
+
+    counts: dict
+
+    def __init__(self, counts: dict) -> None:
+        super().__init__()
+
+        self.counts = {prefix.upper(): float(count) for prefix, count in counts.items() if 0 < len(prefix) <= 2}
+
+    @staticmethod
+    def load(path: str = "") -> "PrefixTable":
+        with open(path or PARTITION_TABLE_FILE, "r") as f:
+            return PrefixTable(json.load(f))
+
+    @staticmethod
+    def learn(callsigns: Iterable[str]) -> "PrefixTable":
+        """Counts the prefixes of the given callsigns, e.g. the senders of a
+        recorded feed"""
+
+        counts: dict = {}
+
+        for callsign in callsigns:
+            callsign = callsign.upper()
+            for prefix in {callsign[:1], callsign[:2]}:
+                counts[prefix] = counts.get(prefix, 0) + 1
+
+        return PrefixTable(counts)
+
+    @staticmethod
+    def exclusion(prefixes: list) -> str:
+        if not prefixes:
+            return ""
+
+        return " -p/" + "/".join(prefixes)
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(dict(sorted(self.counts.items())), f, indent=1)
+
+    def partition(self, nodes: int) -> list:
+        """Returns the Partition of every node"""
+
+        leaves: dict = self.leaves(nodes)
+        total: float = sum(leaves.values()) or 1.0
+
+        loads: list = [0.0] * nodes
+        sizes: list = [0] * nodes
+        owners: dict = {}
+
+        for prefix, weight in sorted(leaves.items(), key=lambda item: (-item[1], item[0])):
+            node: int = min(range(nodes), key=lambda index: (loads[index], sizes[index], index))
+            loads[node] += weight
+            sizes[node] += 1
+            owners[prefix] = node
+
+        return [Partition(index=index, nodes=nodes, owners=owners, share=loads[index] / total) for index in range(nodes)]
+
+    def leaves(self, nodes: int) -> dict:
+        """Returns the prefixes to assign, with their weight"""
+
+        total: float = sum(self.counts.get(character, 0.0) for character in PARTITION_ALPHABET)
+        threshold: float = total / (nodes * PARTITION_SPLIT_FACTOR)
+
+        leaves: dict = {}
+
+        for character in PARTITION_ALPHABET:
+            weight: float = self.counts.get(character, 0.0)
+            children: dict = {prefix: count for prefix, count in self.counts.items()
+                              if len(prefix) == 2 and prefix[0] == character}
+
+            if weight > threshold and children:
+                leaves.update(children)
+                weight = max(0.0, weight - sum(children.values()))
+
+            leaves[character] = weight
+
+        return leaves
+
+
+def matches(aprs_filter: str, callsign: str) -> bool:
+    """Whether the prefix terms of a filter pass a sender, as the server
+    evaluates them. Other terms are ignored, passing everything."""
+
+    included, excluded = prefix_terms(aprs_filter)
+
+    callsign = callsign.upper()
+
+    if excluded and callsign.startswith(excluded):
+        return False
+
+    return not included or callsign.startswith(included)
+
+
+@functools.lru_cache(maxsize=64)
+def prefix_terms(aprs_filter: str) -> tuple:
+    """Returns the included and excluded prefixes of a filter, an empty
+    prefix standing for the terms of other kinds"""
+
+    included: list = []
+    excluded: list = []
+
+    for term in aprs_filter.split():
+        target: list = included
+        if term.startswith("-"):
+            target = excluded
+            term = term[1:]
+
+        if term.startswith("p/"):
+            target.extend(prefix.upper() for prefix in term[2:].split("/") if prefix)
+        elif target is included:
+            included.append("")
+
+    return tuple(included), tuple(excluded)
+
+
+def build_partition(config_params: ConfigParams) -> Optional[Partition]:
+    """Partition of this node, None if partitioning is disabled"""
+
+    if config_params.partition_nodes <= 1:
+        return None
+
+    if not 0 <= config_params.partition_index < config_params.partition_nodes:
+        raise ValueError(f"Partition index {config_params.partition_index} out of range "
+                         f"for {config_params.partition_nodes} nodes")
+
+    table: PrefixTable = PrefixTable.load(config_params.partition_table_file)
+
+    return table.partition(config_params.partition_nodes)[config_params.partition_index]
+
+
+def apply_partition(config_params: ConfigParams) -> None:
+    """Narrows the APRS-IS filter to the prefixes of this node"""
+
+    partition: Optional[Partition] = build_partition(config_params)
+    if not partition:
+        return
+
+    config_params.aprs_filter = partition.aprs_filter(config_params.aprs_filter)
+
+    _logger.info(f"Node {partition.index + 1} of {partition.nodes}: {len(partition.prefixes)} prefixes, "
+                 f"{partition.share:.1%} of the feed expected")
+    _logger.debug(f"Partition filter: {config_params.aprs_filter}")
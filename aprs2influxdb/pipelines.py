@@ -0,0 +1,210 @@
+import copy
+import datetime
+import logging
+import os
+import threading
+from typing import Optional
+
+try:
+    import tomllib
+except ImportError:
+    import tomli as tomllib
+
+from influxdb_client import InfluxDBClient
+
+from aprs2influxdb import APRS2InfluxDB
+from config import ConfigParams
+from metrics import Metrics
+from sinks import OUTPUT_INFLUXDB
+from utils import parse_duration, parse_tag_promotion
+
+_logger = logging.getLogger(__name__)
+
+# Settings each pipeline needs its own value of, when set: a port is bound once, and pipelines writing the same file
+# would overwrite each other's state
+UNIQUE_SETTINGS: list = ["api_port", "rollup_state_file", "station_snapshot_file", "dead_letter_file",
+                         "writer_spill_file", "memory_snapshot_file", "archive_directory", "position_index_file"]
+
+
+def load_pipelines(path: str, base: ConfigParams) -> dict:
+    """Reads the pipelines defined in a TOML file, returning a name to
+    ConfigParams dictionary
+
+    Settings are named after ConfigParams properties. Each pipeline starts
+    from the base parameters, given on the command line, then applies the
+    [defaults] table and its own [pipelines.<name>] table:
+
+        [defaults]
+        influxdb_url = "http://influxdb:8086"
+
+        [pipelines.sardinia]
+        aprs_filter = "r/39.2/9.1/100"
+        influxdb_bucket = "sardinia"
+
+    keyword arguments:
+    path -- TOML file path
+    base -- parameters every pipeline starts from
+    """
+
+    with open(path, "rb") as f:
+        document: dict = tomllib.load(f)
+
+    defaults: dict = document.get("defaults", {})
+    tables: dict = document.get("pipelines", {})
+
+    if not tables:
+        raise ValueError(f"No pipelines defined in {path}")
+
+    pipelines: dict = {}
+
+    for name, settings in tables.items():
+        config_params: ConfigParams = copy.deepcopy(base)
+
+        try:
+            apply_settings(config_params, defaults)
+            apply_settings(config_params, settings)
+        except ValueError as e:
+            raise ValueError(f"Pipeline {name}: {e}")
+
+        pipelines[name] = config_params
+
+    check_unique_settings(pipelines)
+
+    return pipelines
+
+
+def check_unique_settings(pipelines: dict) -> None:
+    """Raises ValueError if two pipelines share a setting listed in UNIQUE_SETTINGS"""
+
+    for key in UNIQUE_SETTINGS:
+        owners: dict = {}
+
+        for name, config_params in pipelines.items():
+            value = getattr(config_params, key)
+            if not value:
+                continue
+
+            if isinstance(value, str):
+                value = os.path.abspath(value)
+
+            if value in owners:
+                raise ValueError(f"Pipelines {owners[value]} and {name} share {key} {getattr(config_params, key)}")
+
+            owners[value] = name
+
+
+def apply_settings(config_params: ConfigParams, settings: dict) -> None:
+    """Sets ConfigParams properties, converting values like the command line
+    does: intervals are minutes or durations like "90s", lists and tag
+    promotion can be given as their command line strings"""
+
+    for key, value in settings.items():
+        if not isinstance(getattr(ConfigParams, key, None), property):
+            raise ValueError(f"Unknown setting {key}")
+
+        setattr(config_params, key, convert_setting(key, getattr(config_params, key), value))
+
+
+def convert_setting(key: str, current, value):
+    if isinstance(current, bool):
+        if not isinstance(value, bool):
+            raise ValueError(f"Setting {key} must be true or false")
+        return value
+
+    if isinstance(current, datetime.timedelta):
+        if isinstance(value, str):
+            return parse_duration(value)
+        return datetime.timedelta(minutes=float(value))
+
+    if isinstance(current, list):
+        if isinstance(value, str):
+            return [item.strip() for item in value.split(",") if item.strip()]
+        return list(value)
+
+    if isinstance(current, dict):
+        if isinstance(value, str):
+            return parse_tag_promotion(value)
+        return dict(value)
+
+    if isinstance(current, int) and not isinstance(value, bool):
+        return int(value)
+
+    if isinstance(current, float) and not isinstance(value, bool):
+        return float(value)
+
+    if isinstance(current, str):
+        return str(value)
+
+    raise ValueError(f"Invalid value for setting {key}: {value!r}")
+
+
+class Pipelines:
+    """Several APRS2InfluxDB pipelines sharing the process
+
+    Pipelines share the metrics registry, each one under its name, and an
+    InfluxDB client, i.e. its connection pool, per server. Each pipeline has
+    its own reader and writer threads and its own write queue, so a slow
+    bucket only backs up the pipeline writing to it.
+    """
+
+    _pipelines: dict
+    _metrics: Metrics
+    _influxdb_clients: dict
+
+    def __init__(self, pipelines: dict) -> None:
+        super().__init__()
+
+        self._metrics = Metrics()
+        self._influxdb_clients = {}
+        self._pipelines = {}
+
+        for name, config_params in pipelines.items():
+            self._pipelines[name] = APRS2InfluxDB(
+                config_params,
+                name=name,
+                metrics=self._metrics.scope(name),
+                influxdb=self._influxdb_client(config_params)
+            )
+
+    def start(self) -> None:
+        _logger.info(f"Starting pipelines: {', '.join(self._pipelines)}")
+
+        for pipeline in self._pipelines.values():
+            pipeline.start()
+
+    def stop(self) -> None:
+        """Stops every pipeline in parallel, within the same shutdown timeout"""
+
+        threads: list = [
+            threading.Thread(target=pipeline.stop, name=f"Stop {name}")
+            for name, pipeline in self._pipelines.items()
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for client in self._influxdb_clients.values():
+            client.close()
+
+    def join(self) -> None:
+        for pipeline in self._pipelines.values():
+            pipeline.join()
+
+    def _influxdb_client(self, config_params: ConfigParams) -> Optional[InfluxDBClient]:
+        if config_params.output != OUTPUT_INFLUXDB:
+            return None
+
+        key: tuple = (config_params.influxdb_url, config_params.influxdb_token, config_params.influxdb_org)
+
+        client: Optional[InfluxDBClient] = self._influxdb_clients.get(key)
+        if not client:
+            client = InfluxDBClient(
+                url=config_params.influxdb_url,
+                token=config_params.influxdb_token,
+                org=config_params.influxdb_org
+            )
+            self._influxdb_clients[key] = client
+
+        return client
@@ -0,0 +1,297 @@
+import datetime
+import logging
+import math
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from geo import EARTH_RADIUS, distance
+from metrics import Metrics
+from station import StationTable
+from utils import parse_duration
+
+_logger = logging.getLogger(__name__)
+
+# Formats of the packets positioned by the parser
+POSITION_FORMATS: set = {"uncompressed", "compressed", "mic-e", "object"}
+
+POSITION_COLUMNS: list = ["station", "time", "latitude", "longitude", "altitude", "speed", "course"]
+
+POSITION_SCHEMA: list = [
+    "CREATE TABLE IF NOT EXISTS positions (id INTEGER PRIMARY KEY, station TEXT NOT NULL, time REAL NOT NULL, "
+    "latitude REAL NOT NULL, longitude REAL NOT NULL, altitude REAL, speed REAL, course REAL)",
+    "CREATE INDEX IF NOT EXISTS positions_station ON positions (station, time)",
+    "CREATE INDEX IF NOT EXISTS positions_time ON positions (time)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS positions_rtree USING rtree(id, min_latitude, max_latitude, "
+    "min_longitude, max_longitude, min_time, max_time)"
+]
+
+
+class PositionIndex:
+    """Rolling window of recent positions, indexed in space and time
+
+    Positions are kept in SQLite, in a table and in a three dimensional
+    R*Tree on latitude, longitude and time, so radius and bounding-box
+    queries over a time range only visit the nodes overlapping them. R*Tree
+    coordinates are 32-bit floats rounded outwards, so its candidates are
+    checked against the exact values of the table. Tracks are read from the
+    table through its station index.
+
+    Positions are buffered and inserted in one transaction per batch, and
+    those older than the window are evicted by tick.
+
+    keyword arguments:
+    window -- how long positions are kept
+    path -- SQLite database file, in memory if empty
+    batch_size -- positions buffered before being inserted
+    metrics -- metrics registry
+    """
+
+    _window: float
+    _batch_size: int
+    _metrics: Optional[Metrics]
+
+    _lock: threading.Lock
+    _connection: sqlite3.Connection
+    _pending: list
+    _next_id: int
+
+    def __init__(self, window: datetime.timedelta, path: str = "", batch_size: int = 1000,
+                 metrics: Optional[Metrics] = None) -> None:
+        super().__init__()
+
+        self._window = window.total_seconds()
+        self._batch_size = batch_size
+        self._metrics = metrics
+
+        self._lock = threading.Lock()
+        self._pending = []
+
+        # Used by the reader, the heartbeat and the API threads, one at a time
+        self._connection = sqlite3.connect(path or ":memory:", check_same_thread=False)
+
+        with self._connection:
+            for statement in POSITION_SCHEMA:
+                self._connection.execute(statement)
+
+        self._next_id = self._connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM positions").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._flush()
+            return self._connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def add(self, packet: dict, now: Optional[float] = None) -> None:
+        """Buffers the position of a packet, if any"""
+
+        if packet.get("format") not in POSITION_FORMATS:
+            return
+
+        station: Optional[str] = StationTable.get_callsign(packet)
+
+        try:
+            latitude: float = float(packet["latitude"])
+            longitude: float = float(packet["longitude"])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        if not station or not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return
+
+        position: tuple = (station, now or time.time(), latitude, longitude,
+                           PositionIndex._number(packet.get("altitude")),
+                           PositionIndex._number(packet.get("speed")),
+                           PositionIndex._number(packet.get("course")))
+
+        with self._lock:
+            self._pending.append(position)
+
+            if len(self._pending) >= self._batch_size:
+                self._flush()
+
+    def tick(self, now: Optional[float] = None) -> None:
+        """Inserts the buffered positions and evicts those out of the window"""
+
+        horizon: float = (now or time.time()) - self._window
+
+        with self._lock:
+            self._flush()
+
+            with self._connection:
+                self._connection.execute("DELETE FROM positions_rtree WHERE id IN "
+                                         "(SELECT id FROM positions WHERE time < ?)", (horizon,))
+                evicted: int = self._connection.execute("DELETE FROM positions WHERE time < ?", (horizon,)).rowcount
+
+        if evicted:
+            _logger.debug(f"Evicted {evicted} positions")
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._connection.close()
+
+    def in_bounding_box(self, min_latitude: float, min_longitude: float, max_latitude: float, max_longitude: float,
+                        since: float, until: Optional[float] = None) -> list:
+        """Returns the last position in the bounding box of each station
+        found there between since and until, in seconds since the epoch
+
+        A box whose minimum longitude is above its maximum crosses the
+        antimeridian.
+        """
+
+        rows: list = self._in_boxes(PositionIndex._boxes(min_latitude, min_longitude, max_latitude, max_longitude),
+                                    since, until)
+
+        return PositionIndex._latest(rows)
+
+    def nearby(self, latitude: float, longitude: float, radius: float, since: float,
+               until: Optional[float] = None) -> list:
+        """Returns the last position within radius meters of each station
+        found there between since and until, nearest first"""
+
+        delta_latitude: float = math.degrees(radius / EARTH_RADIUS)
+        min_latitude: float = latitude - delta_latitude
+        max_latitude: float = latitude + delta_latitude
+
+        if min_latitude <= -90 or max_latitude >= 90:
+            # The circle contains a pole, so every longitude
+            boxes: list = [(max(min_latitude, -90.0), -180.0, min(max_latitude, 90.0), 180.0)]
+        else:
+            delta_longitude: float = math.degrees(math.asin(min(1.0, math.sin(radius / EARTH_RADIUS) /
+                                                                math.cos(math.radians(latitude)))))
+            boxes = PositionIndex._boxes(min_latitude, PositionIndex._wrap(longitude - delta_longitude),
+                                         max_latitude, PositionIndex._wrap(longitude + delta_longitude))
+
+        rows: list = [row for row in self._in_boxes(boxes, since, until)
+                      if distance(latitude, longitude, row[2], row[3]) <= radius]
+
+        positions: list = []
+
+        for position in PositionIndex._latest(rows):
+            position["distance"] = distance(latitude, longitude, position["latitude"], position["longitude"])
+            positions.append(position)
+
+        return sorted(positions, key=lambda item: item["distance"])
+
+    def track(self, station: str, since: float, until: Optional[float] = None) -> list:
+        """Returns the positions of a station between since and until, oldest first"""
+
+        with self._lock:
+            self._flush()
+
+            rows: list = self._connection.execute(
+                f"SELECT {', '.join(POSITION_COLUMNS)} FROM positions "
+                "WHERE station = ? AND time >= ? AND time <= ? ORDER BY time",
+                (station, since, until if until is not None else math.inf)
+            ).fetchall()
+
+        return [dict(zip(POSITION_COLUMNS, row)) for row in rows]
+
+    def api_nearby(self, query: dict) -> list:
+        try:
+            latitude: float = float(query["latitude"])
+            longitude: float = float(query["longitude"])
+        except KeyError:
+            raise ValueError("Missing latitude or longitude")
+
+        radius: float = float(query.get("radius", "10")) * 1000
+
+        return self.nearby(latitude, longitude, radius, self._since(query))
+
+    def api_positions(self, query: dict) -> list:
+        bbox: str = query.get("bbox", "")
+        if not bbox:
+            raise ValueError("Missing bbox, expected min_lat,min_lon,max_lat,max_lon")
+
+        values: list = [float(value) for value in bbox.split(",")]
+        if len(values) != 4:
+            raise ValueError("Invalid bbox, expected min_lat,min_lon,max_lat,max_lon")
+
+        return self.in_bounding_box(*values, since=self._since(query))
+
+    def api_track(self, query: dict) -> list:
+        callsign: str = query.get("callsign", "")
+        if not callsign:
+            raise ValueError("Missing callsign")
+
+        return self.track(callsign, self._since(query))
+
+    def _since(self, query: dict) -> float:
+        last: float = self._window
+        if query.get("last"):
+            last = parse_duration(query.get("last")).total_seconds()
+
+        return time.time() - last
+
+    def _in_boxes(self, boxes: list, since: float, until: Optional[float]) -> list:
+        until = until if until is not None else math.inf
+        rows: list = []
+
+        with self._lock:
+            self._flush()
+
+            for min_latitude, min_longitude, max_latitude, max_longitude in boxes:
+                rows.extend(self._connection.execute(
+                    f"SELECT {', '.join('p.' + column for column in POSITION_COLUMNS)} "
+                    "FROM positions_rtree AS r JOIN positions AS p ON p.id = r.id "
+                    "WHERE r.max_latitude >= ? AND r.min_latitude <= ? AND r.max_longitude >= ? "
+                    "AND r.min_longitude <= ? AND r.max_time >= ? AND r.min_time <= ? "
+                    "AND p.latitude BETWEEN ? AND ? AND p.longitude BETWEEN ? AND ? AND p.time BETWEEN ? AND ?",
+                    (min_latitude, max_latitude, min_longitude, max_longitude, since, until,
+                     min_latitude, max_latitude, min_longitude, max_longitude, since, until)
+                ).fetchall())
+
+        return rows
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+
+        rows: list = [(self._next_id + offset,) + position for offset, position in enumerate(self._pending)]
+
+        try:
+            with self._connection:
+                self._connection.executemany("INSERT INTO positions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self._connection.executemany(
+                    "INSERT INTO positions_rtree VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(row[0], row[3], row[3], row[4], row[4], row[2], row[2]) for row in rows]
+                )
+        except sqlite3.Error as e:
+            _logger.error(f"Unable to index positions: {e}")
+            if self._metrics:
+                self._metrics.increment("position_index_failures")
+        else:
+            self._next_id += len(rows)
+            if self._metrics:
+                self._metrics.increment("position_index_inserts", len(rows))
+
+        self._pending = []
+
+    @staticmethod
+    def _latest(rows: list) -> list:
+        latest: dict = {}
+
+        for row in rows:
+            if row[0] not in latest or row[1] > latest[row[0]][1]:
+                latest[row[0]] = row
+
+        return [dict(zip(POSITION_COLUMNS, row)) for row in latest.values()]
+
+    @staticmethod
+    def _boxes(min_latitude: float, min_longitude: float, max_latitude: float, max_longitude: float) -> list:
+        if min_longitude <= max_longitude:
+            return [(min_latitude, min_longitude, max_latitude, max_longitude)]
+
+        return [(min_latitude, min_longitude, max_latitude, 180.0), (min_latitude, -180.0, max_latitude, max_longitude)]
+
+    @staticmethod
+    def _wrap(longitude: float) -> float:
+        return (longitude + 180) % 360 - 180
+
+    @staticmethod
+    def _number(value) -> Optional[float]:
+        try:
+            return float(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,303 @@
+import multiprocessing
+import multiprocessing.context
+import multiprocessing.synchronize
+import struct
+import time
+import zlib
+from multiprocessing import shared_memory
+from typing import Optional
+
+# Bytes of the control block per counter group, a cache line each so the producer and consumers do not share one
+RING_SLOT: int = 64
+
+# Header of a record: length of the lines, consumer, receive timestamp; records are aligned on 8 bytes
+RING_RECORD: struct.Struct = struct.Struct("<IId")
+
+# Size marking the end of the data region, the next record being at its start
+RING_WRAP: int = 0xFFFFFFFF
+
+# Bytes pending for a sleeping consumer before the producer wakes it up, half the ring at most
+RING_WAKE_BYTES: int = 65536
+
+# Seconds a consumer sleeps at most, bounding how long fewer pending bytes wait
+RING_WAIT_TIMEOUT: float = 0.05
+
+
+class LineRing:
+    """Single-producer, multi-consumer ring of raw lines in shared memory
+
+    The producer copies each read of the feed into the ring as one record
+    per consumer: the time it was received and the length of its lines,
+    then the lines, separated by line ends. Consumers, threads or
+    processes, get the lines of each record as a memoryview slice of the
+    shared memory, so nothing is pickled or copied on the way, and split it
+    in one call when they need the lines as bytes. Lines of about a hundred
+    bytes are not worth a view each: going through the buffer protocol for
+    each one costs more than copying them. Each line goes to one consumer,
+    chosen by its source callsign, so a station is always parsed by the same
+    consumer and the state kept per station stays consistent.
+
+    Each consumer has its own tail, the producer overwriting only what every
+    consumer has released. Wakeups are batched, as each one costs system
+    calls and a context switch: a consumer raises a flag before sleeping,
+    and the producer only signals it once RING_WAKE_BYTES are pending for
+    it. Below that, the lines wait until the consumer wakes up on its own,
+    after RING_WAIT_TIMEOUT at most. Counters are 8-byte aligned words
+    written in one store, and the producer writes records before the head
+    publishing them, relying on stores being seen in order, as on x86-64.
+
+    The ring is passed to consumer processes as an argument, which attaches
+    them to the shared memory. It is unlinked by the process creating it.
+
+    keyword arguments:
+    size -- bytes of the data region, rounded down to 8
+    consumers -- number of consumers, each reading with reader(index)
+    context -- multiprocessing context of the consumer processes, the default one if not given
+    """
+
+    _capacity: int
+    _consumers: int
+    _owner: bool
+
+    _memory: shared_memory.SharedMemory
+    _counters: memoryview
+    _data: memoryview
+    _events: list
+
+    _head: int
+
+    def __init__(self, size: int, consumers: int = 1,
+                 context: Optional[multiprocessing.context.BaseContext] = None) -> None:
+        super().__init__()
+
+        if size < RING_SLOT or consumers < 1:
+            raise ValueError(f"Invalid ring of {size} bytes for {consumers} consumers")
+
+        self._capacity = size & ~7
+        self._consumers = consumers
+        self._owner = True
+
+        self._memory = shared_memory.SharedMemory(create=True, size=RING_SLOT * (consumers + 1) + self._capacity)
+        self._memory.buf[:RING_SLOT * (consumers + 1)] = bytes(RING_SLOT * (consumers + 1))
+        self._attach()
+
+        self._events = [(context or multiprocessing).Event() for _ in range(consumers)]
+        self._head = 0
+
+    def __getstate__(self) -> dict:
+        return {"name": self._memory.name, "capacity": self._capacity, "consumers": self._consumers,
+                "events": self._events}
+
+    def __setstate__(self, state: dict) -> None:
+        self._capacity = state["capacity"]
+        self._consumers = state["consumers"]
+        self._owner = False
+
+        self._memory = shared_memory.SharedMemory(name=state["name"])
+        self._attach()
+
+        self._events = state["events"]
+        self._head = self._counters[0]
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @property
+    def used(self) -> float:
+        """Share of the ring not yet released by the slowest consumer"""
+
+        return (self._head - self._tail()) / self._capacity
+
+    @staticmethod
+    def minimum_size(read_size: int, consumers: int = 1) -> int:
+        """Bytes of a ring taking reads of up to read_size bytes of lines
+
+        Half the ring at most may be left unused before its end when the
+        records of a read do not fit there, so a larger read would never be
+        written, however far the consumers catch up.
+        """
+
+        return 2 * (read_size + consumers * (RING_RECORD.size + 7))
+
+    def write(self, lines: list, timestamp: float) -> bool:
+        """Copies the lines of a read received at timestamp, without their line
+        ends, into the ring and wakes up the consumers. Returns False, writing
+        nothing, when the ring is too full for them until the consumers catch
+        up."""
+
+        if not lines:
+            return True
+
+        if self._consumers == 1:
+            groups: dict = {0: lines}
+        else:
+            groups = {}
+            for line in lines:
+                groups.setdefault(zlib.crc32(line.partition(b">")[0]) % self._consumers, []).append(line)
+
+        capacity: int = self._capacity
+        head: int = self._head
+        records: list = []
+
+        for consumer, group in groups.items():
+            payload: bytes = b"\n".join(group)
+            record: int = (RING_RECORD.size + len(payload) + 7) & ~7
+
+            # A record does not straddle the end of the region
+            offset: int = head % capacity
+            if capacity - offset < record:
+                records.append((offset, None, None))
+                head += capacity - offset
+                offset = 0
+
+            records.append((offset, consumer, payload))
+            head += record
+
+        if head - self._tail() > capacity:
+            return False
+
+        data: memoryview = self._data
+
+        for offset, consumer, payload in records:
+            if payload is None:
+                struct.pack_into("<I", data, offset, RING_WRAP)
+                continue
+
+            RING_RECORD.pack_into(data, offset, len(payload), consumer, timestamp)
+            data[offset + RING_RECORD.size:offset + RING_RECORD.size + len(payload)] = payload
+
+        self._head = head
+        self._counters[0] = head
+
+        for index, event in enumerate(self._events):
+            slot: int = (index + 1) * RING_SLOT // 8
+            if self._counters[slot + 1] and head - self._counters[slot] >= min(RING_WAKE_BYTES, capacity // 2):
+                event.set()
+
+        return True
+
+    def reader(self, index: int) -> "RingReader":
+        if not 0 <= index < self._consumers:
+            raise ValueError(f"Invalid consumer {index} of {self._consumers}")
+
+        return RingReader(self, index)
+
+    def close(self) -> None:
+        """Detaches from the shared memory, once the readers are closed"""
+
+        self._counters.release()
+        self._data.release()
+        self._memory.close()
+
+    def unlink(self) -> None:
+        if self._owner:
+            self._memory.unlink()
+
+    def _attach(self) -> None:
+        control: int = RING_SLOT * (self._consumers + 1)
+
+        self._counters = self._memory.buf[:control].cast("Q")
+        self._data = self._memory.buf[control:control + self._capacity]
+
+    def _tail(self) -> int:
+        return min(self._counters[(index + 1) * RING_SLOT // 8] for index in range(self._consumers))
+
+
+class RingReader:
+    """Consumer of a line ring
+
+    Records are released at the next read, or when the reader is closed:
+    the views returned by a read are only valid until then.
+
+    keyword arguments:
+    ring -- line ring read
+    index -- index of the consumer
+    """
+
+    _ring: LineRing
+    _index: int
+    _tail: int
+    _waiting: int
+    _event: multiprocessing.synchronize.Event
+    _position: int
+    _views: list
+
+    def __init__(self, ring: LineRing, index: int) -> None:
+        super().__init__()
+
+        self._ring = ring
+        self._index = index
+        self._tail = (index + 1) * RING_SLOT // 8
+        self._waiting = self._tail + 1
+        self._event = ring._events[index]
+        self._position = ring._counters[self._tail]
+        self._views = []
+
+    def read(self, timeout: Optional[float] = RING_WAIT_TIMEOUT) -> list:
+        """Releases the records of the previous read and returns the reads
+        written for this consumer since, as (timestamp, view of the lines),
+        waiting up to timeout for some. The lines of a view are
+        bytes(view).split(b"\\n")."""
+
+        self._release()
+
+        counters: memoryview = self._ring._counters
+        head: int = counters[0]
+
+        if head == self._position and timeout:
+            deadline: float = time.monotonic() + timeout
+            counters[self._waiting] = 1
+
+            # Records published before the producer sees the flag do not wake the consumer up either
+            while counters[0] == self._position:
+                remaining: float = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                self._event.wait(min(remaining, RING_WAIT_TIMEOUT))
+                self._event.clear()
+
+            counters[self._waiting] = 0
+            head = counters[0]
+
+        capacity: int = self._ring._capacity
+        data: memoryview = self._ring._data
+        reads: list = []
+        position: int = self._position
+
+        while position < head:
+            offset: int = position % capacity
+
+            # Only a wrap marker fits before the end of the region
+            if capacity - offset < RING_RECORD.size:
+                position += capacity - offset
+                continue
+
+            size, consumer, timestamp = RING_RECORD.unpack_from(data, offset)
+
+            if size == RING_WRAP:
+                position += capacity - offset
+                continue
+
+            if consumer == self._index:
+                view: memoryview = data[offset + RING_RECORD.size:offset + RING_RECORD.size + size]
+                self._views.append(view)
+                reads.append((timestamp, view))
+
+            position += (RING_RECORD.size + size + 7) & ~7
+
+        self._position = position
+
+        return reads
+
+    def close(self) -> None:
+        self._release()
+
+    def _release(self) -> None:
+        for view in self._views:
+            view.release()
+        self._views = []
+
+        # Only released records may be overwritten
+        self._ring._counters[self._tail] = self._position
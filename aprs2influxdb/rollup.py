@@ -0,0 +1,272 @@
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from parser import Parser, WEATHER_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+
+class RollupWindow:
+    label: str
+    size: int
+    start: int
+
+    formats: dict
+    stations: dict
+    igates: dict
+    weather: dict
+
+    def __init__(self, label: str, size: int, start: int) -> None:
+        super().__init__()
+
+        self.label = label
+        self.size = size
+        self.start = start
+
+        self.formats = {}
+        self.stations = {}
+        self.igates = {}
+        self.weather = {}
+
+    def add(self, packet: dict) -> None:
+        packet_format = packet.get("format")
+        if packet_format:
+            self.formats[packet_format] = self.formats.get(packet_format, 0) + 1
+
+        station = packet.get("from")
+        if station:
+            self.stations[station] = self.stations.get(station, 0) + 1
+
+        igate = Rollup.get_igate(packet)
+        if igate:
+            self.igates[igate] = self.igates.get(igate, 0) + 1
+
+        items = packet.get("weather")
+        if station and items:
+            station_weather: dict = self.weather.setdefault(station, {})
+            for key in WEATHER_FIELDS:
+                value = items.get(key)
+                if not isinstance(value, (int, float)):
+                    continue
+
+                stats = station_weather.get(key)
+                if stats:
+                    stats[0] = min(stats[0], value)
+                    stats[1] = max(stats[1], value)
+                    stats[2] += value
+                    stats[3] += 1
+                else:
+                    station_weather[key] = [value, value, value, 1]
+
+    def merge(self, state: dict) -> None:
+        for name in ["formats", "stations", "igates"]:
+            counters: dict = getattr(self, name)
+            for key, value in state.get(name, {}).items():
+                counters[key] = counters.get(key, 0) + value
+
+        for station, station_state in state.get("weather", {}).items():
+            station_weather: dict = self.weather.setdefault(station, {})
+            for key, (minimum, maximum, total, count) in station_state.items():
+                stats = station_weather.get(key)
+                if stats:
+                    stats[0] = min(stats[0], minimum)
+                    stats[1] = max(stats[1], maximum)
+                    stats[2] += total
+                    stats[3] += count
+                else:
+                    station_weather[key] = [minimum, maximum, total, count]
+
+    def to_state(self) -> dict:
+        return {
+            "start": self.start,
+            "formats": self.formats,
+            "stations": self.stations,
+            "igates": self.igates,
+            "weather": self.weather
+        }
+
+    def to_lines(self) -> list:
+        """Converts the window accumulators into rollup_* line protocol strings
+
+        Every point is timestamped at the window start, so writing the same
+        window again (e.g. a partial flush followed by the final one) replaces
+        the previous values instead of adding a new point.
+        """
+
+        window_tag: str = f"window={Parser.parse_tag_string(self.label)}"
+        timestamp: int = self.start * 1000000000
+
+        lines: list = []
+
+        for key, count in self.formats.items():
+            lines.append(f"rollup_format,{window_tag},format={Parser.parse_tag_string(key)} "
+                         f"count={count}i {timestamp}")
+
+        for key, count in self.stations.items():
+            lines.append(f"rollup_station,{window_tag},from={Parser.parse_tag_string(key)} "
+                         f"count={count}i {timestamp}")
+
+        for key, count in self.igates.items():
+            lines.append(f"rollup_igate,{window_tag},igate={Parser.parse_tag_string(key)} "
+                         f"count={count}i {timestamp}")
+
+        for station, station_weather in self.weather.items():
+            fields: list = []
+            for key, (minimum, maximum, total, count) in station_weather.items():
+                fields.append(f"{key}_min={minimum}")
+                fields.append(f"{key}_max={maximum}")
+                fields.append(f"{key}_mean={total / count}")
+                fields.append(f"{key}_count={count}i")
+
+            if fields:
+                lines.append(f"rollup_weather,{window_tag},from={Parser.parse_tag_string(station)} "
+                             f"{','.join(fields)} {timestamp}")
+
+        return lines
+
+
+class Rollup:
+    _lock: threading.Lock
+
+    _sizes: dict
+    _windows: dict
+
+    _state_file: str
+
+    def __init__(self, windows: list, state_file: str = "") -> None:
+        super().__init__()
+
+        self._lock = threading.Lock()
+
+        self._sizes = {}
+        for label, size in windows:
+            self._sizes[label] = int(size.total_seconds())
+
+        self._windows = {}
+        self._state_file = state_file
+
+    @staticmethod
+    def get_igate(packet: dict) -> Optional[str]:
+        """Returns the igate which gated the packet to APRS-IS
+
+        aprslib already reports it as "via", otherwise it is the element which
+        follows the q construct in the path.
+        """
+
+        if packet.get("via"):
+            return packet.get("via")
+
+        path: list = packet.get("path") or []
+        for index, item in enumerate(path[:-1]):
+            if item.startswith("qA"):
+                return path[index + 1]
+
+        return None
+
+    @staticmethod
+    def _timestamp(now: Optional[datetime.datetime]) -> int:
+        if now:
+            return int(now.timestamp())
+
+        return int(time.time())
+
+    def add(self, packet: dict, now: Optional[datetime.datetime] = None) -> list:
+        """Accounts a packet into every window, returning lines of closed windows"""
+
+        timestamp: int = Rollup._timestamp(now)
+
+        with self._lock:
+            lines: list = self._close_windows(timestamp)
+
+            for label, size in self._sizes.items():
+                window: Optional[RollupWindow] = self._windows.get(label)
+                if not window:
+                    window = RollupWindow(label, size, timestamp - timestamp % size)
+                    self._windows[label] = window
+
+                window.add(packet)
+
+            return lines
+
+    def tick(self, now: Optional[datetime.datetime] = None) -> list:
+        """Returns lines of windows which have been closed by the clock"""
+
+        timestamp: int = Rollup._timestamp(now)
+
+        with self._lock:
+            return self._close_windows(timestamp)
+
+    def flush(self) -> list:
+        """Returns lines of every open window and saves their state
+
+        Used on shutdown: the partial windows are written and their state is
+        persisted, so after a restart within the same window the accumulators
+        resume from it and the final write carries the complete values.
+        """
+
+        with self._lock:
+            lines: list = []
+            for window in self._windows.values():
+                lines.extend(window.to_lines())
+
+            self._save_state()
+
+            return lines
+
+    def load(self, now: Optional[datetime.datetime] = None) -> None:
+        """Restores accumulators of windows which are still open"""
+
+        if not self._state_file or not os.path.exists(self._state_file):
+            return
+
+        timestamp: int = Rollup._timestamp(now)
+
+        try:
+            with open(self._state_file, "r") as f:
+                state: dict = json.load(f)
+        except (OSError, ValueError) as e:
+            _logger.error(f"Unable to load rollup state: {e}")
+            return
+
+        with self._lock:
+            for label, window_state in state.items():
+                size = self._sizes.get(label)
+                if not size or window_state.get("start") != timestamp - timestamp % size:
+                    continue
+
+                window = RollupWindow(label, size, window_state.get("start"))
+                window.merge(window_state)
+                self._windows[label] = window
+
+                _logger.info(f"Restored rollup window {label}")
+
+    def _close_windows(self, timestamp: int) -> list:
+        lines: list = []
+
+        for label, window in list(self._windows.items()):
+            if timestamp < window.start + window.size:
+                continue
+
+            lines.extend(window.to_lines())
+            del self._windows[label]
+
+        return lines
+
+    def _save_state(self) -> None:
+        if not self._state_file:
+            return
+
+        state: dict = {}
+        for label, window in self._windows.items():
+            state[label] = window.to_state()
+
+        try:
+            with open(self._state_file, "w") as f:
+                json.dump(state, f)
+        except OSError as e:
+            _logger.error(f"Unable to save rollup state: {e}")
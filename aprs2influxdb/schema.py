@@ -0,0 +1,251 @@
+import logging
+import math
+from typing import Optional
+
+from metrics import Metrics
+
+_logger = logging.getLogger(__name__)
+
+FIELD_TYPE_FLOAT: str = "float"
+FIELD_TYPE_INTEGER: str = "integer"
+FIELD_TYPE_BOOLEAN: str = "boolean"
+FIELD_TYPE_STRING: str = "string"
+
+# Numbers have always been written without the integer suffix, so InfluxDB
+# stored them as floats, and messagecapable as the strings "True" and "False":
+# pinning them to these types keeps existing buckets valid. Message numbers
+# stay floats too, alphanumeric ones being dropped and counted as conflicts,
+# as InfluxDB rejected their points before.
+DEFAULT_FIELD_TYPES: dict = {
+    "latitude": FIELD_TYPE_FLOAT,
+    "longitude": FIELD_TYPE_FLOAT,
+    "posambiguity": FIELD_TYPE_FLOAT,
+    "altitude": FIELD_TYPE_FLOAT,
+    "speed": FIELD_TYPE_FLOAT,
+    "course": FIELD_TYPE_FLOAT,
+    "gpsfixstatus": FIELD_TYPE_FLOAT,
+    "timestamp": FIELD_TYPE_FLOAT,
+    "mbits": FIELD_TYPE_FLOAT,
+    "bid": FIELD_TYPE_FLOAT,
+    "seq": FIELD_TYPE_FLOAT,
+    "bits": FIELD_TYPE_FLOAT,
+    "analog1": FIELD_TYPE_FLOAT,
+    "analog2": FIELD_TYPE_FLOAT,
+    "analog3": FIELD_TYPE_FLOAT,
+    "analog4": FIELD_TYPE_FLOAT,
+    "analog5": FIELD_TYPE_FLOAT,
+    "humidity": FIELD_TYPE_FLOAT,
+    "pressure": FIELD_TYPE_FLOAT,
+    "rain_1h": FIELD_TYPE_FLOAT,
+    "rain_24h": FIELD_TYPE_FLOAT,
+    "rain_since_midnight": FIELD_TYPE_FLOAT,
+    "temperature": FIELD_TYPE_FLOAT,
+    "wind_direction": FIELD_TYPE_FLOAT,
+    "wind_gust": FIELD_TYPE_FLOAT,
+    "wind_speed": FIELD_TYPE_FLOAT,
+    "msgNo": FIELD_TYPE_FLOAT,
+    "messagecapable": FIELD_TYPE_STRING,
+    "from": FIELD_TYPE_STRING,
+    "to": FIELD_TYPE_STRING,
+    "via": FIELD_TYPE_STRING,
+    "phg": FIELD_TYPE_STRING,
+    "rng": FIELD_TYPE_STRING,
+    "mtype": FIELD_TYPE_STRING,
+    "daodatumbyte": FIELD_TYPE_STRING,
+    "alive": FIELD_TYPE_STRING,
+    "object_format": FIELD_TYPE_STRING,
+    "object_name": FIELD_TYPE_STRING,
+    "addresse": FIELD_TYPE_STRING
+}
+
+# Types of fields pinned instead when seeding finds the bucket does not hold them yet
+SEED_FIELD_TYPES: dict = {
+    "messagecapable": FIELD_TYPE_BOOLEAN
+}
+
+# InfluxDB column data types, as reported by Flux query results
+INFLUXDB_FIELD_TYPES: dict = {
+    "double": FIELD_TYPE_FLOAT,
+    "long": FIELD_TYPE_INTEGER,
+    "unsignedLong": FIELD_TYPE_INTEGER,
+    "boolean": FIELD_TYPE_BOOLEAN,
+    "string": FIELD_TYPE_STRING
+}
+
+BOOLEAN_VALUES: dict = {
+    "true": True,
+    "t": True,
+    "yes": True,
+    "1": True,
+    "false": False,
+    "f": False,
+    "no": False,
+    "0": False
+}
+
+
+class FieldSchema:
+    """Registry pinning the line protocol type of each field
+
+    Values are coerced to the pinned type, so a field never changes type from
+    one point to another and InfluxDB never rejects a point for a conflict.
+    Fields not yet known are pinned by the type of their first value.
+    """
+
+    _types: dict
+    _metrics: Optional[Metrics]
+
+    def __init__(self, metrics: Optional[Metrics] = None) -> None:
+        super().__init__()
+
+        self._types = dict(DEFAULT_FIELD_TYPES)
+        self._metrics = metrics
+
+    def pin(self, key: str, field_type: str) -> None:
+        previous: Optional[str] = self._types.get(key)
+        if previous and previous != field_type:
+            _logger.info(f"Field {key} pinned to {field_type} instead of {previous}")
+
+        self._types[key] = field_type
+
+    def get(self, key: str) -> Optional[str]:
+        return self._types.get(key)
+
+    def format_field(self, key: str, value) -> Optional[str]:
+        """Returns the "key=value" line protocol field, or None if the value
+        cannot be coerced to the pinned type"""
+
+        field_type: Optional[str] = self._types.get(key)
+        if not field_type:
+            field_type = FieldSchema._type_of(value)
+            self._types[key] = field_type
+
+        try:
+            formatted, coerced = FieldSchema._format_value(field_type, value)
+        except (ValueError, TypeError, OverflowError):
+            _logger.debug(f"Field {key} dropped: {value!r} is not {field_type}")
+            self._count("schema_conflicts")
+            return None
+
+        if coerced:
+            self._count("schema_coercions")
+
+        return f"{key}={formatted}"
+
+    def format_column(self, key: str, values: list, absent=None) -> list:
+        """Returns the "key=value" line protocol fields of a column of values,
+        None for the values which cannot be coerced and those which are absent
+
+        Fields are identical to those of format_field, but the pinned type is
+        looked up once for the column, and only the values which need checking
+        or converting go through format_field.
+        """
+
+        field_type: Optional[str] = self._types.get(key)
+        prefix: str = key + "="
+
+        if field_type == FIELD_TYPE_FLOAT:
+            return [prefix + str(value) if (value_type := type(value)) is int or value_type is float and
+                    math.isfinite(value) else None if value is absent else self.format_field(key, value)
+                    for value in values]
+
+        if field_type == FIELD_TYPE_STRING:
+            return [prefix + "\"" + value + "\"" if type(value) is str and "\\" not in value and "\"" not in value and
+                    "\n" not in value and "\r" not in value
+                    else None if value is absent else self.format_field(key, value)
+                    for value in values]
+
+        return [None if value is absent else self.format_field(key, value) for value in values]
+
+    @staticmethod
+    def coerce(field_type: str, value):
+        """Returns the value converted to a field type, raising ValueError or
+        TypeError if it cannot be"""
+
+        if field_type == FIELD_TYPE_FLOAT:
+            number: float = float(value)
+            if not math.isfinite(number):
+                raise ValueError("Not finite")
+
+            return number
+
+        if field_type == FIELD_TYPE_INTEGER:
+            if isinstance(value, float) and not value.is_integer():
+                raise ValueError("Not an integer")
+
+            return int(value)
+
+        if field_type == FIELD_TYPE_BOOLEAN:
+            if isinstance(value, bool):
+                return value
+
+            flag: Optional[bool] = BOOLEAN_VALUES.get(str(value).strip().lower())
+            if flag is None:
+                raise ValueError("Not a boolean")
+
+            return flag
+
+        return str(value)
+
+    def _count(self, name: str) -> None:
+        if self._metrics:
+            self._metrics.increment(name)
+
+    @staticmethod
+    def _type_of(value) -> str:
+        if isinstance(value, bool):
+            return FIELD_TYPE_BOOLEAN
+
+        if isinstance(value, (int, float)):
+            return FIELD_TYPE_FLOAT
+
+        return FIELD_TYPE_STRING
+
+    @staticmethod
+    def _format_value(field_type: str, value) -> tuple:
+        """Returns the formatted value and whether it had to be coerced"""
+
+        if field_type == FIELD_TYPE_FLOAT:
+            if isinstance(value, bool):
+                return str(float(value)), True
+
+            if isinstance(value, (int, float)):
+                if isinstance(value, float) and not math.isfinite(value):
+                    raise ValueError("Not finite")
+
+                # Integers without suffix are read as floats by InfluxDB
+                return str(value), False
+
+            number: float = float(value)
+            if not math.isfinite(number):
+                raise ValueError("Not finite")
+
+            return str(number), True
+
+        if field_type == FIELD_TYPE_INTEGER:
+            if isinstance(value, int) and not isinstance(value, bool):
+                return f"{value}i", False
+
+            if isinstance(value, float):
+                if not value.is_integer():
+                    raise ValueError("Not an integer")
+                return f"{int(value)}i", True
+
+            return f"{int(value)}i", True
+
+        if field_type == FIELD_TYPE_BOOLEAN:
+            if isinstance(value, bool):
+                return ("true" if value else "false"), False
+
+            flag: Optional[bool] = BOOLEAN_VALUES.get(str(value).strip().lower())
+            if flag is None:
+                raise ValueError("Not a boolean")
+
+            return ("true" if flag else "false"), True
+
+        text: str = str(value)
+        text = text.replace("\n", "").replace("\r", "")
+        text = text.replace("\\", "\\\\")
+        text = text.replace("\"", "\\\"")
+
+        return f"\"{text}\"", not isinstance(value, str)
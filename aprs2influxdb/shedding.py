@@ -0,0 +1,174 @@
+import logging
+import random
+import time
+from typing import Callable, Optional
+
+from metrics import Metrics
+from utils import LRUCache, LogSummary
+
+_logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH: str = "high"
+PRIORITY_NORMAL: str = "normal"
+PRIORITY_LOW: str = "low"
+
+# Positions are repeated every few minutes by every station, so losing some of
+# them costs little. Weather, telemetry and messages are not sent again.
+FORMAT_PRIORITIES: dict = {
+    "wx": PRIORITY_HIGH,
+    "telemetry": PRIORITY_HIGH,
+    "telemetry-message": PRIORITY_HIGH,
+    "message": PRIORITY_HIGH,
+    "uncompressed": PRIORITY_LOW,
+    "compressed": PRIORITY_LOW,
+    "mic-e": PRIORITY_LOW,
+    "object": PRIORITY_LOW
+}
+
+
+class TokenBucket:
+    rate: float
+    burst: float
+
+    _tokens: float
+    _updated: float
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        super().__init__()
+
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = burst
+        self._updated = now
+
+    def take(self, now: float) -> bool:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        if self._tokens < 1:
+            return False
+
+        self._tokens -= 1
+        return True
+
+
+class LoadShedder:
+    """Overload policy deciding which packets are written
+
+    Optionally, each station gets a token bucket, throttling the ones flooding
+    the feed, e.g. an igate looping packets. Then, as the write queue fills up
+    past the low watermark, low priority packets are sampled with a decreasing
+    probability, down to none at the high watermark. Past the high watermark,
+    normal priority packets are sampled too. High priority packets are never
+    shed, nor throttled.
+
+    keyword arguments:
+    pending -- function returning the number of lines waiting to be written
+    capacity -- maximum number of lines waiting to be written
+    low_watermark -- queue fill ratio at which low priority packets start being shed
+    high_watermark -- queue fill ratio at which all low priority packets are shed
+    station_rate -- packets per second allowed to each station, 0 to disable
+    station_burst -- packets allowed to each station in a burst
+    max_stations -- number of stations whose bucket is kept
+    """
+
+    _pending: Callable[[], int]
+    _capacity: int
+    _low_watermark: float
+    _high_watermark: float
+    _station_rate: float
+    _station_burst: float
+
+    _metrics: Optional[Metrics]
+    _buckets: LRUCache
+    _throttled: LogSummary
+    _shed: LogSummary
+
+    def __init__(self, pending: Callable[[], int], capacity: int,
+                 low_watermark: float, high_watermark: float,
+                 station_rate: float, station_burst: float,
+                 max_stations: int = 65536, metrics: Optional[Metrics] = None) -> None:
+        super().__init__()
+
+        self._pending = pending
+        self._capacity = capacity
+        self._low_watermark = low_watermark
+        self._high_watermark = high_watermark
+        self._station_rate = station_rate
+        self._station_burst = station_burst
+
+        self._metrics = metrics
+        self._buckets = LRUCache(max_stations)
+        self._throttled = LogSummary(_logger, logging.WARNING, "throttled packets")
+        self._shed = LogSummary(_logger, logging.WARNING, "shed packets")
+
+    @staticmethod
+    def priority(packet: dict) -> str:
+        if "weather" in packet:
+            return PRIORITY_HIGH
+
+        return FORMAT_PRIORITIES.get(packet.get("format"), PRIORITY_NORMAL)
+
+    def admit(self, packet: dict, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = time.monotonic()
+
+        priority: str = LoadShedder.priority(packet)
+
+        if priority != PRIORITY_HIGH and not self._take_token(packet.get("from", ""), now):
+            self._throttled.event(packet.get("from", ""), "Throttling station %s", packet.get("from"))
+            self._count(f"shedder_throttled_{priority}")
+            return False
+
+        load: float = self._pending() / self._capacity if self._capacity else 0.0
+        if self._metrics:
+            self._metrics.set("shedder_load", load)
+
+        if random.random() >= self.keep_probability(priority, load):
+            self._shed.event(priority, "Shedding %s priority packets, queue at %d%%", priority, load * 100)
+            self._count(f"shedder_shed_{priority}")
+            return False
+
+        self._count("shedder_admitted")
+        return True
+
+    def keep_probability(self, priority: str, load: float) -> float:
+        if priority == PRIORITY_HIGH:
+            return 1.0
+
+        if priority == PRIORITY_LOW:
+            return LoadShedder._ramp(load, self._low_watermark, self._high_watermark)
+
+        return LoadShedder._ramp(load, self._high_watermark, 1.0)
+
+    def summarize(self) -> None:
+        self._throttled.summarize()
+        self._shed.summarize()
+
+    def _take_token(self, station: str, now: float) -> bool:
+        if self._station_rate <= 0:
+            return True
+
+        bucket: Optional[TokenBucket] = self._buckets.get(station)
+        if not bucket:
+            bucket = TokenBucket(self._station_rate, self._station_burst, now)
+            self._buckets.put(station, bucket)
+
+        return bucket.take(now)
+
+    def _count(self, name: str) -> None:
+        if self._metrics:
+            self._metrics.increment(name)
+
+    @staticmethod
+    def _ramp(load: float, start: float, end: float) -> float:
+        """Probability going from 1 at start down to 0 at end"""
+
+        if load <= start:
+            return 1.0
+
+        if load >= end:
+            return 0.0
+
+        return (end - load) / (end - start)
@@ -0,0 +1,182 @@
+import logging
+import socket
+import sys
+import threading
+from typing import Optional, TextIO
+
+from writer import WriteError
+
+_logger = logging.getLogger(__name__)
+
+OUTPUT_INFLUXDB: str = "influxdb"
+OUTPUT_UDP: str = "udp"
+OUTPUT_TCP: str = "tcp"
+OUTPUT_STDOUT: str = "stdout"
+
+OUTPUTS: list = [OUTPUT_INFLUXDB, OUTPUT_UDP, OUTPUT_TCP, OUTPUT_STDOUT]
+
+TCP_CONNECT_TIMEOUT: float = 5.0
+
+
+class Sink:
+    """Destination of line protocol batches other than the InfluxDB HTTP API
+
+    write() receives the batches collected by the Writer, raising WriteError
+    on failure: errors without status are retried, like network errors of the
+    HTTP API.
+    """
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def write(self, lines: list) -> None:
+        raise NotImplementedError()
+
+
+class UDPSink(Sink):
+    """Sends lines in datagrams, packing as many lines as fit in the MTU
+
+    As with any UDP listener, e.g. Telegraf socket_listener or the InfluxDB 1.x
+    UDP service, lost datagrams are not noticed.
+    """
+
+    _address: tuple
+    _mtu: int
+    _socket: Optional[socket.socket]
+
+    def __init__(self, host: str, port: int, mtu: int) -> None:
+        super().__init__()
+
+        self._address = (host, port)
+        self._mtu = mtu
+        self._socket = None
+
+    def start(self) -> None:
+        _logger.info(f"Sending UDP datagrams to {self._address[0]}:{self._address[1]}")
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def stop(self) -> None:
+        if self._socket:
+            self._socket.close()
+
+    def write(self, lines: list) -> None:
+        payloads: list = [(line + "\n").encode() for line in lines]
+
+        # Checked before sending anything, so that a retry does not send duplicates
+        for payload in payloads:
+            if len(payload) > self._mtu:
+                raise WriteError(f"Line of {len(payload)} bytes does not fit in a datagram", 413)
+
+        try:
+            for datagram in UDPSink.pack(payloads, self._mtu):
+                self._socket.sendto(datagram, self._address)
+        except OSError as e:
+            raise WriteError(f"Unable to send datagram: {e}")
+
+    @staticmethod
+    def pack(payloads: list, mtu: int) -> list:
+        datagrams: list = []
+        current: bytearray = bytearray()
+
+        for payload in payloads:
+            if current and len(current) + len(payload) > mtu:
+                datagrams.append(bytes(current))
+                current = bytearray()
+
+            current += payload
+
+        if current:
+            datagrams.append(bytes(current))
+
+        return datagrams
+
+
+class TCPSink(Sink):
+    """Streams lines on a persistent TCP connection, reconnecting on errors"""
+
+    _address: tuple
+    _lock: threading.Lock
+    _socket: Optional[socket.socket]
+
+    def __init__(self, host: str, port: int) -> None:
+        super().__init__()
+
+        self._address = (host, port)
+        self._lock = threading.Lock()
+        self._socket = None
+
+    def stop(self) -> None:
+        with self._lock:
+            self._close()
+
+    def write(self, lines: list) -> None:
+        data: bytes = ("\n".join(lines) + "\n").encode()
+
+        with self._lock:
+            try:
+                if not self._socket:
+                    _logger.info(f"Connecting to {self._address[0]}:{self._address[1]}")
+                    self._socket = socket.create_connection(self._address, timeout=TCP_CONNECT_TIMEOUT)
+                    self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+                self._socket.sendall(data)
+            except OSError as e:
+                self._close()
+                raise WriteError(f"Unable to send lines: {e}")
+
+    def _close(self) -> None:
+        if not self._socket:
+            return
+
+        try:
+            self._socket.close()
+        except OSError:
+            pass
+
+        self._socket = None
+
+
+class StdoutSink(Sink):
+    """Prints lines on the standard output, flushing once per batch"""
+
+    _stream: TextIO
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        super().__init__()
+
+        self._stream = stream or sys.stdout
+
+    def stop(self) -> None:
+        self._stream.flush()
+
+    def write(self, lines: list) -> None:
+        try:
+            self._stream.write("\n".join(lines) + "\n")
+            self._stream.flush()
+        except BrokenPipeError as e:
+            # The reading process is gone, there is no point in retrying
+            raise WriteError(f"Standard output closed: {e}", 410)
+        except OSError as e:
+            raise WriteError(f"Unable to print lines: {e}")
+
+
+def create_sink(output: str, host: str, port: int, mtu: int) -> Optional[Sink]:
+    """Returns the sink of the output, None for the InfluxDB HTTP API"""
+
+    if output == OUTPUT_UDP:
+        return UDPSink(host, port, mtu)
+
+    if output == OUTPUT_TCP:
+        return TCPSink(host, port)
+
+    if output == OUTPUT_STDOUT:
+        return StdoutSink()
+
+    if output != OUTPUT_INFLUXDB:
+        raise ValueError(f"Unknown output {output}")
+
+    return None
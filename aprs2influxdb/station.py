@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from api import APIError
+from utils import LRUCache
+
+_logger = logging.getLogger(__name__)
+
+POSITION_KEYS: list = ["latitude", "longitude", "altitude", "speed", "course"]
+STATE_KEYS: list = ["symbol", "symbol_table", "comment", "status"]
+
+
+class StationTable:
+    _lock: threading.Lock
+    _stations: LRUCache
+
+    _snapshot_file: str
+
+    def __init__(self, max_size: int, snapshot_file: str = "") -> None:
+        super().__init__()
+
+        self._lock = threading.Lock()
+        self._stations = LRUCache(max_size)
+
+        self._snapshot_file = snapshot_file
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+    @staticmethod
+    def get_callsign(packet: dict) -> Optional[str]:
+        """Returns the key of the station described by the packet
+
+        Objects are stations on their own, so they are keyed by object name.
+        """
+
+        if packet.get("format") == "object" and packet.get("object_name"):
+            return packet.get("object_name").strip()
+
+        return packet.get("from")
+
+    def update(self, packet: dict, now: Optional[float] = None) -> None:
+        """Merges the packet into the last known state of its station
+
+        Keys missing from the packet keep their previous values, so a status or
+        telemetry report does not clear the last known position.
+        """
+
+        callsign: Optional[str] = self.get_callsign(packet)
+        if not callsign:
+            return
+
+        heard: float = now or time.time()
+
+        with self._lock:
+            # States are replaced, never changed in place, so readers can use them unlocked
+            state: dict = dict(self._stations.get(callsign) or {"callsign": callsign})
+
+            state["last_heard"] = heard
+            state["format"] = packet.get("format")
+
+            if "latitude" in packet and "longitude" in packet:
+                for key in POSITION_KEYS:
+                    if key in packet:
+                        state[key] = packet.get(key)
+                state["last_position"] = heard
+
+            for key in STATE_KEYS:
+                if packet.get(key):
+                    state[key] = packet.get(key)
+
+            if packet.get("weather"):
+                state["weather"] = packet.get("weather")
+                state["last_weather"] = heard
+
+            if packet.get("telemetry"):
+                state["telemetry"] = packet.get("telemetry")
+                state["last_telemetry"] = heard
+
+            self._stations.put(callsign, state)
+
+    def get(self, callsign: str) -> Optional[dict]:
+        with self._lock:
+            state: Optional[dict] = self._stations.peek(callsign)
+            return dict(state) if state else None
+
+    def in_bounding_box(self, min_latitude: float, min_longitude: float,
+                        max_latitude: float, max_longitude: float) -> list:
+        """Returns the stations whose last position is inside the bounding box"""
+
+        with self._lock:
+            items: list = self._stations.items()
+
+        stations: list = []
+        for _, state in items:
+            latitude = state.get("latitude")
+            longitude = state.get("longitude")
+            if latitude is None or longitude is None:
+                continue
+
+            if min_latitude <= latitude <= max_latitude and min_longitude <= longitude <= max_longitude:
+                stations.append(dict(state))
+
+        return stations
+
+    def snapshot(self) -> None:
+        """Writes the table to the snapshot file, replacing it atomically"""
+
+        if not self._snapshot_file:
+            return
+
+        with self._lock:
+            states: list = [state for _, state in self._stations.items()]
+
+        temp_file: str = f"{self._snapshot_file}.tmp"
+
+        try:
+            with open(temp_file, "w") as f:
+                json.dump(states, f)
+            os.replace(temp_file, self._snapshot_file)
+        except OSError as e:
+            _logger.error(f"Unable to write station snapshot: {e}")
+            return
+
+        _logger.debug(f"Station snapshot written with {len(states)} stations")
+
+    def load(self) -> None:
+        """Restores the table from the snapshot file, if any"""
+
+        if not self._snapshot_file or not os.path.exists(self._snapshot_file):
+            return
+
+        try:
+            with open(self._snapshot_file, "r") as f:
+                states: list = json.load(f)
+        except (OSError, ValueError) as e:
+            _logger.error(f"Unable to load station snapshot: {e}")
+            return
+
+        with self._lock:
+            # Snapshot is ordered from least to most recently used
+            for state in states:
+                self._stations.put(state.get("callsign"), state)
+
+        _logger.info(f"Station snapshot loaded with {len(states)} stations")
+
+    def api_station(self, query: dict) -> dict:
+        callsign: str = query.get("callsign", "")
+        if not callsign:
+            raise ValueError("Missing callsign")
+
+        state: Optional[dict] = self.get(callsign)
+        if not state:
+            raise APIError(404, f"Station {callsign} not found")
+
+        return state
+
+    def api_stations(self, query: dict) -> list:
+        bbox: str = query.get("bbox", "")
+        if not bbox:
+            raise ValueError("Missing bbox, expected min_lat,min_lon,max_lat,max_lon")
+
+        values: list = [float(value) for value in bbox.split(",")]
+        if len(values) != 4:
+            raise ValueError("Invalid bbox, expected min_lat,min_lon,max_lat,max_lon")
+
+        return self.in_bounding_box(*values)
@@ -0,0 +1,183 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+from geo import destination, distance
+from metrics import Metrics
+from utils import LRUCache
+
+_logger = logging.getLogger(__name__)
+
+TRAJECTORY_FORMATS: list = ["uncompressed", "compressed", "mic-e"]
+
+# Below this speed (km/h) a station is considered stopped
+STOP_SPEED: float = 3.0
+
+# Course change (degrees) always treated as a turn
+TURN_ANGLE: float = 30.0
+
+
+class Track:
+    """Last written position of a station and the last point held back"""
+
+    latitude: float
+    longitude: float
+    speed: float
+    course: float
+    time: float
+
+    held: Optional[tuple]
+    held_time: float
+
+    def __init__(self, latitude: float, longitude: float, speed: float, course: float, now: float) -> None:
+        super().__init__()
+
+        self.latitude = latitude
+        self.longitude = longitude
+        self.speed = speed
+        self.course = course
+        self.time = now
+
+        self.held = None
+        self.held_time = 0.0
+
+    def predict(self, now: float) -> tuple:
+        """Dead-reckoned position at the given time"""
+
+        if self.speed < STOP_SPEED:
+            return self.latitude, self.longitude
+
+        return destination(self.latitude, self.longitude, self.course, self.speed / 3.6 * (now - self.time))
+
+
+class TrackSimplifier:
+    """Streaming simplification of mobile station tracks
+
+    A position is held back when dead reckoning from the last written one,
+    using its speed and course, predicts it within the tolerance. Starts,
+    stops, turns and positions off the prediction are written along with the
+    last point held back, which is where the track bent. A point is written
+    anyway once the anchor interval has passed. Lines are given with their
+    timestamp, so that held back ones are written at their reception time.
+
+    keyword arguments:
+    tolerance -- maximum distance in meters between a held back position and its prediction
+    anchor_interval -- maximum seconds between two written positions of a station
+    max_stations -- number of stations whose track is kept
+    metrics -- counters of held back and written positions
+    """
+
+    _tolerance: float
+    _anchor_interval: float
+
+    _lock: threading.Lock
+    _tracks: LRUCache
+    _metrics: Optional[Metrics]
+
+    def __init__(self, tolerance: float, anchor_interval: float, max_stations: int = 65536,
+                 metrics: Optional[Metrics] = None) -> None:
+        super().__init__()
+
+        self._tolerance = tolerance
+        self._anchor_interval = anchor_interval
+
+        self._lock = threading.Lock()
+        self._tracks = LRUCache(max_stations)
+        self._metrics = metrics
+
+    def add(self, packet: dict, line: str, now: Optional[float] = None) -> list:
+        """Returns the (line, raw) records to write for a packet, possibly none"""
+
+        raw: Optional[str] = packet.get("raw")
+
+        if packet.get("format") not in TRAJECTORY_FORMATS:
+            return [(line, raw)]
+
+        try:
+            latitude: float = float(packet["latitude"])
+            longitude: float = float(packet["longitude"])
+            speed: float = float(packet["speed"])
+            course: float = float(packet["course"])
+        except (KeyError, TypeError, ValueError):
+            return [(line, raw)]
+
+        if now is None:
+            now = time.time()
+
+        with self._lock:
+            station: str = packet.get("from", "")
+            track: Optional[Track] = self._tracks.get(station)
+
+            if track and not self._is_significant(track, latitude, longitude, speed, course, now):
+                track.held = (line, raw)
+                track.held_time = now
+                self._count("trajectory_held")
+                return []
+
+            records: list = []
+            if track and track.held:
+                records.append(TrackSimplifier._release(track))
+
+            self._tracks.put(station, Track(latitude, longitude, speed, course, now))
+
+        records.append((line, raw))
+        self._count("trajectory_written", len(records))
+
+        return records
+
+    def tick(self, now: Optional[float] = None) -> list:
+        """Returns the records held back longer than the anchor interval
+
+        This writes the last position of stations gone silent.
+        """
+
+        if now is None:
+            now = time.time()
+
+        with self._lock:
+            records: list = []
+            for _, track in self._tracks.items():
+                if track.held and now - track.held_time >= self._anchor_interval:
+                    records.append(TrackSimplifier._release(track))
+
+        self._count("trajectory_written", len(records))
+
+        return records
+
+    def flush(self) -> list:
+        """Returns every record held back, used on shutdown"""
+
+        with self._lock:
+            records: list = [TrackSimplifier._release(track) for _, track in self._tracks.items() if track.held]
+
+        self._count("trajectory_written", len(records))
+
+        return records
+
+    def _is_significant(self, track: Track, latitude: float, longitude: float,
+                        speed: float, course: float, now: float) -> bool:
+        if now - track.time >= self._anchor_interval:
+            return True
+
+        # Starting or stopping
+        if (speed < STOP_SPEED) != (track.speed < STOP_SPEED):
+            return True
+
+        if speed >= STOP_SPEED and abs((course - track.course + 180) % 360 - 180) > TURN_ANGLE:
+            return True
+
+        predicted_latitude, predicted_longitude = track.predict(now)
+
+        return distance(predicted_latitude, predicted_longitude, latitude, longitude) > self._tolerance
+
+    def _count(self, name: str, value: int = 1) -> None:
+        if self._metrics and value:
+            self._metrics.increment(name, value)
+
+    @staticmethod
+    def _release(track: Track) -> tuple:
+        line, raw = track.held
+        track.held = None
+
+        return line, raw
@@ -1,7 +1,10 @@
 import abc
+import datetime
 import logging
 import threading
-from typing import Optional
+import time
+from collections import OrderedDict
+from typing import Any, Optional
 
 _logger = logging.getLogger(__name__)
 
@@ -42,14 +45,14 @@ class StoppableThread(abc.ABC):
 
             self._keep_running = False
 
-    def join(self) -> None:
+    def join(self, timeout: Optional[float] = None) -> None:
         _logger.info("JOIN")
 
         if not self._thread:
             return
 
         try:
-            self._thread.join()
+            self._thread.join(timeout=timeout)
         except KeyboardInterrupt:
             pass
 
@@ -62,3 +65,141 @@ class StoppableThread(abc.ABC):
     @abc.abstractmethod
     def _job(self) -> None:
         raise NotImplementedError
+
+
+class LRUCache:
+    _max_size: int
+    _items: OrderedDict
+
+    def __init__(self, max_size: int) -> None:
+        super().__init__()
+
+        self._max_size = max_size
+        self._items = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
+
+    def get(self, key, default: Any = None) -> Any:
+        try:
+            self._items.move_to_end(key)
+        except KeyError:
+            return default
+
+        return self._items[key]
+
+    def peek(self, key, default: Any = None) -> Any:
+        return self._items.get(key, default)
+
+    def put(self, key, value: Any) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+    def pop(self, key, default: Any = None) -> Any:
+        return self._items.pop(key, default)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def items(self) -> list:
+        return list(self._items.items())
+
+
+DURATION_UNITS: dict = {
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400
+}
+
+
+def parse_duration(value: str) -> datetime.timedelta:
+    """Parse a duration like 30s, 1m, 1h or 1d. A bare number is in seconds"""
+
+    value = value.strip()
+    if not value:
+        raise ValueError("Empty duration")
+
+    unit = value[-1].lower()
+    if unit in DURATION_UNITS:
+        return datetime.timedelta(seconds=float(value[:-1]) * DURATION_UNITS[unit])
+
+    return datetime.timedelta(seconds=float(value))
+
+
+class LogSummary:
+    """Rate-limited logging of repeated events
+
+    Only the first event of each kind is logged within an interval, formatting
+    the message lazily. When the interval is over, a summary line reports how
+    many events of each kind happened, e.g. "12 failures of type KeyError in
+    the last 60s".
+    """
+
+    _logger: logging.Logger
+    _level: int
+    _interval: float
+    _description: str
+
+    _lock: threading.Lock
+    _counts: dict
+    _started: float
+
+    def __init__(self, logger: logging.Logger, level: int, description: str, interval: float = 60.0) -> None:
+        super().__init__()
+
+        self._logger = logger
+        self._level = level
+        self._interval = interval
+        self._description = description
+
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._started = time.monotonic()
+
+    def event(self, kind: str, message: str, *args) -> None:
+        with self._lock:
+            count: int = self._counts.get(kind, 0)
+            self._counts[kind] = count + 1
+
+        if count == 0 and self._logger.isEnabledFor(self._level):
+            self._logger.log(self._level, message, *args)
+
+        if time.monotonic() - self._started >= self._interval:
+            self.summarize()
+
+    def summarize(self) -> None:
+        with self._lock:
+            now: float = time.monotonic()
+            if now - self._started < self._interval:
+                return
+
+            counts: dict = self._counts
+            elapsed: float = now - self._started
+
+            self._counts = {}
+            self._started = now
+
+        for kind, count in counts.items():
+            self._logger.log(self._level, "%d %s of type %s in the last %ds", count, self._description, kind, elapsed)
+
+
+def parse_tag_promotion(value: str) -> dict:
+    """Parse tag promotion, like "uncompressed:from,symbol;*:to", into a format to keys dictionary"""
+
+    tag_promotion: dict = {}
+
+    for item in value.split(";"):
+        if not item.strip():
+            continue
+
+        packet_format, _, keys = item.partition(":")
+        tag_promotion[packet_format.strip()] = [key.strip() for key in keys.split(",") if key.strip()]
+
+    return tag_promotion
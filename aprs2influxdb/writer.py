@@ -0,0 +1,400 @@
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from typing import Callable, Optional
+
+from deadletter import DeadLetter
+from metrics import Metrics
+from utils import StoppableThread
+
+_logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES: list = [429, 503]
+SPLITTABLE_STATUSES: list = [400, 413]
+PARTIAL_STATUSES: list = [422]
+
+# Field whose type conflict got lines dropped from a partial write, with its measurement
+PARTIAL_CONFLICT: re.Pattern = re.compile(r'input field "([^"]+)" on measurement "([^"]+)"')
+
+BACKOFF_BASE: float = 0.5
+BACKOFF_MAX: float = 60.0
+
+
+class WriteError(Exception):
+    status: Optional[int]
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+
+        self.status = status
+
+    @property
+    def retryable(self) -> bool:
+        return self.status is None or self.status in RETRYABLE_STATUSES
+
+
+class PointClock:
+    """Strictly increasing nanosecond timestamps of points
+
+    Points of a measurement with the same tags and timestamp are merged by
+    InfluxDB, the fields of the last one overwriting the others. Packets of a
+    format share their tags, and those of a read their receive time, so each
+    point is given the receive time plus as many nanoseconds as needed to
+    follow the previous point.
+    """
+
+    _lock: threading.Lock
+    _last: int
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self._lock = threading.Lock()
+        self._last = 0
+
+    def timestamp(self, received: float) -> int:
+        with self._lock:
+            self._last = max(int(received * 1000000000), self._last + 1)
+            return self._last
+
+
+class BatchController:
+    """AIMD controller of batch size and flush interval
+
+    While writes are fast and lines are piling up, the batch size grows by a
+    fixed step, amortizing round trips. While the queue is short, the flush
+    interval shrinks by a fixed step, lowering latency when idle. A slow write
+    or a throttling response (429/503) halves the batch size and doubles the
+    flush interval, backing off from an overloaded database.
+    """
+
+    batch_size: int
+    flush_interval: float
+
+    _batch_size_min: int
+    _batch_size_max: int
+    _flush_interval_min: float
+    _flush_interval_max: float
+    _latency_target: float
+
+    _batch_size_step: int
+    _flush_interval_step: float
+
+    def __init__(self, batch_size_min: int, batch_size_max: int,
+                 flush_interval_min: float, flush_interval_max: float,
+                 latency_target: float) -> None:
+        super().__init__()
+
+        self._batch_size_min = batch_size_min
+        self._batch_size_max = batch_size_max
+        self._flush_interval_min = flush_interval_min
+        self._flush_interval_max = flush_interval_max
+        self._latency_target = latency_target
+
+        self._batch_size_step = max(1, (batch_size_max - batch_size_min) // 50)
+        self._flush_interval_step = (flush_interval_max - flush_interval_min) / 50
+
+        self.batch_size = batch_size_min
+        self.flush_interval = flush_interval_min
+
+    def on_success(self, latency: float, pending: int) -> None:
+        if latency > self._latency_target:
+            self._decrease()
+            return
+
+        if pending >= self.batch_size:
+            self.batch_size = min(self._batch_size_max, self.batch_size + self._batch_size_step)
+        else:
+            self.flush_interval = max(self._flush_interval_min, self.flush_interval - self._flush_interval_step)
+
+    def on_throttle(self) -> None:
+        self._decrease()
+
+    def _decrease(self) -> None:
+        self.batch_size = max(self._batch_size_min, self.batch_size // 2)
+        self.flush_interval = min(self._flush_interval_max, max(self.flush_interval, self._flush_interval_min) * 2)
+
+
+class Writer(StoppableThread):
+    _write: Callable[[list], None]
+    _metrics: Metrics
+    _dead_letter: Optional[DeadLetter]
+
+    _queue: queue.Queue
+    _controller: BatchController
+
+    _spill_file: str
+    _drain_deadline: Optional[float]
+
+    def __init__(self, write: Callable[[list], None], metrics: Metrics, controller: BatchController,
+                 queue_size: int, dead_letter: Optional[DeadLetter] = None, spill_file: str = "") -> None:
+        super().__init__(thread_name="Writer")
+
+        self._write = write
+        self._metrics = metrics
+        self._dead_letter = dead_letter
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._controller = controller
+
+        self._spill_file = spill_file
+        self._drain_deadline = None
+
+        self._update_metrics()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def put(self, record, raw: Optional[str] = None) -> None:
+        """Queues a line, or a list of lines, to be written
+
+        The raw packet the lines come from is kept along, so that a line
+        rejected by the database can be dead-lettered with its origin. Lines
+        carry their timestamp, as they may wait in the queue well past their
+        reception, and a line written again then overwrites the same point.
+        """
+
+        lines: list = record if isinstance(record, list) else [record]
+
+        for line in lines:
+            try:
+                self._queue.put_nowait((line, raw))
+            except queue.Full:
+                self._metrics.increment("writer_dropped")
+
+    def start(self) -> None:
+        self._load_spill()
+
+        super().start()
+
+    def stop(self) -> None:
+        super().stop()
+
+        # Wakes up the collector, which would otherwise wait for lines up to the flush interval
+        if self._thread:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass
+
+    def drain(self, deadline: Optional[float] = None) -> None:
+        """Stops the writer, waiting until the queue is written or the deadline
+        passes. Lines left unwritten at the deadline are spilled to disk, to be
+        written after the next start."""
+
+        self._drain_deadline = deadline
+
+        self.stop()
+
+        timeout: Optional[float] = None
+        if deadline is not None:
+            timeout = max(0.0, deadline - time.monotonic())
+
+        self.join(timeout=timeout)
+
+        if self._thread and self._thread.is_alive():
+            _logger.warning(f"Writer still busy at the deadline, {self._queue.qsize()} lines pending")
+
+    def _loop(self) -> None:
+        super()._loop()
+
+        # Flush what is left without waiting for retries, until the deadline
+        while not self._queue.empty():
+            if self._drain_deadline is not None and time.monotonic() >= self._drain_deadline:
+                break
+
+            batch: list = self._collect(self._controller.batch_size, 0)
+            if batch:
+                self._flush(batch, retry=False)
+
+        batch: list = self._collect(self._queue.qsize(), 0)
+        if batch:
+            self._spill(batch)
+
+    def _job(self) -> None:
+        batch: list = self._collect(self._controller.batch_size, self._controller.flush_interval)
+        if batch:
+            self._flush(batch, retry=True)
+
+    def _collect(self, size: int, interval: float) -> list:
+        batch: list = []
+        deadline: float = time.monotonic() + interval
+
+        while len(batch) < size:
+            timeout: float = deadline - time.monotonic()
+
+            try:
+                if timeout > 0 and self._keep_running:
+                    item: Optional[tuple] = self._queue.get(timeout=timeout)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            # Woken up by stop, the lines left are then collected without waiting
+            if item is None:
+                continue
+
+            batch.append(item)
+
+        return batch
+
+    def _flush(self, batch: list, retry: bool) -> None:
+        attempt: int = 0
+
+        while True:
+            started: float = time.monotonic()
+
+            try:
+                self._write([line for line, _ in batch])
+
+            except WriteError as e:
+                if e.retryable:
+                    self._metrics.increment("writer_throttled")
+                    self._controller.on_throttle()
+                    self._update_metrics()
+
+                    if retry and self._keep_running:
+                        delay: float = self._backoff(attempt)
+                        attempt += 1
+
+                        _logger.warning(f"Write failed, retrying in {delay:.1f}s: {e}")
+                        self._sleep(delay)
+                        continue
+
+                    if self._spill_file:
+                        self._spill(batch)
+                    else:
+                        self._reject(batch, f"Write failed: {e}")
+                    return
+
+                if e.status in SPLITTABLE_STATUSES:
+                    self._bisect(batch, e)
+                    return
+
+                if e.status in PARTIAL_STATUSES:
+                    self._partial(batch, e)
+                    return
+
+                self._reject(batch, f"Write rejected: {e}")
+                return
+
+            latency: float = time.monotonic() - started
+
+            self._metrics.increment("writer_batches")
+            self._metrics.increment("writer_lines", len(batch))
+            self._metrics.set("writer_latency", latency)
+
+            self._controller.on_success(latency, self._queue.qsize())
+            self._update_metrics()
+            return
+
+    def _bisect(self, batch: list, error: WriteError) -> None:
+        """Isolates rejected lines by writing the two halves of a rejected batch
+
+        Recursion stops on single lines, which are the poison ones. Every other
+        line gets written, so one malformed packet does not cost a whole batch.
+        """
+
+        if len(batch) == 1:
+            self._reject(batch, f"Line rejected: {error}")
+            return
+
+        self._metrics.increment("writer_bisections")
+
+        middle: int = len(batch) // 2
+        self._flush(batch[:middle], retry=True)
+        self._flush(batch[middle:], retry=True)
+
+    def _partial(self, batch: list, error: WriteError) -> None:
+        """Rejects the lines a partial write dropped
+
+        The database wrote the other lines, which are not sent again. Dropped
+        lines are those holding the field whose type conflict the error names.
+        """
+
+        rejected: list = []
+
+        match: Optional[re.Match] = PARTIAL_CONFLICT.search(str(error))
+        if match:
+            field: re.Pattern = re.compile(f"[ ,]{re.escape(match.group(1))}=")
+            measurement: tuple = (f"{match.group(2)},", f"{match.group(2)} ")
+
+            rejected = [(line, raw) for line, raw in batch if line.startswith(measurement) and field.search(line)]
+
+        if not rejected:
+            _logger.error(f"Partial write, dropped lines unknown: {error}")
+
+        self._metrics.increment("writer_batches")
+        self._metrics.increment("writer_lines", len(batch) - len(rejected))
+
+        if rejected:
+            self._reject(rejected, f"Line rejected: {error}")
+
+    def _reject(self, batch: list, reason: str) -> None:
+        _logger.error(f"{reason} ({len(batch)} lines)")
+        self._metrics.increment("writer_rejected_lines", len(batch))
+
+        if not self._dead_letter:
+            return
+
+        for line, raw in batch:
+            self._dead_letter.write(reason, line=line, raw=raw)
+
+    def _spill(self, batch: list) -> None:
+        if not self._spill_file:
+            self._reject(batch, "Not written before shutdown")
+            return
+
+        _logger.warning(f"Spilling {len(batch)} lines to {self._spill_file}")
+        self._metrics.increment("writer_spilled_lines", len(batch))
+
+        try:
+            with open(self._spill_file, "a") as f:
+                for line, raw in batch:
+                    f.write(json.dumps({"line": line, "raw": raw}) + "\n")
+        except OSError as e:
+            _logger.error(f"Unable to spill lines: {e}")
+
+    def _load_spill(self) -> None:
+        if not self._spill_file or not os.path.exists(self._spill_file):
+            return
+
+        count: int = 0
+
+        try:
+            with open(self._spill_file, "r") as f:
+                for entry in f:
+                    item: dict = json.loads(entry)
+                    self.put(item.get("line"), item.get("raw"))
+                    count += 1
+
+            os.remove(self._spill_file)
+        except (OSError, ValueError) as e:
+            _logger.error(f"Unable to load spilled lines: {e}")
+            return
+
+        _logger.info(f"Loaded {count} spilled lines")
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def _sleep(self, delay: float) -> None:
+        deadline: float = time.monotonic() + delay
+
+        while self._keep_running and time.monotonic() < deadline:
+            time.sleep(min(0.1, deadline - time.monotonic()))
+
+    def _update_metrics(self) -> None:
+        self._metrics.set("writer_batch_size", self._controller.batch_size)
+        self._metrics.set("writer_flush_interval", self._controller.flush_interval)
+        self._metrics.set("writer_pending", self._queue.qsize())
@@ -0,0 +1,165 @@
+"""APRS-IS reader benchmark
+
+Streams a corpus of packets from a local server and measures how fast the
+lines reach the callback, through aprslib.IS and through APRSISClient. Only
+reading and splitting is measured, packets are not decoded.
+
+Run from the repository root:
+
+    PYTHONPATH=aprs2influxdb python benchmark/aprsis_reader.py --packets 1000000
+"""
+
+import argparse
+import itertools
+import logging
+import socket
+import sys
+import threading
+import time
+from typing import Callable
+
+try:
+    import aprslib
+except ImportError:
+    aprslib = None
+
+from aprsis import APRSISClient, ConnectionDrop
+from corpus import corpus_packets, synthetic_packets
+
+_logger = logging.getLogger("aprsis_reader")
+
+KEEPALIVE_EVERY: int = 1000
+
+
+class CorpusServer:
+    """Serves the corpus once to the first client logging in, then closes"""
+
+    _server: socket.socket
+    _payload: bytes
+    _thread: threading.Thread
+
+    def __init__(self, payload: bytes) -> None:
+        super().__init__()
+
+        self._payload = payload
+
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(1)
+
+        self._thread = threading.Thread(target=self._serve, name="Server", daemon=True)
+        self._thread.start()
+
+    @property
+    def port(self) -> int:
+        return self._server.getsockname()[1]
+
+    def join(self) -> None:
+        self._thread.join()
+        self._server.close()
+
+    def _serve(self) -> None:
+        connection, _ = self._server.accept()
+
+        with connection:
+            connection.sendall(b"# aprsc 2.1.14\r\n")
+            connection.recv(1024)
+            connection.sendall(b"# logresp N0CALL unverified, server T2TEST\r\n")
+            connection.sendall(self._payload)
+
+
+def build_payload(packets: list) -> bytes:
+    lines: list = []
+
+    for count, packet in enumerate(packets, start=1):
+        lines.append(packet)
+        if count % KEEPALIVE_EVERY == 0:
+            lines.append(b"# aprsc 2.1.14 keepalive")
+
+    return b"\r\n".join(lines) + b"\r\n"
+
+
+def run_aprslib(port: int) -> int:
+    count: list = [0]
+
+    def callback(_: bytes) -> None:
+        count[0] += 1
+
+    aprs = aprslib.IS("N0CALL", passwd="-1", host="127.0.0.1", port=port)
+    aprs.logger.setLevel(logging.WARNING)
+    aprs.connect()
+
+    try:
+        aprs.consumer(callback=callback, immortal=False, raw=True)
+    except (aprslib.ConnectionDrop, aprslib.ConnectionError):
+        pass
+
+    aprs.close()
+
+    return count[0]
+
+
+def run_client(port: int) -> int:
+    count: list = [0]
+
+    def callback(lines: list) -> None:
+        count[0] += len(lines)
+
+    client: APRSISClient = APRSISClient("127.0.0.1", port, "N0CALL", -1)
+    client.connect()
+
+    try:
+        client.consume(callback)
+    except ConnectionDrop:
+        pass
+
+    client.close()
+
+    return count[0]
+
+
+def measure(name: str, run: Callable[[int], int], payload: bytes, expected: int) -> float:
+    server: CorpusServer = CorpusServer(payload)
+
+    started: float = time.perf_counter()
+    count: int = run(server.port)
+    elapsed: float = time.perf_counter() - started
+
+    server.join()
+
+    if count != expected:
+        _logger.error(f"{name}: {count} lines received instead of {expected}")
+
+    rate: float = count / elapsed
+    _logger.info(f"{name}: {count} lines in {elapsed:.2f}s, {rate:.0f} lines/s")
+
+    return rate
+
+
+def main() -> int:
+    args_parser = argparse.ArgumentParser(description="APRS-IS reader benchmark")
+    args_parser.add_argument("--packets", type=int, default=1000000, help="Number of packets to stream")
+    args_parser.add_argument("--corpus", default="", help="File of raw packets to replay instead of synthetic ones")
+    args = args_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)-8s] %(name)s - %(message)s")
+    _logger.setLevel(logging.INFO)
+
+    packets = corpus_packets(args.corpus) if args.corpus else synthetic_packets(10000)
+    payload: bytes = build_payload(list(itertools.islice(packets, args.packets)))
+
+    client_rate: float = measure("APRSISClient", run_client, payload, args.packets)
+
+    if not aprslib:
+        _logger.warning("aprslib not installed, nothing to compare with")
+        return 0
+
+    aprslib_rate: float = measure("aprslib.IS", run_aprslib, payload, args.packets)
+
+    _logger.info(f"Speedup: {client_rate / aprslib_rate:.1f}x")
+
+    return 0 if client_rate > aprslib_rate else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Batch line protocol encoder benchmark
+
+Converts the same packets to line protocol one at a time through the parser
+and by batches through BatchEncoder, as aprs2influxdb does for each read of
+the feed, and compares the speed of both. Fails unless the lines of both are
+byte-identical.
+
+Packets are decoded with aprslib, synthetic or replayed from a file given
+with --corpus, when it is installed. Otherwise packets are generated already
+decoded, like aprslib returns them.
+
+Run from the repository root:
+
+    PYTHONPATH=aprs2influxdb python benchmark/batch_encoder.py --packets 200000
+"""
+
+import argparse
+import gc
+import itertools
+import logging
+import random
+import sys
+import time
+from typing import Iterator
+
+try:
+    import aprslib
+except ImportError:
+    aprslib = None
+
+from corpus import corpus_packets, synthetic_packets
+from encoder import BatchEncoder
+from parser import Parser
+
+_logger = logging.getLogger("batch_encoder")
+
+
+def decoded_packets(stations: int) -> Iterator[dict]:
+    """Endless mix of positions, weather, status and messages, decoded"""
+
+    random.seed(0)
+
+    for sequence in itertools.count():
+        station: str = f"B{random.randrange(stations):06d}"
+        header: str = f"{station}>APRS,TCPIP*,qAC,T2TEST:"
+        packet: dict = {"from": station, "to": "APRS", "path": ["TCPIP*", "qAC", "T2TEST"], "via": "T2TEST"}
+        kind: int = sequence % 10
+
+        if kind < 6:
+            packet.update(format="uncompressed", latitude=random.uniform(-89, 89), longitude=random.uniform(-179, 179),
+                          posambiguity=0, course=random.randint(1, 360), speed=random.randint(0, 120) * 1.852,
+                          messagecapable=False, symbol=">", symbol_table="/", comment="Mobile",
+                          raw=header + f"!4851.00N/00221.00E>{sequence}/Mobile")
+        elif kind == 6:
+            packet.update(format="uncompressed", latitude=random.uniform(-89, 89), longitude=random.uniform(-179, 179),
+                          posambiguity=0, messagecapable=True, symbol="_", symbol_table="/", raw_timestamp="092345z",
+                          comment="", raw=header + f"@092345z4851.00N/00221.00E_{sequence}",
+                          weather={"wind_direction": random.randint(0, 359), "wind_speed": random.uniform(0, 20),
+                                   "temperature": random.uniform(-20, 40), "humidity": random.randint(10, 99),
+                                   "pressure": 1013.2, "rain_1h": 0.0})
+        elif kind == 7:
+            packet.update(format="status", status=f"Status {sequence}", raw=header + f">Status {sequence}")
+        else:
+            packet.update(format="message", addresse="N0CALL", msgNo=str(sequence % 1000),
+                          message_text=f"Message {sequence}", raw=header + f":N0CALL   :Message {sequence}")
+
+        yield packet
+
+
+def measure(name: str, encode, batches: list, packets: int) -> list:
+    # The lines kept by the previous run would slow the collections of this one
+    gc.collect()
+    gc.disable()
+
+    start: float = time.perf_counter()
+    lines: list = [encode(batch) for batch in batches]
+    elapsed: float = time.perf_counter() - start
+
+    gc.enable()
+
+    _logger.info(f"{name}: {packets / elapsed:,.0f} packets/s")
+
+    return lines
+
+
+def main() -> int:
+    args_parser = argparse.ArgumentParser(description="Batch line protocol encoder benchmark")
+    args_parser.add_argument("--packets", type=int, default=200000, help="Number of packets")
+    args_parser.add_argument("--batch", type=int, default=64, help="Packets per batch, i.e. per read of the feed")
+    args_parser.add_argument("--stations", type=int, default=10000, help="Number of synthetic stations")
+    args_parser.add_argument("--corpus", default="", help="File of raw packets to decode with aprslib")
+    args_parser.add_argument("--geohash", type=int, default=0, help="Geohash precision of the position tags")
+    args = args_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)-8s] %(name)s - %(message)s")
+    _logger.setLevel(logging.INFO)
+
+    if aprslib:
+        lines: Iterator[bytes] = corpus_packets(args.corpus) if args.corpus else synthetic_packets(args.stations)
+        packets: list = []
+        for line in itertools.islice(lines, args.packets * 2):
+            try:
+                packets.append(aprslib.parse(line))
+            except (aprslib.ParseError, aprslib.UnknownFormat):
+                continue
+
+            if len(packets) == args.packets:
+                break
+    elif args.corpus:
+        _logger.error("Decoding a corpus needs the aprslib package")
+        return 1
+    else:
+        packets = list(itertools.islice(decoded_packets(args.stations), args.packets))
+
+    batches: list = [packets[start:start + args.batch] for start in range(0, len(packets), args.batch)]
+
+    parser: Parser = Parser(geohash_precision=args.geohash)
+    expected: list = measure("Per packet", lambda batch: [parser.json_to_line_protocol(packet) for packet in batch],
+                             batches, len(packets))
+
+    encoder: BatchEncoder = BatchEncoder(Parser(geohash_precision=args.geohash))
+    encoded: list = measure("Batch", encoder.encode, batches, len(packets))
+
+    expected_body: bytes = "\n".join(line for batch in expected for line in batch if line).encode()
+    body: bytes = "\n".join(line for batch in encoded for line in batch if line).encode()
+
+    if body != expected_body:
+        for line, expected_line in zip(itertools.chain(*encoded), itertools.chain(*expected)):
+            if line != expected_line:
+                _logger.error(f"Line differs:\n  {line}\n  {expected_line}")
+                break
+
+        return 1
+
+    _logger.info(f"{len(body)} bytes of line protocol identical for both")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Packet sources shared by the benchmarks"""
+
+import itertools
+import random
+from typing import Iterator
+
+
+def synthetic_packets(stations: int) -> Iterator[bytes]:
+    """Endless mix of positions, weather, status, messages and telemetry from
+    a pool of stations"""
+
+    random.seed(0)
+
+    for sequence in itertools.count():
+        station: str = f"B{random.randrange(stations):06d}"
+        latitude: str = f"{random.randint(0, 89):02d}{random.uniform(0, 59.99):05.2f}N"
+        longitude: str = f"{random.randint(0, 179):03d}{random.uniform(0, 59.99):05.2f}E"
+        kind: int = sequence % 10
+
+        if kind < 6:
+            course: int = random.randint(1, 360)
+            speed: int = random.randint(0, 120)
+            text: str = f"{station}>APRS,TCPIP*,qAC,T2TEST:!{latitude}/{longitude}>{course:03d}/{speed:03d}Mobile"
+        elif kind == 6:
+            text = (f"{station}>APRS,TCPIP*,qAC,T2TEST:@092345z{latitude}/{longitude}_"
+                    f"{random.randint(0, 359):03d}/{random.randint(0, 40):03d}g{random.randint(0, 60):03d}"
+                    f"t{random.randint(0, 100):03d}r000p000P000h{random.randint(10, 99):02d}b10132")
+        elif kind == 7:
+            text = f"{station}>APRS,TCPIP*,qAC,T2TEST:>Status {sequence}"
+        elif kind == 8:
+            text = f"{station}>APRS,TCPIP*,qAC,T2TEST::{'N0CALL':9}:Message {sequence}{{{sequence % 1000}"
+        else:
+            text = (f"{station}>APRS,TCPIP*,qAC,T2TEST:T#{sequence % 1000:03d},"
+                    f"{random.randint(0, 255):03d},{random.randint(0, 255):03d},{random.randint(0, 255):03d},"
+                    f"{random.randint(0, 255):03d},{random.randint(0, 255):03d},10101010")
+
+        yield text.encode()
+
+
+def corpus_packets(path: str) -> Iterator[bytes]:
+    """Endless replay of a file of raw packets, one per line"""
+
+    with open(path, "rb") as f:
+        lines: list = [line.rstrip(b"\r\n") for line in f if line.strip() and not line.startswith(b"#")]
+
+    if not lines:
+        raise ValueError(f"No packets in {path}")
+
+    return itertools.cycle(lines)
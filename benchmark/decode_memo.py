@@ -0,0 +1,157 @@
+"""Decode memo benchmark
+
+Decodes and encodes the same reads of the feed through aprslib and the batch
+encoder, then through DecodeMemo, as aprs2influxdb does with
+--decode-memo-size, and compares the speed of both. Fails unless packets and
+lines of both are identical.
+
+Packets are synthetic: stations beacon the same payload every cycle, mostly
+through the same path, while a share of them move and send new positions. A
+recording of the feed can be replayed with --corpus instead.
+
+Run from the repository root, with aprslib installed:
+
+    PYTHONPATH=aprs2influxdb python benchmark/decode_memo.py --packets 200000
+"""
+
+import argparse
+import datetime
+import gc
+import itertools
+import logging
+import random
+import sys
+import time
+from typing import Iterator
+
+try:
+    import aprslib
+except ImportError:
+    aprslib = None
+
+from corpus import corpus_packets
+from encoder import BatchEncoder
+from memo import DecodeMemo
+from metrics import Metrics
+from parser import Parser
+
+_logger = logging.getLogger("decode_memo")
+
+PATHS: list = ["TCPIP*,qAC,T2TEST", "WIDE1-1,WIDE2-1,qAR,F1CALL-10", "WIDE2-2,qAO,N0CALL-10", "DB0ABC*,qAR,DB0XYZ"]
+
+
+def beacon_packets(stations: int, moving: float) -> Iterator[bytes]:
+    """Endless beacons of a pool of stations, the moving ones at a new position each time"""
+
+    random.seed(0)
+
+    comments: list = [f"PHG{random.randint(1000, 9999)}/Station {station}" for station in range(stations)]
+
+    for sequence in itertools.count():
+        station: int = random.randrange(stations)
+        # Stations are mostly heard through the same path
+        path: str = PATHS[station % len(PATHS)] if random.random() < 0.9 else random.choice(PATHS)
+        header: str = f"B{station:06d}>APRS,{path}"
+
+        if station < stations * moving:
+            body: str = (f"!{random.randint(0, 89):02d}{random.uniform(0, 59.99):05.2f}N/"
+                         f"{random.randint(0, 179):03d}{random.uniform(0, 59.99):05.2f}E>"
+                         f"{random.randint(1, 360):03d}/{random.randint(0, 120):03d}Mobile")
+        elif station % 5 == 0:
+            body = (f"!{station % 90:02d}30.00N/{station % 180:03d}15.00E_"
+                    f"{station % 360:03d}/005g010t068r000p000h55b10132")
+        elif station % 5 == 1:
+            body = f">Station {station} on the air"
+        else:
+            body = f"={station % 90:02d}30.00N/{station % 180:03d}15.00E#{comments[station]}"
+
+        yield f"{header}:{body}".encode()
+
+
+def measure(name: str, run, batches: list, packets: int) -> tuple:
+    gc.collect()
+    gc.disable()
+
+    start: float = time.perf_counter()
+    results: list = [run(batch) for batch in batches]
+    elapsed: float = time.perf_counter() - start
+
+    gc.enable()
+
+    _logger.info(f"{name}: {packets / elapsed:,.0f} packets/s")
+
+    return results, elapsed
+
+
+def decode_lines(decode, batch: list) -> list:
+    packets: list = []
+
+    for line in batch:
+        try:
+            packets.append(decode(line))
+        except (aprslib.ParseError, aprslib.UnknownFormat):
+            continue
+
+    return packets
+
+
+def main() -> int:
+    args_parser = argparse.ArgumentParser(description="Decode memo benchmark")
+    args_parser.add_argument("--packets", type=int, default=200000, help="Number of packets")
+    args_parser.add_argument("--batch", type=int, default=64, help="Packets per batch, i.e. per read of the feed")
+    args_parser.add_argument("--stations", type=int, default=5000, help="Number of synthetic stations")
+    args_parser.add_argument("--moving", type=float, default=0.2, help="Share of the synthetic stations moving")
+    args_parser.add_argument("--corpus", default="", help="File of raw packets to replay")
+    args_parser.add_argument("--size", type=int, default=10000, help="Stations memoized")
+    args = args_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)-8s] %(name)s - %(message)s")
+    _logger.setLevel(logging.INFO)
+
+    if not aprslib:
+        _logger.error("The decode memo benchmark needs the aprslib package")
+        return 1
+
+    source: Iterator[bytes] = corpus_packets(args.corpus) if args.corpus else beacon_packets(args.stations,
+                                                                                            args.moving)
+    lines: list = list(itertools.islice(source, args.packets))
+    batches: list = [lines[start:start + args.batch] for start in range(0, len(lines), args.batch)]
+
+    encoder: BatchEncoder = BatchEncoder(Parser())
+
+    def uncached(batch: list) -> tuple:
+        packets: list = decode_lines(aprslib.parse, batch)
+        return packets, encoder.encode(packets)
+
+    expected, expected_elapsed = measure("Uncached", uncached, batches, len(lines))
+
+    metrics: Metrics = Metrics()
+    parser: Parser = Parser(metrics=metrics)
+    memo: DecodeMemo = DecodeMemo(decode=aprslib.parse, decode_header=aprslib.parsing.parse_header, parser=parser,
+                                  encoder=BatchEncoder(parser), size=args.size, ttl=datetime.timedelta(hours=1),
+                                  metrics=metrics)
+
+    def cached(batch: list) -> tuple:
+        packets: list = decode_lines(memo.decode, batch)
+        return packets, memo.encode(packets)
+
+    results, elapsed = measure("Memoized", cached, batches, len(lines))
+
+    _logger.info(f"Hit ratio {metrics.get('decode_memo_hit_ratio'):.1%}, "
+                 f"{metrics.get('decode_memo_line_hits'):,.0f} lines filled in templates, "
+                 f"{expected_elapsed - elapsed:.2f}s saved, {metrics.get('decode_memo_cpu_saved'):.2f}s estimated")
+
+    if results != expected:
+        for (packets, encoded), (expected_packets, expected_lines) in zip(results, expected):
+            for item, expected_item in zip(packets + encoded, expected_packets + expected_lines):
+                if item != expected_item:
+                    _logger.error(f"Result differs:\n  {item}\n  {expected_item}")
+                    return 1
+
+    _logger.info(f"{sum(len(packets) for packets, _ in results)} packets and their lines identical for both")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
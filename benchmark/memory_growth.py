@@ -0,0 +1,165 @@
+"""Long-run memory benchmark
+
+Pushes packets through APRS2InfluxDB, with the APRS-IS and InfluxDB clients
+replaced by a synthetic feed and a discarding sink. A warm-up phase first
+fills the caches and tables up to their bounds. The memory blocks allocated
+by the interpreter are then sampled at intervals, along with the process
+size. Exits with an error when they keep rising, i.e. when some structure
+grows without bound. Allocations are traced with --top only, as tracing
+makes packets several times slower.
+
+Run from the repository root:
+
+    PYTHONPATH=aprs2influxdb python benchmark/memory_growth.py --warmup 500000 --packets 1000000 --top 10
+"""
+
+import argparse
+import datetime
+import gc
+import itertools
+import logging
+import sys
+import time
+from typing import Iterator
+
+from aprs2influxdb import APRS2InfluxDB
+from config import ConfigParams
+from corpus import corpus_packets, synthetic_packets
+from memory import AllocationSnapshots, rss
+
+_logger = logging.getLogger("memory_growth")
+
+
+class BenchmarkAPRS2InfluxDB(APRS2InfluxDB):
+    """APRS2InfluxDB without network clients, discarding written lines"""
+
+    written: int
+
+    def __init__(self, config_params: ConfigParams) -> None:
+        super().__init__(config_params)
+
+        self.written = 0
+
+    def _aprs_client_start(self) -> None:
+        pass
+
+    def _aprs_client_interrupt(self) -> None:
+        pass
+
+    def _aprs_client_stop(self) -> None:
+        pass
+
+    def _heartbeat_job(self) -> None:
+        pass
+
+    def _influxdb_client_start(self) -> None:
+        pass
+
+    def _influxdb_client_stop(self) -> None:
+        pass
+
+    def _influxdb_write(self, lines: list) -> None:
+        self.written += len(lines)
+
+    def _job(self) -> None:
+        time.sleep(0.1)
+
+    def feed(self, line: bytes) -> None:
+        self._consume_lines([line])
+
+
+def growth(samples: list) -> float:
+    """Relative growth between the lowest samples of the first and the last
+    quarter, windows filling up in between closing"""
+
+    quarter: int = max(1, len(samples) // 4)
+
+    first: float = min(samples[:quarter])
+    last: float = min(samples[-quarter:])
+
+    return (last - first) / first if first else 0.0
+
+
+def main() -> int:
+    args_parser = argparse.ArgumentParser(description="Long-run memory benchmark of aprs2influxdb")
+    args_parser.add_argument("--packets", type=int, default=500000, help="Number of packets pushed after the warm-up")
+    args_parser.add_argument("--warmup", type=int, default=300000, help="Number of packets filling the caches first")
+    args_parser.add_argument("--stations", type=int, default=100000, help="Number of synthetic stations")
+    args_parser.add_argument("--corpus", default="", help="File of raw packets to replay instead of synthetic ones")
+    args_parser.add_argument("--samples", type=int, default=20, help="Number of memory samples")
+    args_parser.add_argument("--tolerance", type=float, default=0.05, help="Steady-state growth allowed")
+    args_parser.add_argument("--top", type=int, default=0, help="Top allocators reported at each sample, 0 to not trace")
+    args = args_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)-8s] %(name)s - %(message)s")
+    _logger.setLevel(logging.INFO)
+
+    # Every optional structure is enabled, so that each of them is checked
+    config_params: ConfigParams = ConfigParams()
+    config_params.enrichment_geohash_precision = 5
+    config_params.enrichment_locator_precision = 3
+    # Windows close many times along the run, their accumulators filling up and emptying
+    config_params.rollup_windows = ["10s"]
+    config_params.heavy_hitters_window = "15m"
+    config_params.station_table_size = 65536
+    config_params.trajectory_tolerance = 50.0
+    config_params.shedding_station_rate = 0.0
+
+    if args.corpus:
+        packets: Iterator[bytes] = corpus_packets(args.corpus)
+    else:
+        packets = synthetic_packets(args.stations)
+
+    snapshots: AllocationSnapshots = AllocationSnapshots("", top=args.top)
+
+    app: BenchmarkAPRS2InfluxDB = BenchmarkAPRS2InfluxDB(config_params)
+    app.start()
+
+    interval: int = max(1, args.packets // args.samples)
+    blocks: list = []
+    started: float = time.monotonic()
+
+    try:
+        for line in itertools.islice(packets, args.warmup):
+            app.feed(line)
+
+        gc.collect()
+        _logger.info(f"Warm-up of {args.warmup} packets done in {time.monotonic() - started:.0f}s, "
+                     f"rss {rss() / 1048576:.1f} MiB, {sys.getallocatedblocks()} blocks")
+
+        # Blocks are counted by the interpreter, whether allocations are traced or not
+        if args.top:
+            snapshots.start()
+
+        measured: float = time.monotonic()
+
+        for count, line in enumerate(itertools.islice(packets, args.packets), start=1):
+            app.feed(line)
+
+            if count % interval:
+                continue
+
+            gc.collect()
+            if args.top:
+                for report_line in snapshots.report():
+                    _logger.info(report_line)
+
+            blocks.append(sys.getallocatedblocks())
+            _logger.info(f"{count} packets, {count / (time.monotonic() - measured):.0f} packets/s, "
+                         f"rss {rss() / 1048576:.1f} MiB, {blocks[-1]} blocks")
+    finally:
+        app.stop()
+
+    result: float = growth(blocks)
+    _logger.info(f"Steady-state growth {result:.1%}, {app.written} lines written, "
+                 f"{datetime.timedelta(seconds=int(time.monotonic() - started))} elapsed")
+
+    if result > args.tolerance:
+        _logger.error(f"Memory keeps rising: {result:.1%} over the tolerance of {args.tolerance:.1%}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
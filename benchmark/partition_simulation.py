@@ -0,0 +1,138 @@
+"""Callsign-prefix partitioning simulation
+
+Runs one process per node, each one building its APRS-IS filter like
+aprs2influxdb does at start, and applies the prefix terms of the filters to
+the senders of a feed the way the server does. Fails when a packet reaches
+no node or more than one, and reports how evenly the feed is shared.
+
+Senders are drawn from the prefix table, or read from a file of raw packets
+given with --corpus. With --save-table, the prefix table learned from the
+corpus is written out, to be given to the nodes with --partition-table-file.
+
+Run from the repository root:
+
+    PYTHONPATH=aprs2influxdb python benchmark/partition_simulation.py --nodes 4
+"""
+
+import argparse
+import itertools
+import logging
+import multiprocessing
+import random
+import sys
+
+from config import ConfigParams
+from corpus import corpus_packets
+from partition import PARTITION_ALPHABET, PrefixTable, apply_partition, matches
+
+_logger = logging.getLogger("partition_simulation")
+
+SUFFIX_ALPHABET: str = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+
+def table_senders(table: PrefixTable, count: int) -> list:
+    """Random callsigns distributed like the prefixes of the table"""
+
+    random.seed(0)
+
+    firsts: list = [character for character in PARTITION_ALPHABET if table.counts.get(character)]
+    children: dict = {first: {} for first in firsts}
+    for prefix, weight in table.counts.items():
+        if len(prefix) == 2 and prefix[0] in children:
+            children[prefix[0]][prefix] = weight
+
+    senders: list = []
+
+    for first in random.choices(firsts, weights=[table.counts[first] for first in firsts], k=count):
+        rest: float = max(0.0, table.counts[first] - sum(children[first].values()))
+
+        prefix: str = first + random.choice(SUFFIX_ALPHABET)
+        if children[first] and random.uniform(0, table.counts[first]) >= rest:
+            prefix = random.choices(list(children[first]), weights=list(children[first].values()))[0]
+
+        senders.append(prefix + "".join(random.choices(SUFFIX_ALPHABET, k=random.randint(1, 4))))
+
+    return senders
+
+
+def run_node(arguments: tuple) -> tuple:
+    """Returns the filter of a node and which senders it receives"""
+
+    index, nodes, table_file, base_filter, senders = arguments
+
+    config_params: ConfigParams = ConfigParams()
+    config_params.aprs_filter = base_filter
+    config_params.partition_nodes = nodes
+    config_params.partition_index = index
+    config_params.partition_table_file = table_file
+
+    apply_partition(config_params)
+
+    return config_params.aprs_filter, bytes(matches(config_params.aprs_filter, sender) for sender in senders)
+
+
+def main() -> int:
+    args_parser = argparse.ArgumentParser(description="Callsign-prefix partitioning simulation")
+    args_parser.add_argument("--nodes", type=int, default=4, help="Number of nodes")
+    args_parser.add_argument("--packets", type=int, default=1000000, help="Number of packets")
+    args_parser.add_argument("--corpus", default="", help="File of raw packets to take the senders from")
+    args_parser.add_argument("--table", default="", help="Prefix table file (empty for the one shipped)")
+    args_parser.add_argument("--save-table", default="", help="File receiving the table learned from the corpus")
+    args_parser.add_argument("--filter", default="", help="Base filter narrowed by the partitions")
+    args = args_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)-8s] %(name)s - %(message)s")
+    _logger.setLevel(logging.INFO)
+
+    table: PrefixTable = PrefixTable.load(args.table)
+
+    if args.corpus:
+        lines: list = list(itertools.islice(corpus_packets(args.corpus), args.packets))
+        senders: list = [line.split(b">", 1)[0].decode(errors="replace") for line in lines]
+    else:
+        senders = table_senders(table, args.packets)
+
+    if args.save_table:
+        PrefixTable.learn(senders).save(args.save_table)
+        _logger.info(f"Prefix table learned from {len(senders)} packets saved to {args.save_table}")
+
+    expected: list = [partition.share for partition in table.partition(args.nodes)]
+
+    with multiprocessing.Pool(args.nodes) as pool:
+        results: list = pool.map(run_node, [(index, args.nodes, args.table, args.filter, senders)
+                                            for index in range(args.nodes)])
+
+    received: list = [sum(accepted) for _, accepted in results]
+
+    for index, (aprs_filter, _) in enumerate(results):
+        _logger.info(f"Node {index}: {received[index] / len(senders):.1%} of the packets, "
+                     f"{expected[index]:.1%} expected, filter of {len(aprs_filter)} characters")
+
+    _logger.info(f"Imbalance: busiest node at {max(received) * args.nodes / len(senders):.2f}x the mean")
+
+    failures: int = 0
+
+    for position, sender in enumerate(senders):
+        # Only callsigns starting with a letter or a digit are partitioned
+        if sender[:1].upper() not in PARTITION_ALPHABET:
+            continue
+
+        count: int = sum(accepted[position] for _, accepted in results)
+        if count == 1:
+            continue
+
+        failures += 1
+        if failures <= 10:
+            _logger.error(f"Sender {sender} received by {count} nodes")
+
+    if failures:
+        _logger.error(f"{failures} of {len(senders)} packets not received by exactly one node")
+        return 1
+
+    _logger.info(f"Every one of {len(senders)} packets received by exactly one node")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
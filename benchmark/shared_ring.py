@@ -0,0 +1,217 @@
+"""Shared-memory ring benchmark
+
+Hands the same reads of the feed from the reader process over to parse
+worker processes through LineRing, as aprs2influxdb does with
+--read-ring-size, and through multiprocessing.Queue, a line at a time and a
+read at a time. Lines are routed to the workers by station through each
+transport. Compares the throughput of each and the time lines wait between
+their reception and their consumption. Fails unless the workers received
+the same lines through each transport.
+
+Workers only checksum the lines, unless --decode makes them decode the
+lines with aprslib, to see how much of the decoding time the transport
+takes.
+
+Run from the repository root:
+
+    PYTHONPATH=aprs2influxdb python benchmark/shared_ring.py --packets 1000000 --workers 2
+"""
+
+import argparse
+import itertools
+import logging
+import multiprocessing
+import sys
+import time
+import zlib
+from typing import Callable, Iterator
+
+try:
+    import aprslib
+except ImportError:
+    aprslib = None
+
+from corpus import corpus_packets, synthetic_packets
+from ring import LineRing
+
+_logger = logging.getLogger("shared_ring")
+
+
+def consume(line: bytes, decode: bool) -> int:
+    if decode:
+        try:
+            aprslib.parse(line)
+        except (aprslib.ParseError, aprslib.UnknownFormat):
+            pass
+
+    return zlib.crc32(line)
+
+
+def ring_worker(ring: LineRing, index: int, decode: bool, done, results) -> None:
+    reader = ring.reader(index)
+    count: int = 0
+    checksum: int = 0
+    waited: float = 0.0
+
+    while True:
+        reads: list = reader.read()
+        if not reads and done.is_set():
+            break
+
+        now: float = time.time()
+        for timestamp, view in reads:
+            lines: list = bytes(view).split(b"\n")
+            for line in lines:
+                checksum += consume(line, decode)
+            waited += (now - timestamp) * len(lines)
+            count += len(lines)
+
+    reader.close()
+    ring.close()
+
+    results.put((count, checksum, waited))
+
+
+def queue_worker(queue, decode: bool, results) -> None:
+    count: int = 0
+    checksum: int = 0
+    waited: float = 0.0
+
+    while True:
+        item = queue.get()
+        if item is None:
+            break
+
+        # Lines are queued one at a time or a read at a time
+        timestamp, lines = item
+        if isinstance(lines, bytes):
+            lines = [lines]
+
+        now: float = time.time()
+        for line in lines:
+            checksum += consume(line, decode)
+        waited += (now - timestamp) * len(lines)
+        count += len(lines)
+
+    results.put((count, checksum, waited))
+
+
+def run_ring(batches: list, workers: int, size: int, decode: bool) -> tuple:
+    ring: LineRing = LineRing(size=size, consumers=workers)
+    done = multiprocessing.Event()
+    results = multiprocessing.Queue()
+
+    processes: list = [multiprocessing.Process(target=ring_worker, args=(ring, index, decode, done, results))
+                       for index in range(workers)]
+
+    def write(batch: list) -> None:
+        # The reader drops reads not fitting, the benchmark waits for the workers instead
+        while not ring.write(batch, time.time()):
+            time.sleep(0.001)
+
+    def finish() -> None:
+        done.set()
+
+    try:
+        return run(processes, batches, write, finish, results)
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+def run_queue(batches: list, workers: int, decode: bool, per_line: bool) -> tuple:
+    queues: list = [multiprocessing.Queue() for _ in range(workers)]
+    results = multiprocessing.Queue()
+
+    processes: list = [multiprocessing.Process(target=queue_worker, args=(queue, decode, results))
+                       for queue in queues]
+
+    def write(batch: list) -> None:
+        timestamp: float = time.time()
+
+        # Routed like LineRing does, each station going to one worker
+        groups: dict = {}
+        for line in batch:
+            groups.setdefault(zlib.crc32(line.partition(b">")[0]) % workers if workers > 1 else 0, []).append(line)
+
+        for worker, lines in groups.items():
+            if per_line:
+                for line in lines:
+                    queues[worker].put((timestamp, line))
+            else:
+                queues[worker].put((timestamp, lines))
+
+    def finish() -> None:
+        for queue in queues:
+            queue.put(None)
+
+    return run(processes, batches, write, finish, results)
+
+
+def run(processes: list, batches: list, write: Callable[[list], None], finish: Callable[[], None], results) -> tuple:
+    for process in processes:
+        process.start()
+
+    start: float = time.perf_counter()
+
+    for batch in batches:
+        write(batch)
+
+    finish()
+    totals: list = [results.get() for _ in processes]
+    elapsed: float = time.perf_counter() - start
+
+    for process in processes:
+        process.join()
+
+    count: int = sum(total[0] for total in totals)
+    checksum: int = sum(total[1] for total in totals)
+    waited: float = sum(total[2] for total in totals)
+
+    return count, checksum, elapsed, waited / max(1, count)
+
+
+def main() -> int:
+    args_parser = argparse.ArgumentParser(description="Shared-memory ring benchmark")
+    args_parser.add_argument("--packets", type=int, default=1000000, help="Number of packets")
+    args_parser.add_argument("--batch", type=int, default=32, help="Packets per read of the feed")
+    args_parser.add_argument("--workers", type=int, default=2, help="Number of worker processes")
+    args_parser.add_argument("--size", type=int, default=4 * 1024 * 1024, help="Bytes of the ring")
+    args_parser.add_argument("--decode", action="store_true", help="Decode the lines with aprslib in the workers")
+    args_parser.add_argument("--stations", type=int, default=50000, help="Number of synthetic stations")
+    args_parser.add_argument("--corpus", default="", help="File of raw packets to replay")
+    args = args_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)-8s] %(name)s - %(message)s")
+    _logger.setLevel(logging.INFO)
+
+    if args.decode and not aprslib:
+        _logger.error("Decoding needs the aprslib package")
+        return 1
+
+    source: Iterator[bytes] = corpus_packets(args.corpus) if args.corpus else synthetic_packets(args.stations)
+    lines: list = list(itertools.islice(source, args.packets))
+    batches: list = [lines[start:start + args.batch] for start in range(0, len(lines), args.batch)]
+
+    expected: tuple = (len(lines), sum(zlib.crc32(line) for line in lines))
+
+    transports: dict = {
+        "Shared-memory ring": lambda: run_ring(batches, args.workers, args.size, args.decode),
+        "Queue, a read at a time": lambda: run_queue(batches, args.workers, args.decode, per_line=False),
+        "Queue, a line at a time": lambda: run_queue(batches, args.workers, args.decode, per_line=True)
+    }
+
+    for name, transport in transports.items():
+        count, checksum, elapsed, latency = transport()
+
+        _logger.info(f"{name}: {count / elapsed:,.0f} packets/s, {latency * 1000:.2f}ms from reception on average")
+
+        if (count, checksum) != expected:
+            _logger.error(f"{name}: {count} packets received out of {expected[0]}, or lines differ")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,7 @@ setup(
     author="Bryce Salmi",
     author_email="Bryce@FaradayRF.com",
     packages=["aprs2influxdb"],
+    package_data={"aprs2influxdb": ["prefixes.json"]},
     url="https://github.com/FaradayRF/aprs2influxdb",
     license="GPLv3",
     description="Interfaces ham radio APRS-IS servers and saves packet data into an influxdb database",
@@ -14,6 +15,9 @@ setup(
         "aprslib==0.7.2",
         "influxdb==5.3.1"
     ],
+    extras_require={
+        "archive": ["pyarrow"]
+    },
     entry_points={
         "console_scripts":
             ["aprs2influxdb = aprs2influxdb.main:main"]
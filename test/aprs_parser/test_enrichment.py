@@ -0,0 +1,25 @@
+import pytest
+
+from parser import Parser
+
+
+@pytest.fixture(name="parser_instance")
+def get_parser():
+    yield Parser(geohash_precision=5, locator_precision=3)
+
+
+def test_position_tags(parser_instance):
+    data_input: dict = {
+        "from": "IR0UBN",
+        "to": "APDW16",
+        "format": "uncompressed",
+        "latitude": 39.41616666666667,
+        "longitude": 9.495666666666667
+    }
+
+    data_expected: str = 'packet,format=uncompressed,geohash=spnb0,locator=JM49rj latitude=39.41616666666667,longitude=9.495666666666667,from="IR0UBN",to="APDW16"'
+
+    assert parser_instance.parse_uncompressed(data_input) == data_expected
+
+    # Cached tags must not be altered by a second packet from the same station
+    assert parser_instance.parse_uncompressed(data_input) == data_expected
@@ -0,0 +1,52 @@
+import pytest
+
+from parser import Parser
+
+
+@pytest.fixture(name="parser_instance")
+def get_parser():
+    yield Parser(tag_promotion={"status": ["from"], "*": ["to"]}, tag_cardinality_limit=100)
+
+
+def test_tag_promotion(parser_instance):
+    data_input: dict = {
+        "from": "N0CALL",
+        "to": "APRS",
+        "via": "T2TEST",
+        "format": "status",
+        "status": "QRV"
+    }
+
+    data_expected: str = 'packet,format=status,from=N0CALL,to=APRS via="T2TEST",status="QRV"'
+
+    assert parser_instance.parse_status(data_input) == data_expected
+
+
+def test_tag_demotion(parser_instance):
+    for index in range(1000):
+        parser_instance.parse_status({"from": f"N{index}CALL", "to": "APRS", "format": "status"})
+
+    data_actual: str = parser_instance.parse_status({"from": "N0CALL", "to": "APRS", "format": "status"})
+
+    assert data_actual == 'packet,format=status,to=APRS from="N0CALL"'
+    assert parser_instance.tag_demoted == {"from"}
+
+
+def test_tag_escaping():
+    parser_instance: Parser = Parser(tag_promotion={"uncompressed": ["symbol_table", "path", "comment"]})
+
+    data_input: dict = {
+        "from": "N0CALL",
+        "format": "uncompressed",
+        "path": ["WIDE1-1", "qAR", "N0CALL"],
+        "symbol": "#",
+        "symbol_table": "\\",
+        "comment": "Line\nend"
+    }
+
+    # Lists stay fields, and tag values escape backslashes and drop line ends
+    data_expected: str = ('packet,format=uncompressed,symbol_table=\\\\,comment=Lineend '
+                          'from="N0CALL",path="WIDE1-1,qAR,N0CALL",symbol="#"')
+
+    assert parser_instance.parse_uncompressed(data_input) == data_expected
+    assert parser_instance.tag_demoted == {"path"}
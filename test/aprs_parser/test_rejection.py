@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from deadletter import DeadLetter
+from metrics import Metrics
+from parser import Parser
+
+
+@pytest.fixture(name="metrics")
+def get_metrics():
+    yield Metrics()
+
+
+@pytest.fixture(name="parser_instance")
+def get_parser(metrics, tmp_path):
+    yield Parser(metrics=metrics, dead_letter=DeadLetter(str(tmp_path / "dead.jsonl")))
+
+
+def test_unsupported_format(parser_instance, metrics, tmp_path):
+    for _ in range(3):
+        assert parser_instance.json_to_line_protocol({"format": "invalid", "raw": "N0CALL>APRS:?"}) is None
+
+    assert metrics.get("parser_unsupported") == 3
+
+    with open(tmp_path / "dead.jsonl") as f:
+        entries: list = [json.loads(entry) for entry in f]
+
+    assert entries[0]["reason"] == "Unsupported format invalid"
+    assert entries[0]["raw"] == "N0CALL>APRS:?"
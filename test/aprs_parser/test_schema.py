@@ -0,0 +1,67 @@
+import pytest
+
+from metrics import Metrics
+from parser import Parser
+from schema import FIELD_TYPE_BOOLEAN, FIELD_TYPE_INTEGER
+
+
+@pytest.fixture(name="metrics")
+def get_metrics():
+    yield Metrics()
+
+
+@pytest.fixture(name="parser_instance")
+def get_parser(metrics):
+    yield Parser(metrics=metrics)
+
+
+def test_schema_coercion(parser_instance, metrics):
+    data_input: dict = {
+        "from": "N0CALL",
+        "to": "APRS",
+        "format": "message",
+        "addresse": "N0CALL-1",
+        "msgNo": "AB"
+    }
+
+    data_expected: str = 'packet,format=message from="N0CALL",to="APRS",addresse="N0CALL-1"'
+
+    assert parser_instance.parse_message(data_input) == data_expected
+    assert metrics.get("schema_conflicts") == 1
+
+    data_input["msgNo"] = "12"
+
+    data_expected = 'packet,format=message msgNo=12.0,from="N0CALL",to="APRS",addresse="N0CALL-1"'
+
+    assert parser_instance.parse_message(data_input) == data_expected
+    assert metrics.get("schema_coercions") == 1
+
+
+def test_schema_conflict(parser_instance, metrics):
+    data_input: dict = {
+        "from": "N0CALL",
+        "format": "uncompressed",
+        "altitude": "high"
+    }
+
+    data_expected: str = 'packet,format=uncompressed from="N0CALL"'
+
+    assert parser_instance.parse_uncompressed(data_input) == data_expected
+    assert metrics.get("schema_conflicts") == 1
+
+
+def test_schema_pin(parser_instance, metrics):
+    parser_instance.schema.pin("altitude", FIELD_TYPE_INTEGER)
+    parser_instance.schema.pin("messagecapable", FIELD_TYPE_BOOLEAN)
+
+    data_input: dict = {
+        "from": "N0CALL",
+        "format": "uncompressed",
+        "messagecapable": "True",
+        "altitude": 120.0
+    }
+
+    data_expected: str = 'packet,format=uncompressed altitude=120i,from="N0CALL",messagecapable=true'
+
+    assert parser_instance.parse_uncompressed(data_input) == data_expected
+    assert metrics.get("schema_coercions") == 2
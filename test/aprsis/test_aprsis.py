@@ -0,0 +1,61 @@
+import socket
+import threading
+
+import pytest
+
+from aprsis import APRSISClient, ConnectionDrop
+
+
+@pytest.fixture(name="server")
+def get_server():
+    server: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    server.settimeout(5)
+
+    yield server
+
+    server.close()
+
+
+def serve(server: socket.socket, received: list) -> None:
+    connection, _ = server.accept()
+
+    with connection:
+        connection.sendall(b"# aprsc 2.1.14\r\n")
+        received.append(connection.recv(1024))
+
+        connection.sendall(b"# logresp N0CALL unverified, server T2TEST\r\nIS0GVH>APRS:>one\r\nIS0GVH>APRS:>tw")
+        connection.sendall(b"o\r\n# aprsc keepalive\r\nIS0GVH>APRS:>three\r\n")
+
+        received.append(connection.recv(1024))
+
+
+def test_aprsis_client(server):
+    received: list = []
+    comments: list = []
+    batches: list = []
+
+    thread: threading.Thread = threading.Thread(target=serve, args=(server, received))
+    thread.start()
+
+    client: APRSISClient = APRSISClient("127.0.0.1", server.getsockname()[1], "N0CALL", -1, aprs_filter="t/w",
+                                        on_comment=comments.append)
+    client.connect()
+
+    def consume(lines: list) -> None:
+        batches.append(lines)
+        if sum(len(batch) for batch in batches) == 3:
+            client.sendall("N0CALL>APRS:>heartbeat")
+
+    with pytest.raises(ConnectionDrop):
+        client.consume(consume)
+
+    client.close()
+    thread.join()
+
+    assert received[0] == b"user N0CALL pass -1 vers aprs2influxdb 0.2.1 filter t/w\r\n"
+    assert received[1] == b"N0CALL>APRS:>heartbeat\r\n"
+    assert [line for batch in batches for line in batch] == [b"IS0GVH>APRS:>one", b"IS0GVH>APRS:>two",
+                                                             b"IS0GVH>APRS:>three"]
+    assert comments == ["# aprsc 2.1.14", "# logresp N0CALL unverified, server T2TEST", "# aprsc keepalive"]
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from parser import Parser
+
+pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+
+from archive import ParquetArchive
+
+HOUR: int = 3600000000000
+
+
+@pytest.fixture(name="archive_instance")
+def get_archive(tmp_path):
+    archive: ParquetArchive = ParquetArchive(str(tmp_path), Parser(), row_group_size=2)
+    yield archive
+    archive.close()
+
+
+def test_archive_hourly_files(archive_instance, tmp_path):
+    start: int = 455832 * HOUR
+
+    archive_instance.add({
+        "format": "uncompressed",
+        "from": "N0CALL",
+        "to": "APRS",
+        "path": ["WIDE1-1", "qAR", "T2TEST"],
+        "latitude": 39.2,
+        "longitude": "9.1",
+        "messagecapable": True,
+        "weather": {"temperature": 12},
+        "telemetry": {"seq": 1, "vals": [1, 2, 3, 4, 5], "bits": "00000001"}
+    }, start)
+    archive_instance.add({"format": "uncompressed", "from": "N1CALL", "latitude": "north"}, start + 1000)
+    archive_instance.add({"format": "uncompressed", "from": "N2CALL"}, start + HOUR)
+
+    directory: str = str(tmp_path / "format=uncompressed" / "date=2022-01-01" / "hour=00")
+
+    # Files stay hidden until their hour is over
+    archive_instance.tick(start + HOUR)
+    files: list = os.listdir(directory)
+    assert len(files) == 1 and not files[0].startswith(".")
+
+    data_actual: list = pyarrow_parquet.read_table(os.path.join(directory, files[0])).to_pylist()
+
+    assert len(data_actual) == 2
+    assert {key: value for key, value in data_actual[0].items() if value is not None and key != "time"} == {
+        "from": "N0CALL",
+        "to": "APRS",
+        "path": "WIDE1-1,qAR,T2TEST",
+        "latitude": 39.2,
+        "longitude": 9.1,
+        "messagecapable": True,
+        "seq": 1.0,
+        "bits": 1.0,
+        "analog1": 1.0,
+        "analog2": 2.0,
+        "analog3": 3.0,
+        "analog4": 4.0,
+        "analog5": 5.0,
+        "temperature": 12.0
+    }
+    assert data_actual[1]["from"] == "N1CALL" and data_actual[1]["latitude"] is None
+
+
+def test_archive_row_groups(archive_instance, tmp_path):
+    start: int = 455832 * HOUR
+
+    for index in range(3):
+        archive_instance.add({"format": "status", "from": "N0CALL", "status": f"Status {index}"}, start + index)
+
+    # Adding packets only buffers them, the tick writes the full row groups
+    directory = tmp_path / "format=status" / "date=2022-01-01" / "hour=00"
+    assert not directory.exists()
+
+    archive_instance.tick(start)
+    assert len(os.listdir(directory)) == 1
+
+    archive_instance.add({"format": "status", "from": "N0CALL", "status": "Status 3"}, start + 3)
+    archive_instance.close()
+
+    metadata = pyarrow_parquet.read_metadata(str(directory / os.listdir(directory)[0]))
+    assert [metadata.row_group(index).num_rows for index in range(metadata.num_row_groups)] == [3, 1]
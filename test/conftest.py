@@ -0,0 +1,24 @@
+import importlib
+import pathlib
+import sys
+
+import pytest
+
+# Modules are imported by their bare name, so the pipeline module is imported before the package of the same name
+# comes first on the path. It needs the APRS-IS and InfluxDB clients, which the tests using it skip without.
+sys.path.insert(0, str(pathlib.Path(__file__).parents[1] / "aprs2influxdb"))
+
+try:
+    importlib.import_module("aprs2influxdb")
+except ImportError:
+    pass
+
+
+@pytest.fixture(name="pipeline_module")
+def get_pipeline_module():
+    """The pipeline module, which needs the APRS-IS and InfluxDB clients"""
+
+    pytest.importorskip("aprslib")
+    pytest.importorskip("influxdb_client")
+
+    return importlib.import_module("aprs2influxdb")
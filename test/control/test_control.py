@@ -0,0 +1,29 @@
+import threading
+
+import pytest
+
+from control import FilterControl
+
+
+@pytest.fixture(name="filter_control")
+def get_filter_control():
+    applied: list = [""]
+
+    def apply(aprs_filter: str) -> None:
+        applied.append(aprs_filter)
+        threading.Timer(0.05, filter_control.on_server_comment, [f"# filter {aprs_filter} active"]).start()
+
+    filter_control: FilterControl = FilterControl(apply=apply, current=lambda: applied[-1])
+
+    yield filter_control
+
+
+def test_set_filter(filter_control):
+    data_actual: dict = filter_control.api_set_filter({"body": {"filter": "r/39.2/9.1/50"}})
+
+    assert data_actual == {"filter": "r/39.2/9.1/50", "acknowledgement": "# filter r/39.2/9.1/50 active"}
+
+
+def test_set_filter_single_line(filter_control):
+    with pytest.raises(ValueError):
+        filter_control.api_set_filter({"body": {"filter": "r/39.2/9.1/50\r\nN0CALL>APRS:!"}})
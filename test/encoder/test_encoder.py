@@ -0,0 +1,176 @@
+import re
+
+import pytest
+
+from encoder import ENCODER_GROUP_MIN, ENCODER_STEPS, STEP_TELEMETRY, STEP_WEATHER, BatchEncoder
+from metrics import Metrics
+from parser import PACKET_FIELDS, TELEMETRY_FIELDS, WEATHER_FIELDS, Parser
+from schema import DEFAULT_FIELD_TYPES, FIELD_TYPE_FLOAT
+
+PACKETS: list = [
+    {
+        "from": "N0CALL", "to": "APRS", "via": "TCPIP", "path": ["TCPIP*", "qAC", "T2TEST"],
+        "format": "uncompressed", "latitude": 48.85, "longitude": 2.35, "posambiguity": 0, "altitude": 35.1,
+        "speed": 12.9, "course": 270, "messagecapable": True, "symbol": ">", "symbol_table": "/",
+        "comment": "Mobile \"quoted\" it's a \\ test", "raw": "N0CALL>APRS,TCPIP*,qAC,T2TEST:!4851.00N/00221.00E>",
+        "telemetry": {"seq": 12, "vals": [1, 2, 3, 4, 5]}
+    },
+    {
+        "from": "N0CALL-9", "to": "T2QU3P", "path": ["WIDE1-1"], "format": "mic-e", "latitude": 40.5,
+        "longitude": -74.25, "posambiguity": 0, "altitude": 10, "speed": 0.0, "course": 0, "mbits": "110",
+        "mtype": "M0: Off Duty", "daodatumbyte": "W", "symbol": ">", "symbol_table": "/", "comment": "",
+        "raw": "N0CALL-9>T2QU3P,WIDE1-1:`abc"
+    },
+    {
+        "from": "N0CALL", "to": "APRS", "format": "object", "object_name": "OBJ 1", "object_format": "uncompressed",
+        "alive": True, "latitude": 45.0, "longitude": 5.0, "timestamp": 1600000000, "comment": "Object",
+        "raw": "N0CALL>APRS:;OBJ 1    *"
+    },
+    {
+        "from": "N0CALL-2", "to": "APRS", "format": "status", "status": "On the air", "timestamp": 1600000000,
+        "raw_timestamp": "092345z", "raw": "N0CALL-2>APRS:>On the air"
+    },
+    {
+        "from": "N0CALL-3", "to": "APRS", "format": "compressed", "latitude": 49.5, "longitude": 8.5,
+        "gpsfixstatus": 1, "altitude": 150.5, "raw": "N0CALL-3>APRS:=/5L!!<*e7>",
+        "weather": {"temperature": 21.5, "humidity": 55, "wind_speed": 3.2}
+    },
+    {
+        "from": "CW0001", "to": "APRS", "path": ["TCPXX*", "qAX", "CWOP-1"], "format": "wx",
+        "wx_raw_timestamp": "092345z", "raw": "CW0001>APRS:_092345z",
+        "weather": {"temperature": -3.5, "pressure": 1013.2, "rain_1h": 0.0, "wind_direction": 180}
+    },
+    {"from": "N0CALL", "to": "APRS", "format": "beacon", "text": "Beacon text", "raw": "N0CALL>APRS:Beacon text"},
+    {
+        "from": "N0CALL", "to": "BLN1", "format": "bulletin", "bid": 1, "identifier": "WX",
+        "message_text": "Storm warning", "raw": "N0CALL>APRS::BLN1WX   :Storm warning"
+    },
+    {
+        "from": "N0CALL", "to": "APRS", "format": "message", "addresse": "N0CALL-1", "msgNo": "12",
+        "message_text": "Hello", "raw": "N0CALL>APRS::N0CALL-1 :Hello{12"
+    }
+]
+
+FIELD_PATTERN = re.compile(r'(?:^|,)(\w+)=(?:"(?:[^"\\]|\\.)*"|[^,]*)')
+
+
+def full_packet(packet_format: str) -> dict:
+    """Packet of a format with every field of its parse method set"""
+
+    packet: dict = {"format": packet_format, "path": ["WIDE1-1", "qAR"], "messagecapable": True, "alive": True,
+                    "telemetry": {"seq": 1, "bits": "10101010", "vals": [1, 2, 3, 4, 5]},
+                    "weather": {key: 1.5 for key in WEATHER_FIELDS}}
+
+    keys: list = PACKET_FIELDS[packet_format] + [key for _, key in ENCODER_STEPS[packet_format] if key]
+
+    for key in keys:
+        if key not in packet and key not in TELEMETRY_FIELDS + WEATHER_FIELDS:
+            packet[key] = 1.5 if DEFAULT_FIELD_TYPES.get(key) == FIELD_TYPE_FLOAT else "N0CALL"
+
+    return packet
+
+
+def per_packet(packets: list, **kwargs) -> tuple:
+    metrics: Metrics = Metrics()
+    parser: Parser = Parser(metrics=metrics, **kwargs)
+
+    return [parser.json_to_line_protocol(packet) for packet in packets], metrics
+
+
+def batch(packets: list, **kwargs) -> tuple:
+    metrics: Metrics = Metrics()
+    encoder: BatchEncoder = BatchEncoder(Parser(metrics=metrics, **kwargs))
+
+    return encoder.encode(packets), metrics
+
+
+def assert_identical(packets: list, **kwargs) -> list:
+    expected, expected_metrics = per_packet(packets, **kwargs)
+    lines, metrics = batch(packets, **kwargs)
+
+    assert lines == expected
+
+    for name in ["schema_coercions", "schema_conflicts", "parser_failures", "parser_unsupported"]:
+        assert metrics.get(name) == expected_metrics.get(name)
+
+    return lines
+
+
+def test_encoder_formats():
+    lines: list = assert_identical(PACKETS * 3)
+
+    assert lines[0].startswith("packet,format=uncompressed latitude=48.85,longitude=2.35,posambiguity=0,")
+    assert 'comment="Mobile \\"quoted\\" it\\\'s a \\\\ test"' in lines[0]
+    assert lines[8] == ('packet,format=message msgNo=12.0,from="N0CALL",to="APRS",addresse="N0CALL-1",'
+                        'message_text="Hello",raw="N0CALL>APRS::N0CALL-1 :Hello{12"')
+
+
+@pytest.mark.parametrize("packet_format", list(ENCODER_STEPS))
+def test_encoder_steps(packet_format):
+    line: str = Parser().json_to_line_protocol(full_packet(packet_format))
+    keys: list = FIELD_PATTERN.findall(line.split(" ", 1)[1])
+
+    expected: list = []
+    for step, key in ENCODER_STEPS[packet_format]:
+        expected += TELEMETRY_FIELDS if step == STEP_TELEMETRY else WEATHER_FIELDS if step == STEP_WEATHER else [key]
+
+    # The steps follow the fields written by the parse method, in their order
+    assert keys == expected
+    assert sorted(keys) == sorted(PACKET_FIELDS[packet_format])
+    assert_identical([full_packet(packet_format)] * ENCODER_GROUP_MIN)
+
+
+def test_encoder_enrichment():
+    assert_identical(PACKETS, geohash_precision=5, locator_precision=3)
+
+
+def test_encoder_telemetry_equations():
+    position: dict = dict(PACKETS[0])
+    equations: dict = {"from": "N0CALL", "to": "APRS", "format": "telemetry-message",
+                       "tEQNS": [[0, 2, 1], [0, 1, 0], [0, 1, 0], [0, 1, 0], [1, 0, 0]]}
+
+    lines: list = assert_identical([position, equations, position])
+
+    assert lines[0].endswith(",seq=12,analog1=1.0,analog2=2.0,analog3=3.0,analog4=4.0,analog5=5.0")
+    assert lines[1] is None
+    assert lines[2].endswith(",seq=12,analog1=3.0,analog2=2.0,analog3=3.0,analog4=4.0,analog5=25.0")
+
+
+def test_encoder_promotion():
+    assert_identical(PACKETS, tag_promotion={"uncompressed": ["symbol"]}, tag_cardinality_limit=1)
+
+
+def test_encoder_irregular():
+    packets: list = [
+        dict(PACKETS[0], comment=12),
+        dict(PACKETS[0], comment=[]),
+        dict(PACKETS[0], altitude="high", speed="12"),
+        dict(PACKETS[0], path=None),
+        dict(PACKETS[4], weather=None),
+        dict(PACKETS[0], telemetry={"seq": 1, "vals": [1]}),
+        dict(PACKETS[6], format="thirdparty"),
+        {"from": "N0CALL", "to": "APRS"},
+        dict(PACKETS[8])
+    ]
+
+    lines: list = assert_identical(packets)
+
+    assert lines[0] is None
+    assert lines[1] is not None
+    assert lines[4] is None
+    assert lines[8] is not None
+
+
+def test_encoder_line_ends():
+    packets: list = [
+        dict(PACKETS[0], comment="Two\r\nlines", path=["WIDE1-1\n", "qAR"], to="AP\nRS"),
+        dict(PACKETS[3], status="On\nthe air")
+    ]
+
+    lines: list = assert_identical(packets)
+
+    assert 'comment="Twolines"' in lines[0]
+    assert 'path="WIDE1-1,qAR"' in lines[0]
+    assert 'to="APRS"' in lines[0]
+    assert 'status="Onthe air"' in lines[1]
+    assert not any("\n" in line or "\r" in line for line in lines)
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from geofence import Geofence
+from parser import Parser
+
+REGIONS: dict = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "properties": {"name": "Sardinia South"},
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [
+                    [[8.0, 38.5], [10.0, 38.5], [10.0, 40.0], [8.0, 40.0], [8.0, 38.5]],
+                    [[9.0, 39.0], [9.5, 39.0], [9.5, 39.5], [9.0, 39.5], [9.0, 39.0]]
+                ]
+            }
+        },
+        {
+            "type": "Feature",
+            "properties": {"name": "Islands"},
+            "geometry": {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    [[[12.0, 37.0], [13.0, 38.5], [14.0, 37.0], [12.0, 37.0]]],
+                    [[[9.2, 39.2], [9.3, 39.2], [9.3, 39.3], [9.2, 39.3], [9.2, 39.2]]]
+                ]
+            }
+        }
+    ]
+}
+
+
+@pytest.fixture(name="geofence")
+def get_geofence(tmp_path):
+    path = tmp_path / "regions.geojson"
+    path.write_text(json.dumps(REGIONS))
+
+    yield Geofence.load(str(path))
+
+
+def test_geofence_region(geofence):
+    assert geofence.region(39.2, 8.5) == "Sardinia South"
+    assert geofence.region(39.1, 9.1) is None
+    assert geofence.region(39.25, 9.25) == "Islands"
+    assert geofence.region(37.5, 13.0) == "Islands"
+    assert geofence.region(38.4, 12.1) is None
+    assert geofence.region(45.0, 9.0) is None
+
+
+def test_geofence_packet(geofence):
+    packet: dict = {"from": "IS0GVH", "format": "uncompressed", "latitude": 39.2, "longitude": 8.5}
+
+    assert geofence.region_of(packet) == "Sardinia South"
+    assert not geofence.outside(packet)
+    assert geofence.outside(dict(packet, latitude=45.0))
+    assert not geofence.outside({"from": "IS0GVH", "format": "status"})
+
+
+def test_geofence_tag(geofence):
+    parser: Parser = Parser(geofence=geofence)
+
+    line: str = parser.json_to_line_protocol({
+        "raw": "IS0GVH>APRS,TCPIP*,qAC,T2TEST:!3912.00N/00830.00E-",
+        "from": "IS0GVH",
+        "to": "APRS",
+        "path": ["TCPIP*", "qAC", "T2TEST"],
+        "via": "T2TEST",
+        "messagecapable": False,
+        "format": "uncompressed",
+        "posambiguity": 0,
+        "symbol": "-",
+        "symbol_table": "/",
+        "latitude": 39.2,
+        "longitude": 8.5
+    })
+
+    assert ",region=Sardinia\\ South " in line
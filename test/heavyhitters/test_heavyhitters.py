@@ -0,0 +1,48 @@
+import datetime
+
+import pytest
+
+from heavyhitters import HeavyHitters, SpaceSaving
+
+
+@pytest.fixture(name="heavy_hitters_instance")
+def get_heavy_hitters():
+    yield HeavyHitters(window=datetime.timedelta(minutes=4), size=2)
+
+
+def test_space_saving_bounded():
+    sketch: SpaceSaving = SpaceSaving(10)
+
+    for index in range(10000):
+        sketch.add("N0CALL" if index % 4 == 0 else f"N{index}CALL")
+
+    items: dict = {item: (count, error) for item, count, error in sketch.items()}
+
+    assert len(sketch) == 10
+    count, error = items["N0CALL"]
+    assert count - error <= 2500 <= count
+
+
+def test_heavy_hitters_pane_close(heavy_hitters_instance):
+    start = datetime.datetime(2022, 1, 1, 0, 0, 10, tzinfo=datetime.timezone.utc)
+
+    for callsign, count in [("N0CALL", 3), ("N1CALL", 2), ("N2CALL", 1)]:
+        for _ in range(count):
+            packet: dict = {"from": callsign, "to": "APRS", "path": ["TCPIP*", "qAC", "T2TEST"]}
+            assert heavy_hitters_instance.add(packet, start) == []
+
+    assert heavy_hitters_instance.tick(start + datetime.timedelta(seconds=30)) == []
+    assert heavy_hitters_instance.top()["station"] == [("N0CALL", 3, 0), ("N1CALL", 2, 0)]
+
+    data_actual: list = heavy_hitters_instance.tick(start + datetime.timedelta(minutes=1))
+
+    assert data_actual == [
+        "heavy_hitters,dimension=station,window=4m,rank=1 key=\"N0CALL\",count=3i,error=0i 1640995260000000000",
+        "heavy_hitters,dimension=station,window=4m,rank=2 key=\"N1CALL\",count=2i,error=0i 1640995260000000000",
+        "heavy_hitters,dimension=igate,window=4m,rank=1 key=\"T2TEST\",count=6i,error=0i 1640995260000000000",
+        "heavy_hitters,dimension=to,window=4m,rank=1 key=\"APRS\",count=6i,error=0i 1640995260000000000"
+    ]
+
+    # Counts leave the window along with their pane
+    heavy_hitters_instance.tick(start + datetime.timedelta(minutes=4))
+    assert heavy_hitters_instance.top()["station"] == []
@@ -0,0 +1,119 @@
+import json
+import urllib.request
+
+import pytest
+
+from api import APIError, APIServer
+from live import LiveFeed
+from metrics import Metrics
+
+PACKETS: list = [
+    {"from": "N0CALL-9", "format": "mic-e", "latitude": 48.85, "longitude": 2.35},
+    {"from": "N0CALL", "format": "uncompressed", "latitude": 10.0, "longitude": 179.5},
+    {"from": "F1CALL", "format": "uncompressed", "latitude": 10.0, "longitude": -179.5},
+    {"from": "N0CALL-2", "format": "status", "status": "On the air"},
+    {"from": "N0CALL-3", "format": "object", "object_name": "OBJ1", "latitude": 45.0, "longitude": 5.0}
+]
+
+LINES: list = ["packet,format=mic-e a=1", "packet,format=uncompressed a=2", "packet,format=uncompressed a=3",
+               "packet,format=status a=4", None]
+
+
+def received(stream) -> list:
+    """Packets of the events of a stream pending once published to"""
+
+    return [json.loads(event.split("data: ")[1])["packet"]["from"]
+            for event in next(stream).split("\n\n") if event.startswith("event: packet")]
+
+
+@pytest.fixture(name="metrics")
+def get_metrics():
+    yield Metrics()
+
+
+@pytest.fixture(name="feed")
+def get_feed(metrics):
+    feed: LiveFeed = LiveFeed(max_subscribers=2, buffer_size=3, metrics=metrics)
+    yield feed
+    feed.close()
+
+
+def test_live_filters(feed, metrics):
+    mic_e = feed.api_live({"format": "mic-e"})
+    callsigns = feed.api_live({"callsign": "n0call-*,F1CALL"})
+    assert next(mic_e) == next(callsigns) == "retry: 5000\n\n"
+    assert metrics.get("live_subscribers") == 2
+
+    feed.publish(PACKETS, LINES)
+
+    assert received(mic_e) == ["N0CALL-9"]
+    # Packets without line protocol were not parsed and are skipped
+    assert received(callsigns) == ["N0CALL-9", "F1CALL", "N0CALL-2"]
+    assert metrics.get("live_events") == 4
+
+    mic_e.close()
+    callsigns.close()
+    assert len(feed) == 0
+    assert metrics.get("live_subscribers") == 0
+
+
+def test_live_bounding_box(feed):
+    antimeridian = feed.api_live({"bbox": "9,179,11,-179"})
+    next(antimeridian)
+
+    feed.publish(PACKETS, LINES)
+
+    assert received(antimeridian) == ["N0CALL", "F1CALL"]
+
+    with pytest.raises(ValueError):
+        feed.api_live({"bbox": "9,179,11"})
+
+
+def test_live_dropped(feed, metrics):
+    stream = feed.api_live({})
+    next(stream)
+
+    feed.publish(PACKETS, LINES)
+    feed.publish(PACKETS[:1], LINES[:1])
+
+    events: str = next(stream)
+    assert events.startswith("event: dropped\ndata: 2\n\n")
+    assert received(iter([events])) == ["F1CALL", "N0CALL-2", "N0CALL-9"]
+    assert metrics.get("live_dropped") == 2
+
+
+def test_live_limits(feed):
+    stream = feed.api_live({})
+    feed.api_live({})
+
+    with pytest.raises(APIError) as error:
+        feed.api_live({})
+    assert error.value.status == 503
+
+    next(stream)
+    feed.close()
+    assert list(stream) == []
+
+    with pytest.raises(APIError):
+        feed.api_live({})
+
+
+def test_live_api(feed):
+    server: APIServer = APIServer("127.0.0.1", 0)
+    server.add_stream_route("/live", feed.api_live)
+    server.start()
+
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/live?format=status", timeout=5) as response:
+            assert response.headers["Content-Type"] == "text/event-stream"
+            assert response.readline() == b"retry: 5000\n"
+            assert response.readline() == b"\n"
+
+            feed.publish(PACKETS, LINES)
+
+            assert response.readline() == b"event: packet\n"
+            assert json.loads(response.readline()[len("data: "):]) == {"packet": PACKETS[3], "line": LINES[3]}
+    finally:
+        feed.close()
+        server.stop()
+        server.join()
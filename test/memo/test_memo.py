@@ -0,0 +1,185 @@
+import datetime
+
+import pytest
+
+from encoder import BatchEncoder
+from memo import MEMO_CHECK_INTERVAL, DecodeMemo
+from metrics import Metrics
+from parser import Parser
+
+NOW: float = 1700000000.0
+
+BODIES: dict = {
+    "!4851.00N/00221.00E>Mobile": {"format": "uncompressed", "latitude": 48.85, "longitude": 2.35, "symbol": ">",
+                                   "symbol_table": "/", "comment": "Mobile \"quoted\""},
+    ">On the air": {"format": "status", "status": "On the air"},
+    "@092345z4851.00N/00221.00E>": {"format": "uncompressed", "latitude": 48.85, "longitude": 2.35,
+                                    "timestamp": 1700000000, "raw_timestamp": "092345z"},
+    "T#012,001,002,003,004,005,00000000": {"format": "uncompressed", "telemetry": {"seq": 12, "vals": [1, 2, 3, 4, 5]}},
+    ":N0CALL   :EQNS.0,2,1,0,1,0,0,1,0,0,1,0,1,0,0": {
+        "format": "telemetry-message", "tEQNS": [[0, 2, 1], [0, 1, 0], [0, 1, 0], [0, 1, 0], [1, 0, 0]]
+    }
+}
+
+
+def parse_header(head: str) -> dict:
+    source, path = head.split(">", 1)
+    path = path.split(",")
+    via: str = path[-1] if len(path) > 2 and path[-2].startswith("q") else ""
+
+    return {"from": source, "to": path[0], "path": path[1:], "via": via}
+
+
+class Decoder:
+    """Decoder of the bodies above, counting its calls"""
+
+    calls: int
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, line: bytes) -> dict:
+        self.calls += 1
+
+        raw: str = line.decode().rstrip("\r\n")
+        head, body = raw.split(":", 1)
+
+        return dict(parse_header(head), raw=raw, **BODIES[body])
+
+
+@pytest.fixture(name="metrics")
+def get_metrics():
+    yield Metrics()
+
+
+@pytest.fixture(name="decoder")
+def get_decoder():
+    yield Decoder()
+
+
+@pytest.fixture(name="memo")
+def get_memo(decoder, metrics):
+    parser: Parser = Parser(metrics=metrics)
+    yield DecodeMemo(decode=decoder, decode_header=parse_header, parser=parser, encoder=BatchEncoder(parser),
+                     size=2, ttl=datetime.timedelta(minutes=5), metrics=metrics)
+
+
+def uncached(lines: list) -> tuple:
+    packets: list = [Decoder()(line) for line in lines]
+
+    return packets, BatchEncoder(Parser()).encode(packets)
+
+
+def cached(memo: DecodeMemo, lines: list, now: float = NOW) -> tuple:
+    packets: list = [memo.decode(line, now=now) for line in lines]
+
+    return packets, memo.encode(packets)
+
+
+def test_memo_hits(memo, decoder, metrics):
+    lines: list = [b"N0CALL>APRS,TCPIP*,qAC,T2TEST:!4851.00N/00221.00E>Mobile",
+                   b"N0CALL>APRS,WIDE1-1,qAR,F1CALL-10:!4851.00N/00221.00E>Mobile\r\n",
+                   b"N0CALL>APRS:!4851.00N/00221.00E>Mobile",
+                   b"N0CALL-2>APRS,TCPIP*,qAC,T2TEST:>On the air"]
+
+    assert cached(memo, lines) == uncached(lines)
+    assert decoder.calls == 2
+
+    # Copies of the next reads have their lines filled in the templates
+    assert cached(memo, lines[::-1]) == uncached(lines[::-1])
+    assert decoder.calls == 2
+
+    assert metrics.get("decode_memo_hits") == 6
+    assert metrics.get("decode_memo_misses") == 2
+    assert metrics.get("decode_memo_line_hits") == 4
+    assert metrics.get("decode_memo_hit_ratio") == 0.75
+
+
+def test_memo_bounds(memo, decoder):
+    lines: list = [b"N0CALL>APRS:!4851.00N/00221.00E>Mobile", b"N0CALL-2>APRS:>On the air"]
+    cached(memo, lines)
+
+    # Payloads are memoized by destination too
+    cached(memo, [b"N0CALL>APZ001:>On the air"])
+    assert decoder.calls == 3
+    assert len(memo) == 3
+
+    # Expired payloads are decoded again
+    cached(memo, lines[:1], now=NOW + 600)
+    assert decoder.calls == 4
+
+    # The least recently used station is forgotten
+    cached(memo, [b"N0CALL-3>APRS:>On the air"])
+    cached(memo, lines[1:])
+    assert decoder.calls == 6
+
+
+def test_memo_uncached_packets(memo, decoder):
+    # Timestamps are dated from the current day by aprslib
+    lines: list = [b"N0CALL>APRS:@092345z4851.00N/00221.00E>"] * 2
+    assert cached(memo, lines) == uncached(lines)
+    assert decoder.calls == 2
+
+    # Telemetry is scaled by the last equations of the station, so is encoded every time
+    lines = [b"N0CALL>APRS:T#012,001,002,003,004,005,00000000",
+             b"N0CALL>APRS,qAR,F1CALL:T#012,001,002,003,004,005,00000000",
+             b"N0CALL>APRS::N0CALL   :EQNS.0,2,1,0,1,0,0,1,0,0,1,0,1,0,0",
+             b"N0CALL>APRS,qAS,F1CALL:T#012,001,002,003,004,005,00000000"]
+    packets, encoded = cached(memo, lines)
+
+    assert (packets, encoded) == uncached(lines)
+    assert encoded[0].endswith(",analog1=1.0,analog2=2.0,analog3=3.0,analog4=4.0,analog5=5.0")
+    assert encoded[3].endswith(",analog1=3.0,analog2=2.0,analog3=3.0,analog4=4.0,analog5=25.0")
+
+
+def test_memo_check(memo, decoder, metrics, monkeypatch):
+    line: bytes = b"N0CALL>APRS,TCPIP*,qAC,T2TEST:>On the air"
+
+    # A miss, then hits up to the one checked
+    for _ in range(MEMO_CHECK_INTERVAL):
+        cached(memo, [line])
+    assert metrics.get("decode_memo_mismatches") == 0
+    assert decoder.calls == 1
+
+    # A decoder giving another packet for the same payload is caught by the next check
+    monkeypatch.setitem(BODIES, ">On the air", {"format": "status", "status": "Off the air"})
+
+    assert cached(memo, [line])[0][0]["status"] == "Off the air"
+    assert metrics.get("decode_memo_mismatches") == 1
+    assert decoder.calls == 2
+
+    # The payload is forgotten
+    cached(memo, [line])
+    assert decoder.calls == 3
+
+
+def test_memo_aprslib(metrics):
+    aprslib = pytest.importorskip("aprslib")
+
+    payloads: list = [
+        b"N0CALL>APRS,{}:!4851.00N/00221.00E>088/036/A=001234Mobile \"quoted\" it's",
+        b"N0CALL-9>T2QU3P,{}:`c51l#N>/]\"4T}=",
+        b"N0CALL-3>APRS,{}:=/5L!!<*e7> sTComment",
+        b"N0CALL-2>APRS,{}:>On the air",
+        b"N0CALL-4>APRS,{}::N0CALL   :Hello{12",
+        b"N0CALL-5>APRS,{}:!4851.00N/00221.00E_180/005g010t068r000p000P000h55b10132",
+        b"N0CALL-6>APRS,{}:;OBJ1     *092345z4851.00N/00221.00E>Object",
+        b"N0CALL-7>APRS,{}:!4851.00N/00221.00E>Telemetry|!\"!#!$!%!&!(|",
+        b"N0CALL-8>APRS,{}:!4851.00N/00221.00E#PHG5132 Digi"
+    ]
+    paths: list = [b"TCPIP*,qAC,T2TEST", b"WIDE1-1,qAR,F1CALL-10", b"WIDE2-2"]
+
+    parser: Parser = Parser(geohash_precision=5, metrics=metrics)
+    memo: DecodeMemo = DecodeMemo(decode=aprslib.parse, decode_header=aprslib.parsing.parse_header, parser=parser,
+                                  encoder=BatchEncoder(parser), size=100, ttl=datetime.timedelta(minutes=5),
+                                  metrics=metrics)
+    encoder: BatchEncoder = BatchEncoder(Parser(geohash_precision=5))
+
+    for path in paths:
+        lines: list = [payload.replace(b"{}", path) for payload in payloads]
+        packets: list = [aprslib.parse(line) for line in lines]
+
+        assert cached(memo, lines, now=None) == (packets, encoder.encode(packets))
+
+    assert metrics.get("decode_memo_hits") == 2 * (len(payloads) - 1)
+    assert metrics.get("decode_memo_line_hits") == 2 * (len(payloads) - 2)
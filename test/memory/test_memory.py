@@ -0,0 +1,45 @@
+import tracemalloc
+
+from memory import AllocationSnapshots, rss
+
+
+def test_memory_snapshots(tmp_path):
+    path: str = str(tmp_path / "snapshots.txt")
+
+    snapshots: AllocationSnapshots = AllocationSnapshots(path, top=5)
+    snapshots.start()
+
+    try:
+        retained: list = [bytearray(1024) for _ in range(100)]
+        snapshots.dump()
+        snapshots.dump()
+    finally:
+        snapshots.stop()
+
+    with open(path, "r") as f:
+        reports: list = f.read().strip().split("\n\n")
+
+    assert len(retained) == 100
+    assert len(reports) == 2
+    assert "rss=" in reports[0]
+    assert len(reports[1].splitlines()) == 6
+    assert rss() > 0
+
+
+def test_memory_snapshots_tracing(tmp_path):
+    tracemalloc.start()
+
+    try:
+        snapshots: AllocationSnapshots = AllocationSnapshots(str(tmp_path / "snapshots.txt"))
+        snapshots.start()
+        snapshots.stop()
+
+        # Tracing started before the snapshots outlives them
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    snapshots.start()
+    snapshots.stop()
+
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,61 @@
+import pytest
+
+from config import ConfigParams
+from partition import PARTITION_ALPHABET, PrefixTable, apply_partition, matches
+
+
+@pytest.fixture(name="prefix_table")
+def get_prefix_table():
+    yield PrefixTable({"K": 50, "KA": 20, "KB": 10, "D": 30, "DL": 25, "I": 10, "W": 10})
+
+
+@pytest.mark.parametrize("base_filter", ["", "r/39.2/9.1/100"])
+def test_partition_cover(prefix_table, base_filter):
+    partitions: list = prefix_table.partition(3)
+    filters: list = [partition.aprs_filter(base_filter) for partition in partitions]
+
+    assert sum(partition.share for partition in partitions) == pytest.approx(1.0)
+
+    for first in PARTITION_ALPHABET:
+        for second in PARTITION_ALPHABET:
+            callsign: str = f"{first}{second}1ABC"
+
+            receivers: list = [index for index, aprs_filter in enumerate(filters) if matches(aprs_filter, callsign)]
+            owners: list = [partition.index for partition in partitions if partition.contains(callsign)]
+
+            assert len(receivers) == 1
+            assert receivers == owners
+
+
+def test_partition_learn(tmp_path):
+    table: PrefixTable = PrefixTable.learn(["IS0GVH", "IS0EIR", "IZ0ABC", "KB1LQC"])
+    table.save(str(tmp_path / "prefixes.json"))
+
+    data_actual: dict = PrefixTable.load(str(tmp_path / "prefixes.json")).counts
+
+    assert data_actual == {"I": 3.0, "IS": 2.0, "IZ": 1.0, "K": 1.0, "KB": 1.0}
+
+
+def test_partition_shipped_table():
+    partitions: list = PrefixTable.load().partition(4)
+
+    for partition in partitions:
+        assert partition.share == pytest.approx(0.25, abs=0.02)
+
+
+def test_partition_set_filter(pipeline_module):
+    config_params: ConfigParams = ConfigParams()
+    config_params.partition_nodes = 4
+    config_params.partition_index = 1
+    apply_partition(config_params)
+
+    pipeline = pipeline_module.APRS2InfluxDB(config_params)
+
+    applied: list = []
+    pipeline._aprs = type("Client", (), {"set_filter": lambda _, aprs_filter: applied.append(aprs_filter)})()
+
+    pipeline._filter_control.set_filter("r/39.2/9.1/50", timeout=0)
+
+    # The new filter is narrowed as the initial one
+    assert applied == [PrefixTable.load().partition(4)[1].aprs_filter("r/39.2/9.1/50")]
+    assert config_params.aprs_filter == applied[0]
@@ -0,0 +1,106 @@
+import datetime
+
+import pytest
+
+from config import ConfigParams
+from metrics import Metrics
+
+# Pipelines are built from the pipeline module, which needs the APRS-IS and InfluxDB clients
+pytest.importorskip("aprslib")
+pytest.importorskip("influxdb_client")
+
+from pipelines import load_pipelines
+
+CONFIG: str = """
+[defaults]
+influxdb_url = "http://influxdb:8086"
+aprs_heartbeat_interval = "90s"
+
+[pipelines.sardinia]
+aprs_filter = "r/39.2/9.1/100"
+influxdb_bucket = "sardinia"
+rollup_windows = "1m,1h"
+
+[pipelines.weather]
+aprs_filter = "t/w"
+influxdb_bucket = "weather"
+writer_queue_size = 1000
+tag_promotion = { wx = ["from"] }
+"""
+
+
+def test_load_pipelines(tmp_path):
+    path = tmp_path / "pipelines.toml"
+    path.write_text(CONFIG)
+
+    base: ConfigParams = ConfigParams()
+    base.aprs_callsign = "IS0GVH"
+
+    pipelines: dict = load_pipelines(str(path), base)
+
+    assert list(pipelines) == ["sardinia", "weather"]
+
+    sardinia: ConfigParams = pipelines["sardinia"]
+    assert sardinia.aprs_callsign == "IS0GVH"
+    assert sardinia.aprs_filter == "r/39.2/9.1/100"
+    assert sardinia.influxdb_url == "http://influxdb:8086"
+    assert sardinia.aprs_heartbeat_interval == datetime.timedelta(seconds=90)
+    assert sardinia.rollup_windows == ["1m", "1h"]
+
+    weather: ConfigParams = pipelines["weather"]
+    assert weather.influxdb_bucket == "weather"
+    assert weather.writer_queue_size == 1000
+    assert weather.tag_promotion == {"wx": ["from"]}
+    assert base.influxdb_bucket != "weather"
+
+
+def test_load_pipelines_unknown_setting(tmp_path):
+    path = tmp_path / "pipelines.toml"
+    path.write_text("[pipelines.test]\naprs_filtre = \"t/w\"\n")
+
+    with pytest.raises(ValueError):
+        load_pipelines(str(path), ConfigParams())
+
+
+def test_load_pipelines_shared_settings(tmp_path):
+    path = tmp_path / "pipelines.toml"
+    path.write_text(CONFIG)
+
+    # Every pipeline inherits the port given on the command line
+    base: ConfigParams = ConfigParams()
+    base.api_port = 8080
+
+    with pytest.raises(ValueError, match="api_port"):
+        load_pipelines(str(path), base)
+
+    # Files are compared by their absolute path
+    path.write_text(CONFIG.replace('writer_queue_size = 1000', 'writer_spill_file = "./spill.jsonl"')
+                    .replace('rollup_windows = "1m,1h"', 'writer_spill_file = "spill.jsonl"'))
+
+    with pytest.raises(ValueError, match="writer_spill_file"):
+        load_pipelines(str(path), ConfigParams())
+
+
+def test_scoped_metrics():
+    metrics: Metrics = Metrics()
+
+    metrics.scope("sardinia").increment("writer_lines", 3)
+    metrics.scope("weather").set("writer_pending", 5)
+
+    assert metrics.get("sardinia.writer_lines") == 3
+    assert metrics.scope("weather").snapshot() == {"counters": {}, "gauges": {"writer_pending": 5}}
+
+
+def test_pipeline_point_timestamps(pipeline_module):
+    pipeline = pipeline_module.APRS2InfluxDB(ConfigParams())
+
+    lines: list = []
+    pipeline._writer.put = lambda record, raw=None: lines.append(record)
+
+    # Two status packets of a read share their tags and receive time
+    pipeline._consume_lines([b"N0CALL>APRS:>On the air", b"N1CALL>APRS:>On the air"], 1700000000.5)
+    pipeline._consume_lines([b"N0CALL>APRS:>Off the air"], 1700000000.0)
+
+    assert [line.rsplit(" ", 1)[1] for line in lines] == [
+        "1700000000500000000", "1700000000500000001", "1700000000500000002"
+    ]
@@ -0,0 +1,110 @@
+import datetime
+
+import pytest
+
+from metrics import Metrics
+from positions import PositionIndex
+
+NOW: float = 1700000000.0
+
+
+def position(callsign: str, latitude: float, longitude: float, packet_format: str = "uncompressed") -> dict:
+    return {"from": callsign, "format": packet_format, "latitude": latitude, "longitude": longitude, "speed": 10.0}
+
+
+@pytest.fixture(name="metrics")
+def get_metrics():
+    yield Metrics()
+
+
+@pytest.fixture(name="index")
+def get_index(metrics):
+    index: PositionIndex = PositionIndex(window=datetime.timedelta(hours=1), batch_size=2, metrics=metrics)
+    yield index
+    index.close()
+
+
+def test_positions_batches(index, metrics):
+    index.add(position("N0CALL", 48.85, 2.35), now=NOW)
+    index.add({"from": "N0CALL", "format": "status", "status": "On the air"}, now=NOW)
+    index.add({"from": "N0CALL", "format": "uncompressed", "latitude": "bad", "longitude": 2.35}, now=NOW)
+    assert metrics.get("position_index_inserts") == 0
+
+    index.add(position("N0CALL-1", 48.86, 2.36, "mic-e"), now=NOW)
+    assert metrics.get("position_index_inserts") == 2
+
+    index.add({"from": "N0CALL", "format": "object", "object_name": "OBJ1 ", "latitude": 48.0, "longitude": 2.0},
+              now=NOW)
+    assert len(index) == 3
+    assert [item["station"] for item in index.track("OBJ1", since=NOW - 60)] == ["OBJ1"]
+
+
+def test_positions_nearby(index):
+    index.add(position("N0CALL", 48.85, 2.35), now=NOW - 600)
+    index.add(position("N0CALL", 48.95, 2.35), now=NOW - 60)
+    index.add(position("N0CALL-1", 48.86, 2.36), now=NOW - 30)
+    index.add(position("N0CALL-2", 45.76, 4.84), now=NOW - 30)
+
+    nearby: list = index.nearby(48.85, 2.35, 20000, since=NOW - 3600)
+    assert [item["station"] for item in nearby] == ["N0CALL-1", "N0CALL"]
+    assert nearby[1]["latitude"] == 48.95
+    assert 11000 < nearby[1]["distance"] < 11200
+
+    # N0CALL has left the circle, its last position inside is returned
+    nearby = index.nearby(48.85, 2.35, 5000, since=NOW - 3600)
+    assert [item["station"] for item in nearby] == ["N0CALL", "N0CALL-1"]
+    assert nearby[0]["time"] == NOW - 600
+
+    assert [item["station"] for item in index.nearby(48.85, 2.35, 5000, since=NOW - 3600, until=NOW - 300)] == \
+        ["N0CALL"]
+
+
+def test_positions_bounding_box(index):
+    index.add(position("N0CALL", 10.0, 179.5), now=NOW)
+    index.add(position("N0CALL-1", 10.0, -179.5), now=NOW)
+    index.add(position("N0CALL-2", 10.0, 0.0), now=NOW)
+
+    stations: list = index.in_bounding_box(9.0, 179.0, 11.0, -179.0, since=NOW - 60)
+    assert sorted(item["station"] for item in stations) == ["N0CALL", "N0CALL-1"]
+
+    nearby: list = index.nearby(10.0, 179.9, 100000, since=NOW - 60)
+    assert [item["station"] for item in nearby] == ["N0CALL", "N0CALL-1"]
+
+
+def test_positions_eviction(index):
+    index.add(position("N0CALL", 48.85, 2.35), now=NOW - 7200)
+    index.add(position("N0CALL", 48.86, 2.35), now=NOW - 1800)
+    index.add(position("N0CALL", 48.87, 2.35), now=NOW - 60)
+
+    index.tick(now=NOW)
+
+    assert [item["latitude"] for item in index.track("N0CALL", since=0)] == [48.86, 48.87]
+    assert index.in_bounding_box(48.0, 2.0, 49.0, 3.0, since=0, until=NOW - 3600) == []
+
+
+def test_positions_file(tmp_path):
+    path: str = str(tmp_path / "positions.db")
+
+    index: PositionIndex = PositionIndex(window=datetime.timedelta(hours=1), path=path)
+    index.add(position("N0CALL", 48.85, 2.35), now=NOW)
+    index.close()
+
+    index = PositionIndex(window=datetime.timedelta(hours=1), path=path)
+    index.add(position("N0CALL", 48.86, 2.35), now=NOW + 1)
+
+    assert [item["latitude"] for item in index.track("N0CALL", since=0)] == [48.85, 48.86]
+    index.close()
+
+
+def test_positions_api(index):
+    index.add(position("N0CALL", 48.85, 2.35))
+
+    assert index.api_nearby({"latitude": "48.85", "longitude": "2.35", "radius": "1"})[0]["station"] == "N0CALL"
+    assert index.api_positions({"bbox": "48,2,49,3", "last": "1m"})[0]["station"] == "N0CALL"
+    assert len(index.api_track({"callsign": "N0CALL"})) == 1
+
+    with pytest.raises(ValueError):
+        index.api_nearby({"latitude": "48.85"})
+
+    with pytest.raises(ValueError):
+        index.api_positions({"bbox": "48,2,49"})
@@ -0,0 +1,146 @@
+import multiprocessing
+import time
+
+import pytest
+
+from ring import LineRing
+
+LINES: list = [b"N0CALL>APRS,TCPIP*,qAC,T2TEST:!4851.00N/00221.00E>Mobile",
+               b"N0CALL-2>APRS,TCPIP*,qAC,T2TEST:>On the air",
+               b"F1CALL>APRS,WIDE1-1,qAR,F1CALL-10::N0CALL   :Hello{12",
+               b"N0CALL>APRS,TCPIP*,qAC,T2TEST:>Status"]
+
+
+def consume(ring: LineRing, index: int, count: int, connection) -> None:
+    """Reads count lines from another process and sends them back"""
+
+    reader = ring.reader(index)
+    lines: list = []
+
+    while len(lines) < count:
+        for timestamp, view in reader.read(timeout=5):
+            lines.extend((timestamp, line) for line in bytes(view).split(b"\n"))
+
+    reader.close()
+    ring.close()
+
+    connection.send(lines)
+
+
+def drain(reader) -> list:
+    """Lines pending for a reader, released once read"""
+
+    lines: list = [line for _, view in reader.read(timeout=0) for line in bytes(view).split(b"\n")]
+    assert reader.read(timeout=0) == []
+
+    return lines
+
+
+@pytest.fixture(name="ring")
+def get_ring():
+    ring: LineRing = LineRing(size=512, consumers=1)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def test_ring_lines(ring):
+    reader = ring.reader(0)
+    assert reader.read(timeout=0) == []
+
+    assert ring.write(LINES, 1700000000.5)
+    assert ring.write([], 1700000001.0)
+
+    reads: list = reader.read(timeout=0)
+    assert [(timestamp, bytes(view).split(b"\n")) for timestamp, view in reads] == [(1700000000.5, LINES)]
+    assert ring.used > 0
+
+    # Views are released, and the records with them, at the next read
+    assert reader.read(timeout=0) == []
+    with pytest.raises(ValueError):
+        bytes(reads[0][1])
+    assert ring.used == 0
+
+    reader.close()
+
+
+def test_ring_full(ring):
+    reader = ring.reader(0)
+    received: list = []
+
+    # Reads not fitting are not written, and once released the next ones go on past the end of the region
+    for cycle in range(10):
+        assert ring.write(LINES, float(cycle))
+        assert ring.write(LINES, float(cycle))
+        assert not ring.write(LINES, float(cycle))
+
+        received.extend(drain(reader))
+
+    assert received == LINES * 20
+
+    reader.close()
+
+
+def test_ring_minimum_size():
+    ring: LineRing = LineRing(size=LineRing.minimum_size(300), consumers=1)
+    reader = ring.reader(0)
+    line: bytes = b"N0CALL>APRS:>" + b"x" * 287
+
+    # Reads of the largest size are written wherever the previous ones ended
+    for length in range(1, 200, 7):
+        assert ring.write([line[:length]], 0.0)
+        assert ring.write([line], 0.0)
+        assert drain(reader) == [line[:length], line]
+
+    reader.close()
+    ring.close()
+    ring.unlink()
+
+
+def test_ring_consumers():
+    ring: LineRing = LineRing(size=4096, consumers=2)
+    readers: list = [ring.reader(0), ring.reader(1)]
+
+    ring.write(LINES * 3, 0.0)
+
+    received: list = [[line for _, view in reader.read(timeout=0) for line in bytes(view).split(b"\n")]
+                      for reader in readers]
+
+    # Each line goes to one consumer, always the same one for a station
+    assert sorted(received[0] + received[1]) == sorted(LINES * 3)
+    stations: list = [{line.split(b">")[0] for line in lines} for lines in received]
+    assert not stations[0] & stations[1]
+
+    # The slowest consumer holds the ring
+    readers[0].read(timeout=0)
+    assert ring.used > 0
+    readers[1].read(timeout=0)
+    assert ring.used == 0
+
+    with pytest.raises(ValueError):
+        ring.reader(2)
+
+    for reader in readers:
+        reader.close()
+    ring.close()
+    ring.unlink()
+
+
+def test_ring_process():
+    context = multiprocessing.get_context("spawn")
+    ring: LineRing = LineRing(size=256, consumers=1, context=context)
+    receiver, sender = context.Pipe(duplex=False)
+
+    # The consumer attaches to the shared memory and sleeps until woken up by a write
+    process = context.Process(target=consume, args=(ring, 0, len(LINES) * 20, sender))
+    process.start()
+
+    for cycle in range(20):
+        while not ring.write(LINES, float(cycle)):
+            time.sleep(0.001)
+
+    assert receiver.recv() == [(float(cycle), line) for cycle in range(20) for line in LINES]
+
+    process.join()
+    ring.close()
+    ring.unlink()
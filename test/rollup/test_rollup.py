@@ -0,0 +1,51 @@
+import datetime
+
+import pytest
+
+from rollup import Rollup
+
+
+@pytest.fixture(name="rollup_instance")
+def get_rollup(tmp_path):
+    yield Rollup(windows=[("1m", datetime.timedelta(minutes=1))], state_file=str(tmp_path / "rollup.json"))
+
+
+def test_rollup_window_close(rollup_instance):
+    packet: dict = {
+        "from": "N0CALL",
+        "format": "wx",
+        "path": ["TCPIP*", "qAC", "T2TEST"],
+        "weather": {"temperature": 10.0}
+    }
+
+    start = datetime.datetime(2022, 1, 1, 0, 0, 10, tzinfo=datetime.timezone.utc)
+
+    assert rollup_instance.add(packet, start) == []
+    assert rollup_instance.add(dict(packet, weather={"temperature": 20.0}), start) == []
+    assert rollup_instance.tick(start + datetime.timedelta(seconds=30)) == []
+
+    data_actual: list = rollup_instance.tick(start + datetime.timedelta(minutes=1))
+
+    assert data_actual == [
+        "rollup_format,window=1m,format=wx count=2i 1640995200000000000",
+        "rollup_station,window=1m,from=N0CALL count=2i 1640995200000000000",
+        "rollup_igate,window=1m,igate=T2TEST count=2i 1640995200000000000",
+        "rollup_weather,window=1m,from=N0CALL temperature_min=10.0,temperature_max=20.0,temperature_mean=15.0,"
+        "temperature_count=2i 1640995200000000000"
+    ]
+
+
+def test_rollup_restart(rollup_instance, tmp_path):
+    packet: dict = {"from": "N0CALL", "format": "status"}
+
+    start = datetime.datetime(2022, 1, 1, 0, 0, 10, tzinfo=datetime.timezone.utc)
+
+    rollup_instance.add(packet, start)
+    rollup_instance.flush()
+
+    restarted: Rollup = Rollup(windows=[("1m", datetime.timedelta(minutes=1))],
+                               state_file=str(tmp_path / "rollup.json"))
+    restarted.load(start + datetime.timedelta(seconds=20))
+    restarted.add(packet, start + datetime.timedelta(seconds=20))
+
+    assert "rollup_format,window=1m,format=status count=2i 1640995200000000000" in restarted.flush()
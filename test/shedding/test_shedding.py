@@ -0,0 +1,51 @@
+import pytest
+
+from metrics import Metrics
+from shedding import LoadShedder
+
+
+@pytest.fixture(name="pending")
+def get_pending():
+    yield [0]
+
+
+@pytest.fixture(name="metrics")
+def get_metrics():
+    yield Metrics()
+
+
+@pytest.fixture(name="shedder")
+def get_shedder(pending, metrics):
+    yield LoadShedder(pending=lambda: pending[0], capacity=100, low_watermark=0.5, high_watermark=0.9,
+                      station_rate=1.0, station_burst=5, metrics=metrics)
+
+
+def test_shedding_watermarks(shedder, pending, metrics):
+    position: dict = {"from": "IS0GVH", "format": "uncompressed"}
+    status: dict = {"from": "IS0GVH", "format": "status"}
+    weather: dict = {"from": "IS0GVH", "format": "wx"}
+
+    assert shedder.keep_probability(LoadShedder.priority(position), 0.3) == 1.0
+    assert shedder.keep_probability(LoadShedder.priority(position), 0.7) == pytest.approx(0.5)
+    assert shedder.keep_probability(LoadShedder.priority(status), 0.7) == 1.0
+
+    pending[0] = 95
+    assert not shedder.admit(position, now=0)
+    assert shedder.admit(weather, now=0)
+    assert metrics.get("shedder_shed_low") == 1
+    assert metrics.get("shedder_load") == pytest.approx(0.95)
+
+
+def test_shedding_station_flood(shedder, metrics):
+    packet: dict = {"from": "IS0GVH", "format": "status"}
+
+    admitted: list = [shedder.admit(packet, now=0) for _ in range(10)]
+    assert admitted.count(True) == 5
+    assert metrics.get("shedder_throttled_normal") == 5
+
+    assert shedder.admit(packet, now=1)
+    assert not shedder.admit(packet, now=1)
+    assert shedder.admit({"from": "IK0XYZ", "format": "status"}, now=1)
+
+    # Weather, telemetry and messages are never throttled
+    assert all(shedder.admit({"from": "IS0GVH", "format": "message"}, now=1) for _ in range(10))
@@ -0,0 +1,64 @@
+import io
+import socket
+
+import pytest
+
+from sinks import StdoutSink, TCPSink, UDPSink
+from writer import WriteError
+
+
+def test_udp_sink():
+    receiver: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(5)
+
+    sink: UDPSink = UDPSink("127.0.0.1", receiver.getsockname()[1], mtu=24)
+    sink.start()
+
+    try:
+        sink.write(["a,t=1 v=1", "b,t=2 v=2", "c,t=3 v=3"])
+
+        assert receiver.recv(1500) == b"a,t=1 v=1\nb,t=2 v=2\n"
+        assert receiver.recv(1500) == b"c,t=3 v=3\n"
+
+        with pytest.raises(WriteError) as e:
+            sink.write(["a,t=1 v=1", "long,t=1 v=\"" + "x" * 30 + "\""])
+        assert e.value.status == 413
+    finally:
+        sink.stop()
+        receiver.close()
+
+
+def test_tcp_sink():
+    server: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    server.settimeout(5)
+
+    sink: TCPSink = TCPSink("127.0.0.1", server.getsockname()[1])
+    sink.start()
+
+    try:
+        sink.write(["a,t=1 v=1", "b,t=2 v=2"])
+
+        connection, _ = server.accept()
+        connection.settimeout(5)
+
+        received: bytes = b""
+        while received.count(b"\n") < 2:
+            received += connection.recv(1500)
+
+        assert received == b"a,t=1 v=1\nb,t=2 v=2\n"
+        connection.close()
+    finally:
+        sink.stop()
+        server.close()
+
+
+def test_stdout_sink():
+    stream: io.StringIO = io.StringIO()
+
+    sink: StdoutSink = StdoutSink(stream)
+    sink.write(["a,t=1 v=1", "b,t=2 v=2"])
+
+    assert stream.getvalue() == "a,t=1 v=1\nb,t=2 v=2\n"
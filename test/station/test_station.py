@@ -0,0 +1,40 @@
+import pytest
+
+from station import StationTable
+
+
+@pytest.fixture(name="station_table")
+def get_station_table(tmp_path):
+    yield StationTable(max_size=2, snapshot_file=str(tmp_path / "stations.json"))
+
+
+def test_station_update(station_table):
+    station_table.update({"from": "N0CALL", "format": "uncompressed", "latitude": 39.2, "longitude": 9.1,
+                          "symbol": "#", "comment": "Digipeater"}, now=100)
+    station_table.update({"from": "N0CALL", "format": "wx", "weather": {"temperature": 21.0}}, now=200)
+
+    data_actual: dict = station_table.get("N0CALL")
+
+    assert data_actual["latitude"] == 39.2
+    assert data_actual["comment"] == "Digipeater"
+    assert data_actual["weather"] == {"temperature": 21.0}
+    assert data_actual["last_position"] == 100
+    assert data_actual["last_heard"] == 200
+
+    assert [station["callsign"] for station in station_table.in_bounding_box(39, 9, 40, 10)] == ["N0CALL"]
+    assert station_table.in_bounding_box(40, 9, 41, 10) == []
+
+
+def test_station_eviction_and_snapshot(station_table, tmp_path):
+    for callsign in ["N0CALL-1", "N0CALL-2", "N0CALL-3"]:
+        station_table.update({"from": callsign, "format": "status", "status": "QRV"})
+
+    assert len(station_table) == 2
+    assert station_table.get("N0CALL-1") is None
+
+    station_table.snapshot()
+
+    restored: StationTable = StationTable(max_size=2, snapshot_file=str(tmp_path / "stations.json"))
+    restored.load()
+
+    assert restored.get("N0CALL-3")["status"] == "QRV"
@@ -0,0 +1,60 @@
+import pytest
+
+from geo import destination
+from metrics import Metrics
+from trajectory import TrackSimplifier
+
+
+@pytest.fixture(name="simplifier")
+def get_simplifier():
+    yield TrackSimplifier(tolerance=50, anchor_interval=300, metrics=Metrics())
+
+
+def position(now: float, speed: float, course: float, start: tuple = (39.2, 9.1)) -> dict:
+    latitude, longitude = destination(start[0], start[1], course, speed / 3.6 * now)
+
+    return {
+        "from": "IS0GVH-9",
+        "format": "mic-e",
+        "latitude": latitude,
+        "longitude": longitude,
+        "speed": speed,
+        "course": course,
+        "raw": f"raw {now}"
+    }
+
+
+def test_trajectory_straight_line(simplifier):
+    assert simplifier.add(position(0, 90, 45), "line0", now=0) == [("line0", "raw 0")]
+
+    for t in range(10, 60, 10):
+        assert simplifier.add(position(t, 90, 45), f"line{t}", now=t) == []
+
+    assert simplifier.add(position(300, 90, 45), "line300", now=300) == [
+        ("line50", "raw 50"),
+        ("line300", "raw 300")
+    ]
+
+
+def test_trajectory_turn_and_stop(simplifier):
+    simplifier.add(position(0, 90, 0), "line0", now=0)
+    assert simplifier.add(position(10, 90, 0), "line10", now=10) == []
+
+    # Turning east from the position reached at 10s
+    corner: dict = position(10, 90, 0)
+    turned: dict = position(10, 90, 90, start=(corner["latitude"], corner["longitude"]))
+    assert simplifier.add(turned, "line20", now=20) == [("line10", "raw 10"), ("line20", "raw 10")]
+
+    stopped: dict = dict(turned, speed=0)
+    assert simplifier.add(stopped, "line30", now=30) == [("line30", "raw 10")]
+
+    assert simplifier.add(stopped, "line40", now=40) == []
+    assert simplifier.tick(now=340) == [("line40", "raw 10")]
+    assert simplifier.flush() == []
+
+
+def test_trajectory_passthrough(simplifier):
+    packet: dict = {"from": "IS0GVH", "format": "uncompressed", "latitude": 39.2, "longitude": 9.1, "raw": "raw"}
+
+    assert simplifier.add(packet, "line", now=0) == [("line", "raw")]
+    assert simplifier.add(packet, "line", now=1) == [("line", "raw")]
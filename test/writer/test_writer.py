@@ -0,0 +1,169 @@
+import json
+import time
+
+import pytest
+
+from deadletter import DeadLetter
+from metrics import Metrics
+from writer import BatchController, PointClock, WriteError, Writer
+
+
+@pytest.fixture(name="controller")
+def get_controller():
+    yield BatchController(batch_size_min=10, batch_size_max=1010, flush_interval_min=0.1, flush_interval_max=5.1,
+                          latency_target=0.5)
+
+
+def test_controller_aimd(controller):
+    controller.on_success(latency=0.1, pending=100)
+    assert controller.batch_size == 30
+
+    controller.on_throttle()
+    assert controller.batch_size == 15
+    assert controller.flush_interval == pytest.approx(0.2)
+
+    controller.on_success(latency=0.1, pending=0)
+    assert controller.flush_interval == pytest.approx(0.1)
+
+    controller.on_success(latency=1.0, pending=100)
+    assert controller.batch_size == 10
+
+
+def test_writer_retry(controller):
+    written: list = []
+    metrics: Metrics = Metrics()
+
+    def write(lines: list) -> None:
+        if not written:
+            written.append([])
+            raise WriteError("Service unavailable", 503)
+        written.append(lines)
+
+    writer: Writer = Writer(write=write, metrics=metrics, controller=controller, queue_size=100)
+    writer.put(["a", "b"])
+    writer.put("c")
+
+    writer.start()
+
+    for _ in range(100):
+        if len(written) > 1:
+            break
+        time.sleep(0.1)
+
+    writer.stop()
+    writer.join()
+
+    assert written[-1] == ["a", "b", "c"]
+    assert metrics.get("writer_throttled") == 1
+    assert metrics.get("writer_lines") == 3
+
+
+def test_point_clock():
+    clock: PointClock = PointClock()
+
+    # Points received at the same time, or seemingly earlier, follow the previous one
+    assert [clock.timestamp(1700000000.5) for _ in range(3)] == [1700000000500000000, 1700000000500000001,
+                                                                 1700000000500000002]
+    assert clock.timestamp(1699999999.0) == 1700000000500000003
+    assert clock.timestamp(1700000001.0) == 1700000001000000000
+
+
+def test_writer_bisect(controller, tmp_path):
+    written: list = []
+    metrics: Metrics = Metrics()
+
+    def write(lines: list) -> None:
+        if "bad" in lines:
+            raise WriteError("Bad request", 400)
+        written.extend(lines)
+
+    writer: Writer = Writer(write=write, metrics=metrics, controller=controller, queue_size=100,
+                            dead_letter=DeadLetter(str(tmp_path / "dead.jsonl")))
+    for line in ["a", "b", "bad", "c", "d"]:
+        writer.put(line, raw=f"raw {line}")
+
+    writer.start()
+    writer.stop()
+    writer.join()
+
+    assert written == ["a", "b", "c", "d"]
+    assert metrics.get("writer_rejected_lines") == 1
+
+    with open(tmp_path / "dead.jsonl") as f:
+        entries: list = [json.loads(entry) for entry in f]
+
+    assert [(entry["line"], entry["raw"]) for entry in entries] == [("bad", "raw bad")]
+
+
+def test_writer_partial(controller, tmp_path):
+    written: list = []
+    metrics: Metrics = Metrics()
+
+    def write(lines: list) -> None:
+        written.append(lines)
+        raise WriteError('partial write: field type conflict: input field "msgNo" on measurement "packet" is type '
+                         'string, already exists as type float dropped=1', 422)
+
+    writer: Writer = Writer(write=write, metrics=metrics, controller=controller, queue_size=100,
+                            dead_letter=DeadLetter(str(tmp_path / "dead.jsonl")))
+    writer.put(['packet,format=message msgNo="AB",from="N0CALL"', 'packet,format=uncompressed from="N0CALL"'])
+
+    writer.start()
+    writer.stop()
+    writer.join()
+
+    # Lines written by the partial write are not sent again
+    assert len(written) == 1
+    assert metrics.get("writer_lines") == 1
+    assert metrics.get("writer_rejected_lines") == 1
+
+    with open(tmp_path / "dead.jsonl") as f:
+        entries: list = [json.loads(entry) for entry in f]
+
+    assert [entry["line"] for entry in entries] == ['packet,format=message msgNo="AB",from="N0CALL"']
+
+
+def test_writer_drain_spill(controller, tmp_path):
+    spill_file: str = str(tmp_path / "spill.jsonl")
+    metrics: Metrics = Metrics()
+
+    def unavailable(lines: list) -> None:
+        raise WriteError("Service unavailable", 503)
+
+    writer: Writer = Writer(write=unavailable, metrics=metrics, controller=controller, queue_size=100,
+                            spill_file=spill_file)
+    writer.start()
+    writer.put(["a", "b", "c"], raw="raw")
+    writer.drain(time.monotonic() + 5)
+
+    assert metrics.get("writer_spilled_lines") == 3
+
+    written: list = []
+    writer = Writer(write=written.extend, metrics=Metrics(), controller=controller, queue_size=100,
+                    spill_file=spill_file)
+    writer.start()
+    writer.drain(time.monotonic() + 5)
+
+    assert written == ["a", "b", "c"]
+
+
+def test_writer_drain_wakeup(tmp_path):
+    spill_file: str = str(tmp_path / "spill.jsonl")
+    controller: BatchController = BatchController(batch_size_min=10, batch_size_max=10, flush_interval_min=30,
+                                                  flush_interval_max=30, latency_target=0.5)
+
+    def unavailable(lines: list) -> None:
+        raise WriteError("Service unavailable", 503)
+
+    writer: Writer = Writer(write=unavailable, metrics=Metrics(), controller=controller, queue_size=100,
+                            spill_file=spill_file)
+    writer.start()
+    writer.put("a 1700000000500000000", raw="raw")
+
+    # The collector waiting for a full batch is woken up, and the line spilled with its receive time
+    started: float = time.monotonic()
+    writer.drain(time.monotonic() + 5)
+    assert time.monotonic() - started < 1
+
+    with open(spill_file) as f:
+        assert [json.loads(entry) for entry in f] == [{"line": "a 1700000000500000000", "raw": "raw"}]